@@ -21,14 +21,34 @@ import os
 import sys
 import webbrowser
 import threading
+import queue
 import subprocess
 import urllib.request
 import urllib.error
 import base64
+import gzip
+import hashlib
+import re
+from collections import namedtuple
 from pathlib import Path
-from flask import Flask, render_template_string, request, jsonify, send_file, redirect, url_for, send_from_directory
+from flask import Flask, Response, g, request, jsonify, send_file, redirect, url_for, send_from_directory, stream_with_context
+from flask.json.provider import DefaultJSONProvider
 from werkzeug.utils import secure_filename
 
+# orjson is optional — a faster C parser for the legacy *_json columns
+try:
+    import orjson
+    json_loads = orjson.loads
+except ImportError:
+    orjson = None
+    json_loads = json.loads
+
+# brotli is optional — only used to pre-compress the index page
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
 # Equipment catalogue — weapons, armor, gear from all sources
 from equipment import WEAPONS as CAT_WEAPONS, ARMOR as CAT_ARMOR, GEAR as CAT_GEAR, SOURCES as CAT_SOURCES
 from equipment import VERSION as EQUIPMENT_VERSION
@@ -75,24 +95,84 @@ def load_config():
             return defaults
     return defaults
 
+_CFG_CACHE = {'mtime': None, 'data': None}
+
+def load_config_cached():
+    """Load config, reusing the last parse while the file's mtime is unchanged."""
+    try:
+        mtime = CONFIG_PATH.stat().st_mtime_ns
+    except OSError:
+        mtime = None
+    if _CFG_CACHE['data'] is not None and _CFG_CACHE['mtime'] == mtime:
+        return dict(_CFG_CACHE['data'])
+    cfg = load_config()
+    _CFG_CACHE['mtime'] = mtime
+    _CFG_CACHE['data'] = cfg
+    return dict(cfg)
+
 def save_config(cfg):
     """Save config to JSON file."""
     with open(CONFIG_PATH, 'w') as f:
         json.dump(cfg, f, indent=2)
+    _CFG_CACHE['mtime'] = None
+    _CFG_CACHE['data'] = None
 
 def get_repo_path():
     """Get the configured repository path."""
-    cfg = load_config()
+    cfg = load_config_cached()
     return Path(cfg.get("repo_path", str(APP_DIR)))
 
 def get_backup_dir():
     """Get the configured backup directory, creating it if needed."""
-    cfg = load_config()
+    cfg = load_config_cached()
     p = Path(cfg.get("backup_dir", str(APP_DIR / "backups")))
     p.mkdir(parents=True, exist_ok=True)
     return p
 
+class RowJSONProvider(DefaultJSONProvider):
+    """JSON provider that serialises sqlite3.Row directly, so handlers can jsonify query results."""
+
+    @staticmethod
+    def default(o):
+        if isinstance(o, sqlite3.Row):
+            return dict(o)
+        return DefaultJSONProvider.default(o)
+
+    def response(self, *args, **kwargs):
+        # orjson writes bytes straight into the response, several times faster
+        # than the stdlib encoder; without it fall back to Flask's own path
+        if orjson is None:
+            return super().response(*args, **kwargs)
+        # Same argument handling as jsonify(): one positional value, several
+        # as a list, or keyword arguments as an object
+        if args and kwargs:
+            raise TypeError("app.json.response() takes either args or kwargs, not both")
+        obj = args[0] if len(args) == 1 else (args or kwargs or None)
+        body = orjson.dumps(obj, default=self.default, option=orjson.OPT_NON_STR_KEYS)
+        return self._app.response_class(body, mimetype=self.mimetype)
+
+# A payload that never changes within the process: its bytes and their ETag
+StaticJSON = namedtuple('StaticJSON', 'body etag')
+
+def json_body(obj):
+    """Serialise a payload that never changes, so it can be sent as-is."""
+    if orjson is not None:
+        body = orjson.dumps(obj)
+    else:
+        body = json.dumps(obj, separators=(',', ':')).encode('utf-8')
+    return StaticJSON(body, hashlib.md5(body).hexdigest())
+
+def json_response(static):
+    """Send a StaticJSON body; a browser already holding it gets a bodiless 304."""
+    resp = Response(static.body, mimetype='application/json')
+    resp.set_etag(static.etag)
+    # Revalidate rather than max-age: an updated catalogue shows up as soon
+    # as the server restarts, and an unchanged one still costs no body
+    resp.headers['Cache-Control'] = 'no-cache'
+    return resp.make_conditional(request)
+
 app = Flask(__name__)
+app.json = RowJSONProvider(app)
 
 # ============================================================
 # OPENAI PORTRAIT GENERATION
@@ -121,7 +201,6 @@ def get_setting(key, default=None):
     """Get a setting value from the database."""
     conn = get_db()
     row = conn.execute("SELECT value FROM settings WHERE key = ?", (key,)).fetchone()
-    conn.close()
     return row['value'] if row else default
 
 def set_setting(key, value):
@@ -129,7 +208,6 @@ def set_setting(key, value):
     conn = get_db()
     conn.execute("INSERT OR REPLACE INTO settings (key, value) VALUES (?, ?)", (key, value))
     conn.commit()
-    conn.close()
     checkpoint_wal()  # Ensure settings persist immediately
 
 def build_character_prompt(npc):
@@ -228,17 +306,51 @@ def generate_portrait_dalle(prompt, size="1024x1024", quality="standard"):
 # DATABASE HELPERS
 # ============================================================
 
-def get_db():
-    conn = sqlite3.connect(str(DB_PATH))
+# Idle connections, reused across requests. The dev server runs each request
+# on a fresh thread, so connections are pooled rather than held per thread;
+# a connection only ever serves one request at a time, hence check_same_thread=False
+DB_POOL_SIZE = 4
+_db_pool = queue.LifoQueue(maxsize=DB_POOL_SIZE)
+
+def _open_db():
+    conn = sqlite3.connect(str(DB_PATH), check_same_thread=False)
     conn.row_factory = sqlite3.Row
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=NORMAL")
+    conn.execute("PRAGMA temp_store=MEMORY")
+    conn.execute("PRAGMA mmap_size=268435456")
+    conn.execute("PRAGMA cache_size=-65536")
     conn.execute("PRAGMA foreign_keys=ON")
     return conn
 
+def get_db():
+    """Return the app context's SQLite connection, taken from the pool on first use."""
+    conn = g.get('db')
+    if conn is None:
+        try:
+            conn = _db_pool.get_nowait()
+        except queue.Empty:
+            conn = _open_db()
+        g.db = conn
+    return conn
+
+@app.teardown_appcontext
+def release_db(exc):
+    """Roll back anything the request left uncommitted, then return its connection to the pool."""
+    conn = g.pop('db', None)
+    if conn is None:
+        return
+    if conn.in_transaction:
+        conn.rollback()
+    try:
+        _db_pool.put_nowait(conn)
+    except queue.Full:
+        conn.close()
+
 def auto_seed_if_empty():
     """Automatically run seed_data.py if the database has no NPCs."""
     conn = get_db()
     count = conn.execute("SELECT COUNT(*) FROM npcs").fetchone()[0]
-    conn.close()
     if count == 0:
         print("  Database empty — auto-seeding...")
         seed_path = APP_DIR / "seed_data.py"
@@ -254,7 +366,6 @@ def init_db_if_needed():
         with open(SCHEMA_PATH, 'r') as f:
             conn.executescript(f.read())
         conn.commit()
-        conn.close()
         print(f"Database created at {DB_PATH}")
     else:
         # Auto-migrate: add new tables if they don't exist
@@ -321,8 +432,17 @@ def init_db_if_needed():
             )""")
             conn.execute("CREATE INDEX IF NOT EXISTS idx_npc_powers_npc ON npc_powers(npc_id)")
             print("  Migrated: npc_powers table added")
+        # Composite indexes for the (npc_id, name) duplicate checks in migration
+        conn.execute("CREATE INDEX IF NOT EXISTS idx_npc_hindrances_npc_name ON npc_hindrances(npc_id, name)")
+        conn.execute("CREATE INDEX IF NOT EXISTS idx_npc_edges_npc_name ON npc_edges(npc_id, name)")
+        conn.execute("CREATE INDEX IF NOT EXISTS idx_npc_powers_npc_name ON npc_powers(npc_id, name)")
+        # The connections primary key covers lookups by npc_id_a; this covers the mirrored side
+        conn.execute("CREATE INDEX IF NOT EXISTS idx_npc_connections_b ON npc_connections(npc_id_b)")
+        # Partial index over NPCs still holding legacy JSON, for the migration scans
+        conn.execute("CREATE INDEX IF NOT EXISTS idx_npcs_legacy ON npcs(id) WHERE "
+                     "hindrances_json NOT IN ('','[]') OR edges_json NOT IN ('','[]') "
+                     "OR powers_json NOT IN ('','[]')")
         conn.commit()
-        conn.close()
 
     # Portrait column migration
     conn = get_db()
@@ -339,7 +459,6 @@ def init_db_if_needed():
         conn.execute("ALTER TABLE npcs ADD COLUMN ancestry TEXT DEFAULT 'Human'")
         conn.commit()
         print("  Migrated: ancestry column added")
-    conn.close()
 
     # Settings table migration
     conn = get_db()
@@ -354,7 +473,6 @@ def init_db_if_needed():
         conn.execute("INSERT INTO settings (key, value) VALUES ('portrait_style_prompt', ?)", (default_style,))
         conn.commit()
         print("  Migrated: settings table added with default portrait style")
-    conn.close()
 
     # Ensure portraits directory exists
     portraits_dir = APP_DIR / 'portraits'
@@ -365,13 +483,12 @@ def die_str(value):
         return f"d{value}"
     return "—"
 
-def row_to_dict(row):
-    if row is None:
-        return None
-    return dict(row)
+DIE_VALUES = (0, 4, 6, 8, 10, 12)
+DIE_OPTIONS = ''.join(f'<option value="{d}">{die_str(d)}</option>' for d in DIE_VALUES)
 
-def rows_to_list(rows):
-    return [dict(r) for r in rows]
+def die_select(id, label):
+    """Labelled attribute die <select>, as used in the NPC modal."""
+    return f'<div class="form-group"><label>{label}</label><select id="{id}" class="die-select">{DIE_OPTIONS}</select></div>'
 
 # ============================================================
 # HTML TEMPLATE
@@ -384,6 +501,13 @@ HTML_TEMPLATE = '''
     <meta charset="UTF-8">
     <meta name="viewport" content="width=device-width, initial-scale=1.0">
     <title>Tribute Lands — NPC Database</title>
+    <script>
+        // Apply the saved theme before first paint; switching is just an attribute flip
+        (function () {
+            const theme = localStorage.getItem('data-theme');
+            if (theme) document.documentElement.dataset.theme = theme;
+        })();
+    </script>
     <style>
         :root {
             --bg-dark: #1a1a1a;
@@ -405,6 +529,46 @@ HTML_TEMPLATE = '''
             --success: #5a5;
             --warning: #c90;
             --danger: #c44;
+            --border-faint: #2a2a2a;
+            --scrollbar-hover: #555;
+            --on-accent: #1a1a1a;
+            --on-dark: #fff;
+            --on-walkon: #ccc;
+            --header-grad-end: #2a2218;
+            --bg-popover: #1e1e22;
+            --bg-audit: #1a1a1e;
+            --popover-rule: #333;
+            --border-popover: #444;
+            --ok: #6c6;
+            --warn: #da3;
+            --bad: #e66;
+            --info: #88f;
+        }
+        [data-theme="light"] {
+            --bg-dark: #f4f1ea;
+            --bg-card: #fffdf8;
+            --bg-input: #fff;
+            --bg-hover: #e8e3d8;
+            --border: #c8c2b4;
+            --text: #2e2b26;
+            --text-dim: #6f6a60;
+            --text-bright: #12100c;
+            --accent: #8a6320;
+            --accent-dim: #b89550;
+            --tag-walkon: #8a8a8a;
+            --border-faint: #e2ddd2;
+            --scrollbar-hover: #aaa;
+            --on-accent: #fff;
+            --on-walkon: #fff;
+            --header-grad-end: #ebe2cf;
+            --bg-popover: #fffdf8;
+            --bg-audit: #f4f1ea;
+            --popover-rule: #e2ddd2;
+            --border-popover: #c8c2b4;
+            --ok: #2e7d32;
+            --warn: #9a6b00;
+            --bad: #b3261e;
+            --info: #3f51b5;
         }
 
         * { box-sizing: border-box; margin: 0; padding: 0; }
@@ -418,7 +582,7 @@ HTML_TEMPLATE = '''
 
         /* --- HEADER --- */
         header {
-            background: linear-gradient(135deg, #1a1a1a 0%, #2a2218 100%);
+            background: linear-gradient(135deg, var(--bg-dark) 0%, var(--header-grad-end) 100%);
             border-bottom: 2px solid var(--accent-dim);
             padding: 12px 24px;
             display: flex;
@@ -498,13 +662,21 @@ HTML_TEMPLATE = '''
             flex: 1;
             overflow-y: auto;
             padding: 4px;
+            contain: layout paint style;
         }
+        /* Virtual list: spacer holds full scroll height, rows are positioned by index */
+        .npc-list-spacer { position: relative; }
         .npc-item {
+            position: absolute;
+            left: 0;
+            right: 0;
+            height: 46px;
+            box-sizing: border-box;
+            overflow: hidden;
             padding: 8px 10px;
             border-radius: 4px;
             cursor: pointer;
             border: 1px solid transparent;
-            margin-bottom: 2px;
         }
         .npc-item:hover { background: var(--bg-hover); }
         .npc-item.active {
@@ -515,11 +687,17 @@ HTML_TEMPLATE = '''
             font-size: 13px;
             font-weight: 600;
             color: var(--text-bright);
+            white-space: nowrap;
+            overflow: hidden;
+            text-overflow: ellipsis;
         }
         .npc-item .npc-meta {
             font-size: 11px;
             color: var(--text-dim);
             margin-top: 1px;
+            white-space: nowrap;
+            overflow: hidden;
+            text-overflow: ellipsis;
         }
         .tier-tag {
             display: inline-block;
@@ -530,17 +708,30 @@ HTML_TEMPLATE = '''
             text-transform: uppercase;
             letter-spacing: 0.5px;
         }
-        .tier-tag.wc { background: var(--tag-wc); color: #1a1a1a; }
-        .tier-tag.extra { background: var(--tag-extra); color: #fff; }
-        .tier-tag.walkon { background: var(--tag-walkon); color: #ccc; }
-
-        .status-dots { display: inline-flex; gap: 3px; margin-left: 6px; }
-        .status-dot {
-            width: 8px; height: 8px; border-radius: 50%;
+        /* Rows carry the raw tier in data-tier; colour and short label come from here */
+        .tier-tag[data-tier="Wild Card"] { background: var(--tag-wc); color: var(--on-accent); }
+        .tier-tag[data-tier="Wild Card"]::after { content: 'WC'; }
+        .tier-tag[data-tier="Extra"] { background: var(--tag-extra); color: var(--on-dark); }
+        .tier-tag[data-tier="Extra"]::after { content: 'EXT'; }
+        .tier-tag[data-tier="Walk-On"] { background: var(--tag-walkon); color: var(--on-walkon); }
+        .tier-tag[data-tier="Walk-On"]::after { content: 'W-O'; }
+
+        /* One element per row: three dots painted as gradients, lit by a
+           data-mask bitmask (1 = stats, 2 = narrative, 4 = FG ready) */
+        .status-dots {
+            --dot-stats: var(--border); --dot-narrative: var(--border); --dot-fg: var(--border);
             display: inline-block;
-        }
-        .status-dot.on { background: var(--green); }
-        .status-dot.off { background: var(--border); }
+            width: 30px; height: 8px;
+            margin-left: 6px;
+            vertical-align: middle;
+            background:
+                radial-gradient(circle 4px, var(--dot-stats) 90%, transparent) 0 0 / 8px 8px no-repeat,
+                radial-gradient(circle 4px, var(--dot-narrative) 90%, transparent) 11px 0 / 8px 8px no-repeat,
+                radial-gradient(circle 4px, var(--dot-fg) 90%, transparent) 22px 0 / 8px 8px no-repeat;
+        }
+        .status-dots:is([data-mask="1"], [data-mask="3"], [data-mask="5"], [data-mask="7"]) { --dot-stats: var(--green); }
+        .status-dots:is([data-mask="2"], [data-mask="3"], [data-mask="6"], [data-mask="7"]) { --dot-narrative: var(--green); }
+        .status-dots:is([data-mask="4"], [data-mask="5"], [data-mask="6"], [data-mask="7"]) { --dot-fg: var(--green); }
 
         .sidebar-footer {
             padding: 8px 10px;
@@ -564,6 +755,7 @@ HTML_TEMPLATE = '''
         }
 
         /* --- NPC DETAIL VIEW --- */
+        .main [hidden] { display: none !important; }
         .npc-header {
             margin-bottom: 0;
             padding: 12px 0;
@@ -637,10 +829,10 @@ HTML_TEMPLATE = '''
             line-height: 1.6;
         }
         .section-content p { margin-bottom: 4px; }
-        .section[onclick] { cursor: pointer; border-radius: 4px; padding: 4px 8px; margin-left: -8px; margin-right: -8px; }
-        .section[onclick]:hover { background: rgba(255,255,255,0.03); }
-        .section[onclick] h3::after { content: ''; }
-        .npc-quote[onclick]:hover { background: rgba(255,255,255,0.03); border-radius: 4px; }
+        .section[data-action] { cursor: pointer; border-radius: 4px; padding: 4px 8px; margin-left: -8px; margin-right: -8px; }
+        .section[data-action]:hover { background: rgba(255,255,255,0.03); }
+        .section[data-action] h3::after { content: ''; }
+        .npc-quote[data-action]:hover { background: rgba(255,255,255,0.03); border-radius: 4px; }
 
         /* --- TABLES --- */
         table.data-table {
@@ -658,7 +850,7 @@ HTML_TEMPLATE = '''
         }
         table.data-table td {
             padding: 4px 8px;
-            border-bottom: 1px solid #2a2a2a;
+            border-bottom: 1px solid var(--border-faint);
         }
 
         /* --- TAGS --- */
@@ -882,7 +1074,7 @@ HTML_TEMPLATE = '''
         }
         .stat-block-panel .clickable-section {
             padding: 8px 0;
-            border-bottom: 1px solid #2a2a2a;
+            border-bottom: 1px solid var(--border-faint);
             cursor: pointer;
         }
         .stat-block-panel .clickable-section:first-of-type {
@@ -916,8 +1108,8 @@ HTML_TEMPLATE = '''
             display: flex;
             gap: 12px;
             padding: 6px 0;
-            border-top: 1px solid #2a2a2a;
-            border-bottom: 1px solid #2a2a2a;
+            border-top: 1px solid var(--border-faint);
+            border-bottom: 1px solid var(--border-faint);
             margin: 6px 0;
         }
         .stat-block-panel .derived-item {
@@ -961,7 +1153,7 @@ HTML_TEMPLATE = '''
         }
         .weapon-entry {
             padding: 4px 0;
-            border-bottom: 1px solid #2a2a2a;
+            border-bottom: 1px solid var(--border-faint);
             font-size: 12px;
         }
         .weapon-entry:last-child { border-bottom: none; }
@@ -991,9 +1183,9 @@ HTML_TEMPLATE = '''
         }
         .btn:hover { background: var(--bg-hover); border-color: var(--accent-dim); }
         .btn.primary { background: var(--accent-dim); color: var(--text-bright); border-color: var(--accent); }
-        .btn.primary:hover { background: var(--accent); color: #1a1a1a; }
+        .btn.primary:hover { background: var(--accent); color: var(--on-accent); }
         .btn.danger { border-color: var(--red); }
-        .btn.danger:hover { background: var(--red); color: #fff; }
+        .btn.danger:hover { background: var(--red); color: var(--on-dark); }
         .btn.sm { padding: 3px 8px; font-size: 11px; }
 
         /* --- FORMS / MODAL --- */
@@ -1054,6 +1246,17 @@ HTML_TEMPLATE = '''
             justify-content: flex-end;
         }
 
+        /* Let the browser skip layout/paint of detail cards scrolled out of view;
+           "auto" remembers each card's last rendered size once it has been seen */
+        .stat-block-panel, .section, .actions-bar, .export-panel {
+            content-visibility: auto;
+            contain-intrinsic-size: auto 300px;
+        }
+        .weapons-panel {
+            content-visibility: auto;
+            contain-intrinsic-size: auto 100px;
+        }
+
         /* --- EXPORT PANEL --- */
         .export-panel {
             background: var(--bg-card);
@@ -1103,7 +1306,7 @@ HTML_TEMPLATE = '''
         ::-webkit-scrollbar { width: 8px; }
         ::-webkit-scrollbar-track { background: var(--bg-dark); }
         ::-webkit-scrollbar-thumb { background: var(--border); border-radius: 4px; }
-        ::-webkit-scrollbar-thumb:hover { background: #555; }
+        ::-webkit-scrollbar-thumb:hover { background: var(--scrollbar-hover); }
 
         /* ── DERIVED STAT POPOVERS (fixed-position, no clipping) ── */
         .derived-item { position: relative; cursor: help; }
@@ -1111,7 +1314,7 @@ HTML_TEMPLATE = '''
         #globalTooltip {
             display: none;
             position: fixed;
-            background: #1e1e22;
+            background: var(--bg-popover);
             border: 1px solid var(--accent-dim);
             border-radius: 6px;
             padding: 10px 14px;
@@ -1139,7 +1342,7 @@ HTML_TEMPLATE = '''
             font-size: 11px;
             margin-bottom: 6px;
             padding-bottom: 4px;
-            border-bottom: 1px solid #333;
+            border-bottom: 1px solid var(--popover-rule);
         }
         .pop-row {
             display: flex;
@@ -1148,7 +1351,7 @@ HTML_TEMPLATE = '''
             color: var(--text-dim);
         }
         .pop-row .pop-val { color: var(--text); font-family: monospace; font-weight: 600; }
-        .pop-divider { border-top: 1px solid #444; margin: 4px 0; }
+        .pop-divider { border-top: 1px solid var(--border-popover); margin: 4px 0; }
         .pop-total {
             display: flex;
             justify-content: space-between;
@@ -1173,11 +1376,11 @@ HTML_TEMPLATE = '''
             letter-spacing: 0.3px;
             user-select: none;
         }
-        .audit-badge.pass { background: rgba(70,160,70,0.15); color: #6c6; border: 1px solid rgba(70,160,70,0.3); }
-        .audit-badge.warn { background: rgba(200,160,40,0.15); color: #da3; border: 1px solid rgba(200,160,40,0.3); }
-        .audit-badge.fail { background: rgba(200,60,60,0.15); color: #e66; border: 1px solid rgba(200,60,60,0.3); }
+        .audit-badge.pass { background: rgba(70,160,70,0.15); color: var(--ok); border: 1px solid rgba(70,160,70,0.3); }
+        .audit-badge.warn { background: rgba(200,160,40,0.15); color: var(--warn); border: 1px solid rgba(200,160,40,0.3); }
+        .audit-badge.fail { background: rgba(200,60,60,0.15); color: var(--bad); border: 1px solid rgba(200,60,60,0.3); }
         .audit-panel {
-            background: #1a1a1e;
+            background: var(--bg-audit);
             border: 1px solid var(--border);
             border-radius: 6px;
             padding: 12px 16px;
@@ -1210,10 +1413,10 @@ HTML_TEMPLATE = '''
             line-height: 1.4;
         }
         .audit-finding .af-icon { flex-shrink: 0; width: 14px; text-align: center; }
-        .af-pass { color: #6c6; }
-        .af-warn { color: #da3; }
-        .af-fail { color: #e66; }
-        .af-info { color: #88f; }
+        .af-pass { color: var(--ok); }
+        .af-warn { color: var(--warn); }
+        .af-fail { color: var(--bad); }
+        .af-info { color: var(--info); }
     </style>
 </head>
 <body>
@@ -1233,9 +1436,9 @@ HTML_TEMPLATE = '''
     <!-- SIDEBAR -->
     <div class="sidebar">
         <div class="sidebar-controls">
-            <input type="text" id="searchInput" placeholder="Search NPCs..." oninput="filterNPCs()">
+            <input type="text" id="searchInput" placeholder="Search NPCs...">
             <div class="filter-row">
-                <select id="regionFilter" onchange="filterNPCs()">
+                <select id="regionFilter" onchange="scheduleFilter()">
                     <option value="">All Regions</option>
                     <option>Ammaria</option>
                     <option>Saltlands</option>
@@ -1244,7 +1447,7 @@ HTML_TEMPLATE = '''
                     <option>Glasrya</option>
                     <option>Global</option>
                 </select>
-                <select id="tierFilter" onchange="filterNPCs()">
+                <select id="tierFilter" onchange="scheduleFilter()">
                     <option value="">All Tiers</option>
                     <option>Wild Card</option>
                     <option>Extra</option>
@@ -1253,10 +1456,10 @@ HTML_TEMPLATE = '''
             </div>
         </div>
         <div class="npc-list" id="npcList"></div>
-        <div class="sidebar-footer">
-            <button class="btn primary" onclick="openAddModal()" style="flex:1">+ New NPC</button>
-            <button class="btn" onclick="showStatusView()">Status</button>
-            <button class="btn" onclick="openSettingsModal()" title="Settings">⚙️</button>
+        <div class="sidebar-footer" id="sidebarFooter">
+            <button class="btn primary" data-action="new-npc" style="flex:1">+ New NPC</button>
+            <button class="btn" data-action="status">Status</button>
+            <button class="btn" data-action="settings" title="Settings">⚙️</button>
         </div>
     </div>
 
@@ -1266,6 +1469,76 @@ HTML_TEMPLATE = '''
     </div>
 </div>
 
+<!-- EXPORT PANEL (cloned into an #exportOutput; title and text are set as text) -->
+<template id="exportPanelTemplate">
+    <div class="export-panel">
+        <h3 style="font-size:13px;color:var(--accent)"></h3>
+        <pre></pre>
+        <button class="btn sm" onclick="copyToClipboard(this)" style="margin-top:6px">Copy</button>
+    </div>
+</template>
+
+<!-- NPC DETAIL SKELETON (cloned once into #mainContent, then patched per selection) -->
+<template id="npcDetailTemplate">
+    <div class="npc-header">
+        <h2 data-ref="name"></h2>
+        <div class="npc-title-line" data-ref="title"></div>
+    </div>
+    <div class="detail-columns" id="detailColumns">
+        <div class="col-stats" id="colStats">
+            <div class="col-gauge" id="gaugeStats"></div>
+            <div class="col-stats-scroll">
+                <div data-ref="stats"></div>
+                <div class="summary-grid" data-ref="summary">
+                    <div class="weapons-panel panel-clickable"><h3 onclick="openDetailWorkspace('hindrances')">Hindrances ✎</h3><div data-ref="hindrances"></div><div data-ref="hindrancesNone" style="color:var(--text-dim);font-size:12px">None</div><div data-ref="hindrancesLegacy" style="font-size:10px;color:var(--text-dim)">Legacy</div></div>
+                    <div class="weapons-panel panel-clickable"><h3 onclick="openDetailWorkspace('edges')">Edges ✎</h3><div data-ref="edges"></div><div data-ref="edgesNone" style="color:var(--text-dim);font-size:12px">None</div><div data-ref="edgesLegacy" style="font-size:10px;color:var(--text-dim)">Legacy</div></div>
+                    <div class="weapons-panel panel-clickable"><h3 onclick="openDetailWorkspace('armor')">Armour ✎</h3><div data-ref="armor"></div><div data-ref="armorNone" style="color:var(--text-dim);font-size:12px">None</div></div>
+                    <div class="weapons-panel panel-clickable"><h3 onclick="openDetailWorkspace('weapons')">Weapons ✎</h3><div data-ref="weapons"></div><div data-ref="weaponsNone" style="color:var(--text-dim);font-size:12px">None</div></div>
+                    <div class="weapons-panel panel-clickable"><h3 onclick="openDetailWorkspace('powers')">Powers ✎</h3><div data-ref="powers"></div><div data-ref="powersNone" style="color:var(--text-dim);font-size:12px">None</div></div>
+                    <div class="weapons-panel panel-clickable"><h3 onclick="openDetailWorkspace('gear')">Gear ✎</h3><div data-ref="gear"></div><div data-ref="gearNone" style="color:var(--text-dim);font-size:12px">None</div><div data-ref="gearLegacy" style="font-size:10px;color:var(--text-dim)">Legacy</div></div>
+                </div>
+                <div id="exportOutput" data-ref="exportOutput"></div>
+            </div>
+            <div class="actions-bar-fixed">
+                <div style="width:100%;display:flex;gap:12px;margin-bottom:4px">
+                    <label style="font-size:11px;cursor:pointer"><input type="checkbox" data-ref="statStats" onchange="toggleStatus(currentNPC.id,'stat_block_complete',this.checked)"> Stats</label>
+                    <label style="font-size:11px;cursor:pointer"><input type="checkbox" data-ref="statNarrative" onchange="toggleStatus(currentNPC.id,'narrative_complete',this.checked)"> Narrative</label>
+                    <label style="font-size:11px;cursor:pointer"><input type="checkbox" data-ref="statFg" onchange="toggleStatus(currentNPC.id,'fg_export_ready',this.checked)"> FG Ready</label>
+                </div>
+                <button class="btn sm" data-action="edit">Edit</button>
+                <button class="btn sm" data-action="statblock">Stat Block</button>
+                <button class="btn sm" data-action="fgxml">FG XML</button>
+                <button class="btn sm danger" data-action="delete" style="margin-left:auto">Delete</button>
+            </div>
+        </div>
+        <div class="col-resizer" id="resizer1"></div>
+        <div class="col-workspace" id="workspacePanel" data-ref="workspace">
+            <div class="col-gauge" id="gaugeWorkspace" data-ref="wsGauge"></div>
+            <div class="workspace-empty" data-ref="wsEmpty">
+                <div>Click any panel heading to edit</div>
+                <div class="ws-hint">Weapons ✎ · Armour ✎ · Gear ✎ · Hindrances ✎ · Edges ✎ · Powers ✎</div>
+            </div>
+        </div>
+        <div class="col-resizer" id="resizer2"></div>
+        <div class="col-narrative" id="colNarrative">
+            <div class="col-gauge" id="gaugeNarrative"></div>
+            <div class="portrait-area">
+                <div class="portrait-frame" id="portraitFrame" data-ref="portraitFrame"></div>
+                <div class="portrait-actions">
+                    <span class="portrait-upload-btn" onclick="openPortraitGenerator(currentNPC.id)">⚡ Generate</span>
+                    <label class="portrait-upload-btn">
+                        Upload <input type="file" accept="image/*" style="display:none" onchange="uploadPortrait(currentNPC.id, this)">
+                    </label>
+                    <span class="portrait-upload-btn" data-ref="portraitRemove" onclick="deletePortrait(currentNPC.id)">Remove</span>
+                </div>
+            </div>
+            <div class="npc-quote" data-ref="quote" data-action="workspace" data-ws="quote" style="cursor:pointer"></div>
+            <div class="section" data-ref="quoteEmpty" data-action="workspace" data-ws="quote" style="cursor:pointer"><h3>Quote ✎</h3><div class="section-content" style="color:var(--text-dim)">No quote set</div></div>
+            <div data-ref="narrative"></div>
+        </div>
+    </div>
+</template>
+
 <!-- ADD/EDIT MODAL -->
 <div class="modal-overlay" id="npcModal">
     <div class="modal">
@@ -1334,11 +1607,7 @@ HTML_TEMPLATE = '''
         </div>
 
         <div class="form-row">
-            <div class="form-group"><label>Agility</label><select id="f_agility" class="die-select"><option value="0">—</option><option value="4">d4</option><option value="6">d6</option><option value="8">d8</option><option value="10">d10</option><option value="12">d12</option></select></div>
-            <div class="form-group"><label>Smarts</label><select id="f_smarts" class="die-select"><option value="0">—</option><option value="4">d4</option><option value="6">d6</option><option value="8">d8</option><option value="10">d10</option><option value="12">d12</option></select></div>
-            <div class="form-group"><label>Spirit</label><select id="f_spirit" class="die-select"><option value="0">—</option><option value="4">d4</option><option value="6">d6</option><option value="8">d8</option><option value="10">d10</option><option value="12">d12</option></select></div>
-            <div class="form-group"><label>Strength</label><select id="f_strength" class="die-select"><option value="0">—</option><option value="4">d4</option><option value="6">d6</option><option value="8">d8</option><option value="10">d10</option><option value="12">d12</option></select></div>
-            <div class="form-group"><label>Vigor</label><select id="f_vigor" class="die-select"><option value="0">—</option><option value="4">d4</option><option value="6">d6</option><option value="8">d8</option><option value="10">d10</option><option value="12">d12</option></select></div>
+            <!-- ATTRIBUTE_DIE_SELECTS -->
         </div>
 
         <div class="form-row">
@@ -1468,6 +1737,13 @@ HTML_TEMPLATE = '''
 // ============================================================
 let allNPCs = [];
 let currentNPC = null;
+// Full NPC records by id. Any write through api() drops the whole cache, so a
+// re-selection after a mutation always refetches; plain clicks between NPCs
+// are served from memory.
+const npcCache = new Map();
+// Bumped when every write in api() starts and settles; a GET started under an
+// older value may have read pre-write rows, so its result is returned but not cached.
+let writeGeneration = 0;
 let currentSkillsNpcId = null;
 let currentWeaponsNpcId = null;
 let currentArmorNpcId = null;
@@ -1475,90 +1751,296 @@ let currentGearNpcId = null;
 let currentHindrancesNpcId = null;
 let currentEdgesNpcId = null;
 let currentPowersNpcId = null;
+// Last-fetched rows for the open skills/weapons/armour/gear list; adds and
+// deletes patch these in place instead of re-GETting the whole list
+let currentSkillsList = [], currentWeaponsList = [], currentArmorList = [], currentGearList = [];
+
+// Modals are static markup parsed once with the page; keep handles so opening
+// one is a class toggle plus field writes rather than a lookup or re-render.
+const npcModal = document.getElementById('npcModal');
+const npcModalTitle = document.getElementById('modalTitle');
+const skillsModal = document.getElementById('skillsModal');
+const settingsModal = document.getElementById('settingsModal');
+
+// Map a form's inputs by id (minus prefix) once, so handlers read F.name.value
+// instead of repeating getElementById for every field on every call.
+function formFields(root, prefix) {
+    const fields = {};
+    root.querySelectorAll(`[id^="${prefix}"]`).forEach(el => { fields[el.id.slice(prefix.length)] = el; });
+    return fields;
+}
+const F = formFields(npcModal, 'f_');          // NPC modal
+F.editId = npcModal.querySelector('#editId');
+let editWSFields = null;                        // Edit workspace (same f_ ids)
+let W = {}, A = {}, S = {};                     // add-weapon / add-armour / add-skill forms
+let G = {}, H = {}, E = {}, P = {};             // add-gear / hindrance / edge / power forms
 
 // ============================================================
 // API CALLS
 // ============================================================
-async function api(url, method='GET', body=null) {
+// Identical GETs issued while one is still in flight share its promise
+const inflightGets = new Map();
+function api(url, method='GET', body=null) {
+    if (method === 'GET') {
+        let pending = inflightGets.get(url);
+        if (!pending) {
+            // Only drop our own entry: a write may have cleared the map and a newer GET taken the slot
+            pending = fetch(url).then(r => r.json()).finally(() => {
+                if (inflightGets.get(url) === pending) inflightGets.delete(url);
+            });
+            inflightGets.set(url, pending);
+        }
+        return pending;
+    }
+    // A write makes earlier reads stale: later GETs must not join them
+    writeGeneration++;
+    npcCache.clear();
+    inflightGets.clear();
     const opts = { method, headers: {'Content-Type': 'application/json'} };
     if (body) opts.body = JSON.stringify(body);
-    const r = await fetch(url, opts);
-    return r.json();
+    // Bump again once it lands, so GETs that overlapped the write aren't cached either
+    return fetch(url, opts).then(r => r.json()).finally(() => { writeGeneration++; });
+}
+
+async function fetchNPC(id) {
+    let n = npcCache.get(id);
+    if (!n) {
+        const gen = writeGeneration;
+        n = await api(`/api/npcs/${id}`);
+        if (gen === writeGeneration) npcCache.set(id, n);
+    }
+    return n;
+}
+
+// The detail record already carries every item list, so the workspaces read
+// their rows from it: usually a cache hit, otherwise one request for all of
+// them. Any add/delete clears npcCache, so the next load sees fresh rows.
+async function npcItems(id, key) {
+    return (await fetchNPC(id))[key];
 }
 
 // ============================================================
 // LOAD & FILTER
 // ============================================================
 async function loadNPCs() {
-    allNPCs = await api('/api/npcs');
+    // Full records, so selecting from the list is served by npcCache
+    const gen = writeGeneration;
+    allNPCs = await api('/api/npcs?full=1');
+    if (gen === writeGeneration) for (const n of allNPCs) npcCache.set(n.id, n);
+    buildNPCIndex();
     filterNPCs();
     updateHeaderStats();
 }
 
-function filterNPCs() {
-    const search = document.getElementById('searchInput').value.toLowerCase();
-    const region = document.getElementById('regionFilter').value;
-    const tier = document.getElementById('tierFilter').value;
-
-    let filtered = allNPCs.filter(n => {
-        if (region && n.region !== region) return false;
-        if (tier && n.tier !== tier) return false;
-        if (search && !n.name.toLowerCase().includes(search)
-            && !(n.title||'').toLowerCase().includes(search)
-            && !(n.organisations||'').toLowerCase().includes(search))
-            return false;
-        return true;
+// Sidebar is a virtual list: only the rows in view (plus overscan) exist in the DOM
+const NPC_ITEM_HEIGHT = 48;    // .npc-item height + 2px gap
+const NPC_LIST_OVERSCAN = 6;
+let filteredIdx = new Int32Array(0);  // allNPCs indices of the current matches
+let filteredCount = 0;
+let lastFilterKey = null;
+let npcListFramePending = false;
+let npcFilterFrame = 0;
+let npcWindowStart = -1, npcWindowEnd = -1;  // row range currently materialised
+let renderedById = new Map();  // npc id → .npc-item node currently in the window
+
+// Struct-of-arrays view of allNPCs, rebuilt once per load: filtering walks
+// flat arrays of pre-lowered strings instead of re-reading NPC objects.
+let npcIndex = { search: [], region: [], tier: [], byRegion: new Map(), byTier: new Map(), all: new Int32Array(0), matches: new Int32Array(0) };
+const NO_MATCHES = new Int32Array(0);
+
+function bucketIndices(values) {
+    const groups = new Map();
+    values.forEach((v, i) => {
+        if (!groups.has(v)) groups.set(v, []);
+        groups.get(v).push(i);
     });
+    const buckets = new Map();
+    groups.forEach((list, v) => buckets.set(v, Int32Array.from(list)));
+    return buckets;
+}
+
+function buildNPCIndex() {
+    const region = allNPCs.map(n => n.region);
+    const tier = allNPCs.map(n => n.tier);
+    npcIndex = {
+        // Newline-joined so a match can't span fields
+        search: allNPCs.map(n => [n.name, n.title || '', n.archetype || '', n.organisations || ''].join('\\n').toLowerCase()),
+        region,
+        tier,
+        byRegion: bucketIndices(region),
+        byTier: bucketIndices(tier),
+        all: Int32Array.from(allNPCs.keys()),
+        matches: new Int32Array(allNPCs.length),  // reused result buffer
+    };
+}
+
+// Sidebar controls are static markup: look them up once. The region/tier
+// option lists are fixed too, so nothing scans allNPCs to build them.
+const searchInput = document.getElementById('searchInput');
+const regionFilter = document.getElementById('regionFilter');
+const tierFilter = document.getElementById('tierFilter');
+const npcListEl = document.getElementById('npcList');
+
+function filterNPCs(onlyIfChanged) {
+    const rawSearch = searchInput.value;
+    const search = rawSearch && rawSearch.toLowerCase();
+    const region = regionFilter.value;
+    const tier = tierFilter.value;
+
+    // New filter criteria → back to the top; same criteria (e.g. reload) keeps position
+    const filterKey = [search, region, tier].join('|');
+    if (onlyIfChanged && filterKey === lastFilterKey) return;
+    if (filterKey !== lastFilterKey) {
+        npcListEl.scrollTop = 0;
+        lastFilterKey = filterKey;
+    }
+
+    // No criteria: the roster itself is the result, nothing to scan or copy
+    if (!search && !region && !tier) {
+        renderNPCList(npcIndex.all, allNPCs.length);
+        return;
+    }
+
+    // Start from the smaller dropdown bucket so only its members are scanned
+    const idx = npcIndex;
+    let candidates = null;
+    if (region) candidates = idx.byRegion.get(region) || NO_MATCHES;
+    if (tier) {
+        const tierBucket = idx.byTier.get(tier) || NO_MATCHES;
+        if (!candidates || tierBucket.length < candidates.length) candidates = tierBucket;
+    }
 
-    renderNPCList(filtered);
+    // Single pass writing matching indices into the preallocated buffer; no
+    // intermediate arrays or per-item closures on a keystroke
+    const out = idx.matches;
+    const count = candidates ? candidates.length : allNPCs.length;
+    let matched = 0;
+    for (let k = 0; k < count; k++) {
+        const i = candidates ? candidates[k] : k;
+        if (region && idx.region[i] !== region) continue;
+        if (tier && idx.tier[i] !== tier) continue;
+        if (search && idx.search[i].indexOf(search) === -1) continue;
+        out[matched++] = i;
+    }
+
+    renderNPCList(out, matched);
 }
 
-function renderNPCList(npcs) {
-    const el = document.getElementById('npcList');
-    if (!npcs.length) {
+function renderNPCList(indices, count) {
+    filteredIdx = indices;
+    filteredCount = count;
+    const el = npcListEl;
+    if (!count) {
         el.innerHTML = '<div style="padding:20px;text-align:center;color:var(--text-dim)">No NPCs found</div>';
+        renderedById = new Map();
         return;
     }
+    if (!document.getElementById('npcListSpacer')) {
+        el.innerHTML = '<div class="npc-list-spacer" id="npcListSpacer"></div>';
+        renderedById = new Map();
+    }
+    document.getElementById('npcListSpacer').style.height = (count * NPC_ITEM_HEIGHT) + 'px';
+    renderNPCWindow(true);
+}
 
-    el.innerHTML = npcs.map(n => {
-        const tierClass = n.tier === 'Wild Card' ? 'wc' : n.tier === 'Extra' ? 'extra' : 'walkon';
-        const active = currentNPC && currentNPC.id === n.id ? 'active' : '';
-        const title = n.title ? ` — ${n.title}` : '';
-        const orgs = n.organisations ? ` · ${n.organisations}` : '';
-        return `
-            <div class="npc-item ${active}" onclick="selectNPC(${n.id})">
-                <div class="npc-name">
-                    ${n.name}
-                    <span class="tier-tag ${tierClass}">${n.tier === 'Wild Card' ? 'WC' : n.tier === 'Walk-On' ? 'W-O' : 'EXT'}</span>
-                    <span class="status-dots" title="Stats / Narrative / FG">
-                        <span class="status-dot ${n.stat_block_complete ? 'on' : 'off'}"></span>
-                        <span class="status-dot ${n.narrative_complete ? 'on' : 'off'}"></span>
-                        <span class="status-dot ${n.fg_export_ready ? 'on' : 'off'}"></span>
-                    </span>
-                </div>
-                <div class="npc-meta">${n.region}${title}${orgs}</div>
-            </div>`;
-    }).join('');
+function renderNPCWindow(force) {
+    const el = npcListEl;
+    const spacer = document.getElementById('npcListSpacer');
+    if (!spacer) return;
+    const visible = Math.ceil(el.clientHeight / NPC_ITEM_HEIGHT);
+    const start = Math.max(0, Math.floor(el.scrollTop / NPC_ITEM_HEIGHT) - NPC_LIST_OVERSCAN);
+    const end = Math.min(filteredCount, start + visible + 2 * NPC_LIST_OVERSCAN);
+    // Scrolling within the overscan band leaves the same rows in place
+    if (!force && start === npcWindowStart && end === npcWindowEnd) return;
+    npcWindowStart = start;
+    npcWindowEnd = end;
+
+    // Keyed by NPC id: rows still in the window keep their node (only top/class
+    // and changed markup are touched), new rows go in via one fragment append.
+    const next = new Map();
+    const frag = document.createDocumentFragment();
+    for (let i = start; i < end; i++) {
+        const n = allNPCs[filteredIdx[i]];
+        let row = renderedById.get(n.id);
+        if (row) {
+            renderedById.delete(n.id);
+        } else {
+            row = document.createElement('div');
+            row.dataset.id = n.id;
+            frag.appendChild(row);
+        }
+        row._npc = n;
+        row.className = currentNPC && currentNPC.id === n.id ? 'npc-item active' : 'npc-item';
+        row.style.top = (i * NPC_ITEM_HEIGHT) + 'px';
+        patchHTML(row, npcRowHTML(n));
+        next.set(n.id, row);
+    }
+    renderedById.forEach(row => row.remove());
+    renderedById = next;
+    if (frag.firstChild) spacer.appendChild(frag);
 }
 
+function statusMask(n) {
+    return (n.stat_block_complete ? 1 : 0) | (n.narrative_complete ? 2 : 0) | (n.fg_export_ready ? 4 : 0);
+}
+
+// Row markup as constant chunks joined with +; optional title/orgs add nothing when empty
+const ROW_NAME = '<div class="npc-name">';
+const ROW_TIER = ' <span class="tier-tag" data-tier="';
+const ROW_DOTS = '"></span> <span class="status-dots" title="Stats / Narrative / FG" data-mask="';
+const ROW_META = '"></span></div><div class="npc-meta">';
+const ROW_END = '</div>';
+
+function npcRowHTML(n) {
+    let meta = n.region;
+    if (n.title) meta += ' — ' + n.title;
+    if (n.organisations) meta += ' · ' + n.organisations;
+    return ROW_NAME + n.name + ROW_TIER + n.tier + ROW_DOTS + statusMask(n) + ROW_META + meta + ROW_END;
+}
+
+// Header counters: markup is built once, later loads only rewrite the numbers that moved
+let headerStatNums = null;
+
 function updateHeaderStats() {
     const total = allNPCs.length;
-    const complete = allNPCs.filter(n => n.stat_block_complete && n.narrative_complete).length;
-    const fgReady = allNPCs.filter(n => n.fg_export_ready).length;
-    document.getElementById('headerStats').innerHTML = `
-        <span><span class="stat-num">${total}</span> NPCs</span>
-        <span><span class="stat-num">${complete}</span> Complete</span>
-        <span><span class="stat-num">${fgReady}</span> FG Ready</span>`;
+    let complete = 0, fgReady = 0;
+    for (let i = 0; i < total; i++) {
+        const n = allNPCs[i];
+        if (n.stat_block_complete && n.narrative_complete) complete++;
+        if (n.fg_export_ready) fgReady++;
+    }
+    if (!headerStatNums) {
+        const el = document.getElementById('headerStats');
+        el.innerHTML = `
+        <span><span class="stat-num"></span> NPCs</span>
+        <span><span class="stat-num"></span> Complete</span>
+        <span><span class="stat-num"></span> FG Ready</span>`;
+        headerStatNums = el.querySelectorAll('.stat-num');
+    }
+    [total, complete, fgReady].forEach((v, i) => {
+        const num = headerStatNums[i];
+        if (num.textContent !== String(v)) num.textContent = v;
+    });
 }
 
 // ============================================================
 // NPC DETAIL VIEW
 // ============================================================
 async function selectNPC(id) {
-    const data = await api(`/api/npcs/${id}`);
+    const data = await fetchNPC(id);
+    const prevId = currentNPC && currentNPC.id;
     currentNPC = data;
     renderNPCDetail(data);
-    filterNPCs(); // refresh active state
+    markActiveRow(prevId, data.id);
+}
+
+// Move the highlight between the two affected rows; rows scrolled into view
+// later pick up the active class from renderNPCWindow
+function markActiveRow(prevId, id) {
+    const prev = renderedById.get(prevId);
+    if (prev) prev.classList.remove('active');
+    const row = renderedById.get(id);
+    if (row) row.classList.add('active');
 }
 
 function dieStr(v) { return v > 0 ? 'd'+v : '—'; }
@@ -2132,38 +2614,42 @@ function buildToughPopover(n) {
     return html;
 }
 
+// SWADE derived-stat checks and their popovers depend only on the record, so
+// they are computed once per fetched NPC object. Any mutation empties npcCache
+// and the refetched object starts without _derived.
+function derivedChecks(n) {
+    if (n._derived) return n._derived;
+    const fightingSkill = (n.skills||[]).find(s => s.name === 'Fighting');
+    const fightingDie = fightingSkill ? fightingSkill.die : 0;
+    const expectedPace = 6;
+    const expectedParry = fightingDie > 0 ? 2 + Math.floor(fightingDie / 2) : 2;
+    const expectedToughness = 2 + Math.floor(n.vigor / 2) + (n.toughness_armor || 0);
+    n._derived = {
+        paceOk: n.pace === expectedPace,
+        parryOk: n.parry === expectedParry,
+        toughOk: n.toughness === expectedToughness,
+        pacePop: buildPacePopover(n, fightingDie),
+        parryPop: buildParryPopover(n, fightingDie),
+        toughPop: buildToughPopover(n),
+    };
+    return n._derived;
+}
+
 function renderNPCDetail(n) {
-    const el = document.getElementById('mainContent');
-    el.classList.remove('empty-state');
+    const refs = mountNPCDetail();
 
     const wcLabel = n.tier === 'Wild Card' ? ' ★' : '';
     const tierText = n.tier === 'Wild Card' ? 'Wild Card' : n.tier;
-    const titleLine = n.title ? `<div class="npc-title-line">${n.title}</div>` : '';
-    const safeName = n.name.replace(/'/g,"\\\\'").replace(/"/g,"&quot;");
-    const quote = n.quote ? `<div class="npc-quote" onclick="toggleWorkspace('quote',${n.id},'${safeName}')" style="cursor:pointer">"${n.quote}"</div>` : `<div class="section" onclick="toggleWorkspace('quote',${n.id},'${safeName}')" style="cursor:pointer"><h3>Quote ✎</h3><div class="section-content" style="color:var(--text-dim)">No quote set</div></div>`;
 
     // ── COLUMN 2: STAT BLOCK ──
     let statsPanel = '';
     if (n.agility > 0) {
         const tough = n.toughness_armor > 0 ? `${n.toughness} (${n.toughness_armor})` : `${n.toughness}`;
-        const fightingSkill = (n.skills||[]).find(s => s.name === 'Fighting');
-        const fightingDie = fightingSkill ? fightingSkill.die : 0;
-        const expectedPace = 6;
-        const expectedParry = fightingDie > 0 ? 2 + Math.floor(fightingDie / 2) : 2;
-        const expectedToughBase = 2 + Math.floor(n.vigor / 2);
-        const expectedToughness = expectedToughBase + (n.toughness_armor || 0);
-        const paceOk = n.pace === expectedPace;
-        const parryOk = n.parry === expectedParry;
-        const toughOk = n.toughness === expectedToughness;
+        const { paceOk, parryOk, toughOk, pacePop, parryPop, toughPop } = derivedChecks(n);
         const paceColour = paceOk ? 'var(--success, #4a4)' : 'var(--danger, #c44)';
         const parryColour = parryOk ? 'var(--success, #4a4)' : 'var(--danger, #c44)';
         const toughColour = toughOk ? 'var(--success, #4a4)' : 'var(--danger, #c44)';
 
-        // Build popovers
-        const pacePop = buildPacePopover(n, fightingDie);
-        const parryPop = buildParryPopover(n, fightingDie);
-        const toughPop = buildToughPopover(n);
-
         // Build audit
         const auditFindings = auditCharacter(n);
         const auditBadge = renderAuditBadge(n.id, auditFindings);
@@ -2192,8 +2678,8 @@ function renderNPCDetail(n) {
                     <span class="stat-block-tier">${tierText}${wcLabel}</span>
                     ${auditBadge}
                 </div>
-                <div class="clickable-section" onclick="toggleWorkspace('attributes',${n.id},'${safeName}')"><h3>Attributes ✎</h3><div class="stat-val">Agility ${dieStr(n.agility)}, Smarts ${dieStr(n.smarts)}, Spirit ${dieStr(n.spirit)}, Strength ${dieStr(n.strength)}, Vigor ${dieStr(n.vigor)}</div></div>
-                <div class="clickable-section" onclick="toggleWorkspace('skills',${n.id},'${safeName}')"><h3>Skills ✎</h3><div class="stat-val">${skills || '<span style="color:var(--text-dim)">None</span>'}</div></div>
+                <div class="clickable-section" data-action="workspace" data-ws="attributes"><h3>Attributes ✎</h3><div class="stat-val">Agility ${dieStr(n.agility)}, Smarts ${dieStr(n.smarts)}, Spirit ${dieStr(n.spirit)}, Strength ${dieStr(n.strength)}, Vigor ${dieStr(n.vigor)}</div></div>
+                <div class="clickable-section" data-action="workspace" data-ws="skills"><h3>Skills ✎</h3><div class="stat-val">${skills || '<span style="color:var(--text-dim)">None</span>'}</div></div>
                 <div class="derived-row">
                     <div class="derived-item" onmouseenter="showDerivedTip(this)" onmouseleave="hideDerivedTip()"><div class="derived-num" style="color:${paceColour}">${n.pace}</div><div class="derived-label">Pace</div><div class="derived-popover">${pacePop}</div></div>
                     <div class="derived-item" onmouseenter="showDerivedTip(this)" onmouseleave="hideDerivedTip()"><div class="derived-num" style="color:${parryColour}">${n.parry}</div><div class="derived-label">Parry</div><div class="derived-popover">${parryPop}</div></div>
@@ -2203,260 +2689,297 @@ function renderNPCDetail(n) {
                 ${hindrances}${edges}${powers}${specials}
             </div>`;
     } else {
-        statsPanel = `<div class="stat-block-panel"><div class="stat-block-header-row"><span class="stat-block-tier">${tierText}</span></div><div style="color:var(--text-dim);font-size:12px">No attributes set. <button class="btn sm" onclick="toggleWorkspace('edit',${n.id},'${safeName}')">Edit NPC</button></div></div>`;
+        statsPanel = `<div class="stat-block-panel"><div class="stat-block-header-row"><span class="stat-block-tier">${tierText}</span></div><div style="color:var(--text-dim);font-size:12px">No attributes set. <button class="btn sm" data-action="workspace" data-ws="edit">Edit NPC</button></div></div>`;
     }
 
+    refs.name.textContent = n.name;
+    refs.title.textContent = n.title || '';
+    refs.title.hidden = !n.title;
+    patchHTML(refs.stats, statsPanel);
+
     // Summary panels — compact, click header to open workspace
-    const wepSummary = (n.weapons && n.weapons.length) ?
-        n.weapons.map(w => `<div class="weapon-entry"><span class="wep-name">${w.name}</span> (${w.damage_str}${w.armor_piercing ? ', AP '+w.armor_piercing : ''}${w.range ? ', Range '+w.range : ''})</div>`).join('') :
-        '<div style="color:var(--text-dim);font-size:12px">None</div>';
-    const weaponsPanel = `<div class="weapons-panel panel-clickable"><h3 onclick="openWorkspace('weapons',${n.id},'${safeName}')">Weapons ✎</h3>${wepSummary}</div>`;
-
-    const armSummary = (n.armor && n.armor.length) ?
-        n.armor.map(a => `<div class="weapon-entry"><span class="wep-name">${a.name}</span> (+${a.protection}${a.area_protected ? ' — '+a.area_protected : ''})</div>`).join('') :
-        '<div style="color:var(--text-dim);font-size:12px">None</div>';
-    const armorPanel = `<div class="weapons-panel panel-clickable"><h3 onclick="openWorkspace('armor',${n.id},'${safeName}')">Armour ✎</h3>${armSummary}</div>`;
-
-    let gearSummary = '';
-    if (n.gear_items && n.gear_items.length) {
-        gearSummary = n.gear_items.map(g => `<div class="weapon-entry">${g.name}${g.quantity > 1 ? ' ×'+g.quantity : ''}</div>`).join('');
-    } else if ((n.gear||[]).length) {
-        gearSummary = n.gear.map(g => `<div class="weapon-entry">${g}</div>`).join('') + '<div style="font-size:10px;color:var(--text-dim)">Legacy</div>';
-    } else {
-        gearSummary = '<div style="color:var(--text-dim);font-size:12px">None</div>';
-    }
-    const gearPanel = `<div class="weapons-panel panel-clickable"><h3 onclick="openWorkspace('gear',${n.id},'${safeName}')">Gear ✎</h3>${gearSummary}</div>`;
-
-    const hindSummary = (n.hindrance_items && n.hindrance_items.length) ?
-        n.hindrance_items.map(h => `<div class="weapon-entry">${h.name} (${h.severity}${h.notes ? ' — '+h.notes : ''})</div>`).join('') :
-        ((n.hindrances||[]).length ? n.hindrances.map(h => `<div class="weapon-entry">${h}</div>`).join('') + '<div style="font-size:10px;color:var(--text-dim)">Legacy</div>' : '<div style="color:var(--text-dim);font-size:12px">None</div>');
-    const hindrancesPanel = `<div class="weapons-panel panel-clickable"><h3 onclick="openWorkspace('hindrances',${n.id},'${safeName}')">Hindrances ✎</h3>${hindSummary}</div>`;
-
-    const edgSummary = (n.edge_items && n.edge_items.length) ?
-        n.edge_items.map(e => `<div class="weapon-entry">${e.name}${e.notes ? ' ('+e.notes+')' : ''}</div>`).join('') :
-        ((n.edges||[]).length ? n.edges.map(e => `<div class="weapon-entry">${e}</div>`).join('') + '<div style="font-size:10px;color:var(--text-dim)">Legacy</div>' : '<div style="color:var(--text-dim);font-size:12px">None</div>');
-    const edgesPanel = `<div class="weapons-panel panel-clickable"><h3 onclick="openWorkspace('edges',${n.id},'${safeName}')">Edges ✎</h3>${edgSummary}</div>`;
-
-    const powSummary = (n.power_items && n.power_items.length) ?
-        n.power_items.map(p => `<div class="weapon-entry">${p.name}${p.trapping ? ' ['+p.trapping+']' : ''}</div>`).join('') :
-        '<div style="color:var(--text-dim);font-size:12px">None</div>';
-    const powersPanel = `<div class="weapons-panel panel-clickable"><h3 onclick="openWorkspace('powers',${n.id},'${safeName}')">Powers ✎</h3>${powSummary}</div>`;
-
-    // Tactics
-    const tacticsHtml = `<div class="section" onclick="toggleWorkspace('narrative',${n.id},'${safeName}')" style="cursor:pointer"><h3>Tactics ✎</h3><div class="section-content">${n.tactics || '<span style="color:var(--text-dim)">Not set</span>'}</div></div>`;
-
-    // Action buttons + production status
-    const statusHtml = `
-        <div class="actions-bar-fixed">
-            <div style="width:100%;display:flex;gap:12px;margin-bottom:4px">
-                <label style="font-size:11px;cursor:pointer"><input type="checkbox" ${n.stat_block_complete?'checked':''} onchange="toggleStatus(${n.id},'stat_block_complete',this.checked)"> Stats</label>
-                <label style="font-size:11px;cursor:pointer"><input type="checkbox" ${n.narrative_complete?'checked':''} onchange="toggleStatus(${n.id},'narrative_complete',this.checked)"> Narrative</label>
-                <label style="font-size:11px;cursor:pointer"><input type="checkbox" ${n.fg_export_ready?'checked':''} onchange="toggleStatus(${n.id},'fg_export_ready',this.checked)"> FG Ready</label>
-            </div>
-            <button class="btn sm" onclick="toggleWorkspace('edit',${n.id},'${safeName}')">Edit</button>
-            <button class="btn sm" onclick="toggleWorkspace('statblock',${n.id},'${safeName}')">Stat Block</button>
-            <button class="btn sm" onclick="toggleWorkspace('fgxml',${n.id},'${safeName}')">FG XML</button>
-            <button class="btn sm danger" onclick="deleteNPC(${n.id})" style="margin-left:auto">Delete</button>
-        </div>`;
+    renderWhenVisible(refs.summary, () => {
+        // Placeholder NPCs (no attributes, nothing attached) just reset every panel to "None"
+        if (isStubNPC(n)) {
+            for (const key of SUMMARY_PANELS) patchSummary(refs, key, []);
+            return;
+        }
+        patchSummary(refs, 'hindrances', (n.hindrance_items && n.hindrance_items.length) ?
+            n.hindrance_items.map(h => `${h.name} (${h.severity}${h.notes ? ' — '+h.notes : ''})`) : (n.hindrances||[]),
+            !(n.hindrance_items && n.hindrance_items.length) && (n.hindrances||[]).length > 0);
+        patchSummary(refs, 'edges', (n.edge_items && n.edge_items.length) ?
+            n.edge_items.map(e => `${e.name}${e.notes ? ' ('+e.notes+')' : ''}`) : (n.edges||[]),
+            !(n.edge_items && n.edge_items.length) && (n.edges||[]).length > 0);
+        patchSummary(refs, 'armor', (n.armor||[]).map(a => `<span class="wep-name">${a.name}</span> (+${a.protection}${a.area_protected ? ' — '+a.area_protected : ''})`));
+        patchSummary(refs, 'weapons', (n.weapons||[]).map(w => `<span class="wep-name">${w.name}</span> (${w.damage_str}${w.armor_piercing ? ', AP '+w.armor_piercing : ''}${w.range ? ', Range '+w.range : ''})`));
+        patchSummary(refs, 'powers', (n.power_items||[]).map(p => `${p.name}${p.trapping ? ' ['+p.trapping+']' : ''}`));
+        patchSummary(refs, 'gear', (n.gear_items && n.gear_items.length) ?
+            n.gear_items.map(g => `${g.name}${g.quantity > 1 ? ' ×'+g.quantity : ''}`) : (n.gear||[]),
+            !(n.gear_items && n.gear_items.length) && (n.gear||[]).length > 0);
+    });
+
+    // Production status
+    refs.statStats.checked = !!n.stat_block_complete;
+    refs.statNarrative.checked = !!n.narrative_complete;
+    refs.statFg.checked = !!n.fg_export_ready;
 
     // ── COLUMN 4: NARRATIVE + PORTRAIT ──
-    const portraitSrc = n.portrait_path ? `/portraits/${n.portrait_path}?t=${Date.now()}` : '';
-    const portraitHtml = `
-        <div class="portrait-area">
-            <div class="portrait-frame" id="portraitFrame">
-                ${portraitSrc ? `<img src="${portraitSrc}" alt="${n.name}">` : '<span class="portrait-placeholder">No portrait</span>'}
-            </div>
-            <div class="portrait-actions">
-                <span class="portrait-upload-btn" onclick="openPortraitGenerator(${n.id})">⚡ Generate</span>
-                <label class="portrait-upload-btn">
-                    Upload <input type="file" accept="image/*" style="display:none" onchange="uploadPortrait(${n.id}, this)">
-                </label>
-                ${portraitSrc ? `<span class="portrait-upload-btn" onclick="deletePortrait(${n.id})">Remove</span>` : ''}
-            </div>
-        </div>`;
+    const portraitSrc = portraitURL(n);
+    refs.portraitFrame.classList.remove('portrait-generating');
+    patchHTML(refs.portraitFrame, portraitSrc ? `<img src="${portraitSrc}" alt="${n.name}" width="260" height="347" loading="lazy" decoding="async">` : '<span class="portrait-placeholder">No portrait</span>');
+    refs.portraitRemove.hidden = !portraitSrc;
+
+    refs.quote.hidden = !n.quote;
+    refs.quoteEmpty.hidden = !!n.quote;
+    if (n.quote) refs.quote.textContent = `"${n.quote}"`;
+
+    // ── NARRATIVE SECTIONS ── pushed in display order and joined once
+    renderWhenVisible(refs.narrative, () => {
+        const parts = [];
+        parts.push(`<div class="section" data-action="workspace" data-ws="narrative" style="cursor:pointer"><h3>Description ✎</h3>${proseSlot(n, 'description')}</div>`);
+        parts.push(`<div class="section" data-action="workspace" data-ws="narrative" style="cursor:pointer"><h3>Background ✎</h3>${proseSlot(n, 'background')}</div>`);
+        if (n.motivation || n.secret || n.services || n.adventure_hook) {
+            parts.push('<div class="section" data-action="workspace" data-ws="narrative" style="cursor:pointer"><h3>Story ✎</h3><div class="section-content">');
+            if (n.motivation) parts.push('<p><strong>What They Want:</strong> <span data-field="motivation"></span></p>');
+            if (n.secret) parts.push('<p><strong>Their Secret:</strong> <span data-field="secret"></span></p>');
+            if (n.services) parts.push('<p><strong>Services:</strong> <span data-field="services"></span></p>');
+            if (n.adventure_hook) parts.push('<p><strong>Adventure Hook:</strong> <span data-field="adventure_hook"></span></p>');
+            parts.push('</div></div>');
+        }
+        parts.push(`<div class="section" data-action="workspace" data-ws="narrative" style="cursor:pointer"><h3>Tactics ✎</h3>${proseSlot(n, 'tactics')}</div>`);
+        if (n.organisations_detail && n.organisations_detail.length) {
+            parts.push('<div class="section"><h3>Organisations</h3><div class="tag-list">');
+            for (const o of n.organisations_detail) parts.push(`<span class="tag">${o.name}${o.role ? ' ('+o.role+')' : ''}</span>`);
+            parts.push('</div></div>');
+        }
+        if (n.connections && n.connections.length) {
+            parts.push('<div class="section"><h3>Connections</h3><div class="tag-list">');
+            for (const c of n.connections) parts.push(`<span class="tag">${c.name} — ${c.relationship}</span>`);
+            parts.push('</div></div>');
+        }
+        if (n.appearances && n.appearances.length) {
+            parts.push('<div class="section"><h3>Appearances</h3><div class="tag-list">');
+            for (const a of n.appearances) parts.push(`<span class="tag">${a.product}${a.role ? ' ['+a.role+']' : ''}</span>`);
+            parts.push('</div></div>');
+        }
+        if (n.notes) {
+            parts.push('<div class="section"><h3>Notes</h3><div class="section-content" style="font-size:12px;color:var(--text-dim)" data-field="notes"></div></div>');
+        }
+        if (n.source_document) {
+            parts.push(`<div style="font-size:11px;color:var(--text-dim);margin-top:8px">Source: ${n.source_document}${n.rank_guideline ? ' · '+n.rank_guideline+' rank' : ''}</div>`);
+        }
+        patchHTML(refs.narrative, parts.join(''));
+        fillProse(refs.narrative, n);
+    });
+}
 
-    const desc = `<div class="section" onclick="toggleWorkspace('narrative',${n.id},'${safeName}')" style="cursor:pointer"><h3>Description ✎</h3><div class="section-content">${n.description || '<span style="color:var(--text-dim)">Not set</span>'}</div></div>`;
-    const bg = `<div class="section" onclick="toggleWorkspace('narrative',${n.id},'${safeName}')" style="cursor:pointer"><h3>Background ✎</h3><div class="section-content">${n.background || '<span style="color:var(--text-dim)">Not set</span>'}</div></div>`;
-
-    let narrative = '';
-    const narParts = [];
-    if (n.motivation) narParts.push(`<p><strong>What They Want:</strong> ${n.motivation}</p>`);
-    if (n.secret) narParts.push(`<p><strong>Their Secret:</strong> ${n.secret}</p>`);
-    if (n.services) narParts.push(`<p><strong>Services:</strong> ${n.services}</p>`);
-    if (n.adventure_hook) narParts.push(`<p><strong>Adventure Hook:</strong> ${n.adventure_hook}</p>`);
-    if (narParts.length) {
-        narrative = `<div class="section" onclick="toggleWorkspace('narrative',${n.id},'${safeName}')" style="cursor:pointer"><h3>Story ✎</h3><div class="section-content">${narParts.join('')}</div></div>`;
+// Free-text NPC fields never go through innerHTML: the markup carries an empty
+// data-field slot and the text is written with textContent afterwards, so long
+// prose skips the HTML parser (and any markup in it stays inert).
+const NOT_SET = '<div class="section-content"><span style="color:var(--text-dim)">Not set</span></div>';
+function proseSlot(n, key) {
+    return n[key] ? `<div class="section-content" data-field="${key}"></div>` : NOT_SET;
+}
+function fillProse(root, n) {
+    for (const node of root.querySelectorAll('[data-field]')) {
+        const text = n[node.dataset.field];
+        if (node.textContent !== text) node.textContent = text;
     }
+}
 
-    let orgsHtml = '';
-    if (n.organisations_detail && n.organisations_detail.length) {
-        const tags = n.organisations_detail.map(o => `<span class="tag">${o.name}${o.role ? ' ('+o.role+')' : ''}</span>`).join('');
-        orgsHtml = `<div class="section"><h3>Organisations</h3><div class="tag-list">${tags}</div></div>`;
+// Clone the detail skeleton into #mainContent the first time it is needed (or
+// after the status view / delete replaced it) and collect its data-ref nodes.
+// Later selections reuse the same nodes and only patch what changed.
+let detailRefs = null;
+function mountNPCDetail() {
+    const el = document.getElementById('mainContent');
+    el.classList.remove('empty-state');
+    if (detailRefs && detailRefs.name.isConnected) {
+        // Every selection starts with the workspace closed, as the rebuilt pane used to.
+        resetWorkspace();
+        if (detailRefs.exportOutput.firstChild) detailRefs.exportOutput.innerHTML = '';
+        updateGauges();
+        return detailRefs;
     }
-    let connsHtml = '';
-    if (n.connections && n.connections.length) {
-        const tags = n.connections.map(c => `<span class="tag">${c.name} — ${c.relationship}</span>`).join('');
-        connsHtml = `<div class="section"><h3>Connections</h3><div class="tag-list">${tags}</div></div>`;
+    el.replaceChildren(document.getElementById('npcDetailTemplate').content.cloneNode(true));
+    detailRefs = {};
+    el.querySelectorAll('[data-ref]').forEach(node => { detailRefs[node.dataset.ref] = node; });
+    if (window.IntersectionObserver) {
+        const io = new IntersectionObserver(onLazySection);
+        io.observe(detailRefs.summary);
+        io.observe(detailRefs.narrative);
     }
-    let appsHtml = '';
-    if (n.appearances && n.appearances.length) {
-        const tags = n.appearances.map(a => `<span class="tag">${a.product}${a.role ? ' ['+a.role+']' : ''}</span>`).join('');
-        appsHtml = `<div class="section"><h3>Appearances</h3><div class="tag-list">${tags}</div></div>`;
+    initResizers();
+    return detailRefs;
+}
+
+// Sections below the fold (summary grid, narrative column) only render once
+// they scroll into view. A selection stores its renderer on the node; a node
+// that is already on screen runs it straight away, and one that never comes
+// into view before the next selection is simply overwritten.
+function renderWhenVisible(node, render) {
+    if (!window.IntersectionObserver || node._visible) {
+        node._pendingRender = null;
+        render();
+    } else {
+        node._pendingRender = render;
     }
-    let notesHtml = '';
-    if (n.notes) {
-        notesHtml = `<div class="section"><h3>Notes</h3><div class="section-content" style="font-size:12px;color:var(--text-dim)">${n.notes}</div></div>`;
+}
+function onLazySection(entries) {
+    for (const entry of entries) {
+        const node = entry.target;
+        node._visible = entry.isIntersecting;
+        if (node._visible && node._pendingRender) {
+            const render = node._pendingRender;
+            node._pendingRender = null;
+            render();
+        }
     }
-    const source = n.source_document ? `<div style="font-size:11px;color:var(--text-dim);margin-top:8px">Source: ${n.source_document}${n.rank_guideline ? ' · '+n.rank_guideline+' rank' : ''}</div>` : '';
+}
 
-    el.innerHTML = `
-        <div class="npc-header">
-            <h2>${n.name}</h2>
-            ${titleLine}
-        </div>
-        <div class="detail-columns" id="detailColumns">
-            <div class="col-stats" id="colStats">
-                <div class="col-gauge" id="gaugeStats"></div>
-                <div class="col-stats-scroll">
-                ${statsPanel}
-                <div class="summary-grid">
-                ${hindrancesPanel}
-                ${edgesPanel}
-                ${armorPanel}
-                ${weaponsPanel}
-                ${powersPanel}
-                ${gearPanel}
-                </div>
-                <div id="exportOutput"></div>
-                </div>
-                ${statusHtml}
-            </div>
-            <div class="col-resizer" id="resizer1"></div>
-            <div class="col-workspace" id="workspacePanel">
-                <div class="col-gauge" id="gaugeWorkspace"></div>
-                <div class="workspace-empty">
-                    <div>Click any panel heading to edit</div>
-                    <div class="ws-hint">Weapons ✎ · Armour ✎ · Gear ✎ · Hindrances ✎ · Edges ✎ · Powers ✎</div>
-                </div>
-            </div>
-            <div class="col-resizer" id="resizer2"></div>
-            <div class="col-narrative" id="colNarrative">
-                <div class="col-gauge" id="gaugeNarrative"></div>
-                ${portraitHtml}
-                ${quote}
-                ${desc}${bg}${narrative}${tacticsHtml}${orgsHtml}${connsHtml}${appsHtml}${notesHtml}${source}
-            </div>
-        </div>`;
-    initResizers();
+// Put the template's gauge + "click to edit" hint nodes back into the workspace
+// column instead of re-parsing their markup each time a workspace closes.
+function resetWorkspace() {
+    if (!detailRefs || !detailRefs.workspace.isConnected) return;
+    const ws = detailRefs.workspace;
+    if (ws.childElementCount !== 2 || ws.firstElementChild !== detailRefs.wsGauge) {
+        ws.replaceChildren(detailRefs.wsGauge, detailRefs.wsEmpty);
+    }
+}
+
+// innerHTML write that is skipped when the node already holds this markup
+function patchHTML(node, html) {
+    if (node._html === html) return;
+    node.innerHTML = html;
+    node._html = html;
+}
+
+// Summary panels in the detail view, and the NPC fields that can fill them
+const SUMMARY_PANELS = ['hindrances', 'edges', 'armor', 'weapons', 'powers', 'gear'];
+const SUMMARY_SOURCES = ['hindrance_items', 'hindrances', 'edge_items', 'edges', 'armor', 'weapons', 'power_items', 'gear_items', 'gear'];
+
+// A stub has no attributes and nothing in any summary source yet
+function isStubNPC(n) {
+    if (n.agility > 0) return false;
+    for (const key of SUMMARY_SOURCES) if (n[key] && n[key].length) return false;
+    return true;
+}
+
+// Reconcile a summary panel's .weapon-entry rows against the new list, reusing
+// existing row nodes and only rewriting those whose content changed.
+function patchSummary(refs, key, entries, legacy) {
+    const list = refs[key];
+    const rows = list.children;
+    for (let i = 0; i < entries.length; i++) {
+        let row = rows[i];
+        if (!row) {
+            row = document.createElement('div');
+            row.className = 'weapon-entry';
+            list.appendChild(row);
+        }
+        patchHTML(row, entries[i]);
+    }
+    while (rows.length > entries.length) list.lastElementChild.remove();
+    refs[key + 'None'].hidden = entries.length > 0;
+    if (refs[key + 'Legacy']) refs[key + 'Legacy'].hidden = !legacy;
 }
 
+function openDetailWorkspace(type) { openWorkspace(type, currentNPC.id, currentNPC.name); }
+function toggleDetailWorkspace(type) { toggleWorkspace(type, currentNPC.id, currentNPC.name); }
+
 // ============================================================
 // ADD / EDIT NPC
 // ============================================================
+// One declarative list drives the add, edit and save paths so they can't
+// drift apart. def is the blank/new value; int fields parse with it as the
+// fallback, list fields round-trip through comma-separated text into <key>_json.
+const NPC_FIELDS = [
+    { key: 'name', def: '' },
+    { key: 'title', def: '' },
+    { key: 'region', def: 'Ammaria' },
+    { key: 'tier', def: 'Wild Card' },
+    { key: 'archetype', def: '' },
+    { key: 'gender', def: 'Unspecified' },
+    { key: 'ancestry', def: 'Human' },
+    { key: 'quote', def: '' },
+    { key: 'description', def: '' },
+    { key: 'background', def: '' },
+    { key: 'agility', def: 0, kind: 'int' },
+    { key: 'smarts', def: 0, kind: 'int' },
+    { key: 'spirit', def: 0, kind: 'int' },
+    { key: 'strength', def: 0, kind: 'int' },
+    { key: 'vigor', def: 0, kind: 'int' },
+    { key: 'pace', def: 6, kind: 'int' },
+    { key: 'parry', def: 2, kind: 'int' },
+    { key: 'toughness', def: 5, kind: 'int' },
+    { key: 'toughness_armor', def: 0, kind: 'int' },
+    { key: 'bennies', def: 0, kind: 'int' },
+    { key: 'edges', kind: 'list' },
+    { key: 'hindrances', kind: 'list' },
+    { key: 'gear', kind: 'list' },
+    { key: 'power_points', def: 0, kind: 'int' },
+    { key: 'arcane_bg', def: '' },
+    { key: 'powers', kind: 'list' },
+    { key: 'motivation', def: '' },
+    { key: 'secret', def: '' },
+    { key: 'tactics', def: '' },
+    { key: 'services', def: '' },
+    { key: 'adventure_hook', def: '' },
+    { key: 'source_document', def: '' },
+    { key: 'rank_guideline', def: '' },
+    { key: 'notes', def: '' },
+];
+
+// Fields a form doesn't have (the modal has no gender/ancestry) are skipped
+function fillNPCForm(form, n) {
+    for (const f of NPC_FIELDS) {
+        const el = form[f.key];
+        if (!el) continue;
+        const v = n[f.key];
+        el.value = f.kind === 'list' ? (v || []).join(', ') : (v || f.def);
+    }
+}
+
+function readNPCForm(form) {
+    const data = {};
+    for (const f of NPC_FIELDS) {
+        const raw = form[f.key] ? form[f.key].value : '';
+        if (f.kind === 'list') data[f.key + '_json'] = JSON.stringify(csvToList(raw));
+        else if (f.kind === 'int') data[f.key] = parseInt(raw) || f.def;
+        else data[f.key] = raw || f.def || null;
+    }
+    return data;
+}
+
 function openAddModal() {
-    document.getElementById('modalTitle').textContent = 'New NPC';
-    document.getElementById('editId').value = '';
-    // Clear all fields
-    ['name','title','quote','description','background','motivation','secret','tactics','services','adventure_hook','source_document','notes','edges','hindrances','gear','powers','arcane_bg'].forEach(f => {
-        document.getElementById('f_'+f).value = '';
-    });
-    ['agility','smarts','spirit','strength','vigor'].forEach(f => { document.getElementById('f_'+f).value = '0'; });
-    document.getElementById('f_pace').value = 6;
-    document.getElementById('f_parry').value = 2;
-    document.getElementById('f_toughness').value = 5;
-    document.getElementById('f_toughness_armor').value = 0;
-    document.getElementById('f_bennies').value = 0;
-    document.getElementById('f_power_points').value = 0;
-    document.getElementById('f_region').value = 'Ammaria';
-    document.getElementById('f_tier').value = 'Wild Card';
-    document.getElementById('f_archetype').value = '';
-    document.getElementById('f_rank_guideline').value = '';
-    document.getElementById('npcModal').classList.add('active');
+    npcModalTitle.textContent = 'New NPC';
+    F.editId.value = '';
+    fillNPCForm(F, {});
+    npcModal.classList.add('active');
 }
 
 async function openEditModal(id) {
-    const n = await api(`/api/npcs/${id}`);
-    document.getElementById('modalTitle').textContent = 'Edit — ' + n.name;
-    document.getElementById('editId').value = id;
-
-    document.getElementById('f_name').value = n.name || '';
-    document.getElementById('f_title').value = n.title || '';
-    document.getElementById('f_region').value = n.region || 'Ammaria';
-    document.getElementById('f_tier').value = n.tier || 'Wild Card';
-    document.getElementById('f_archetype').value = n.archetype || '';
-    document.getElementById('f_quote').value = n.quote || '';
-    document.getElementById('f_description').value = n.description || '';
-    document.getElementById('f_background').value = n.background || '';
-    document.getElementById('f_agility').value = n.agility || 0;
-    document.getElementById('f_smarts').value = n.smarts || 0;
-    document.getElementById('f_spirit').value = n.spirit || 0;
-    document.getElementById('f_strength').value = n.strength || 0;
-    document.getElementById('f_vigor').value = n.vigor || 0;
-    document.getElementById('f_pace').value = n.pace || 6;
-    document.getElementById('f_parry').value = n.parry || 2;
-    document.getElementById('f_toughness').value = n.toughness || 5;
-    document.getElementById('f_toughness_armor').value = n.toughness_armor || 0;
-    document.getElementById('f_bennies').value = n.bennies || 0;
-    document.getElementById('f_edges').value = (n.edges||[]).join(', ');
-    document.getElementById('f_hindrances').value = (n.hindrances||[]).join(', ');
-    document.getElementById('f_gear').value = (n.gear||[]).join(', ');
-    document.getElementById('f_power_points').value = n.power_points || 0;
-    document.getElementById('f_arcane_bg').value = n.arcane_bg || '';
-    document.getElementById('f_powers').value = (n.powers||[]).join(', ');
-    document.getElementById('f_motivation').value = n.motivation || '';
-    document.getElementById('f_secret').value = n.secret || '';
-    document.getElementById('f_tactics').value = n.tactics || '';
-    document.getElementById('f_services').value = n.services || '';
-    document.getElementById('f_adventure_hook').value = n.adventure_hook || '';
-    document.getElementById('f_source_document').value = n.source_document || '';
-    document.getElementById('f_rank_guideline').value = n.rank_guideline || '';
-    document.getElementById('f_notes').value = n.notes || '';
-
-    document.getElementById('npcModal').classList.add('active');
-}
-
-function closeModal() { document.getElementById('npcModal').classList.remove('active'); }
+    const n = await fetchNPC(id);
+    npcModalTitle.textContent = 'Edit — ' + n.name;
+    F.editId.value = id;
+    fillNPCForm(F, n);
+    npcModal.classList.add('active');
+}
+
+function closeModal() { npcModal.classList.remove('active'); }
+
+// Same order as the lists' SQL ORDER BY name (binary collation)
+function sortByName(list) {
+    return list.sort((a, b) => a.name < b.name ? -1 : a.name > b.name ? 1 : 0);
+}
 
 function csvToList(s) { return s ? s.split(',').map(x=>x.trim()).filter(x=>x) : []; }
 
 async function saveNPC() {
-    const editId = document.getElementById('editId').value;
-    const data = {
-        name: document.getElementById('f_name').value,
-        title: document.getElementById('f_title').value || null,
-        region: document.getElementById('f_region').value,
-        tier: document.getElementById('f_tier').value,
-        archetype: document.getElementById('f_archetype').value || null,
-        gender: document.getElementById('f_gender').value || 'Unspecified',
-        ancestry: document.getElementById('f_ancestry').value || 'Human',
-        quote: document.getElementById('f_quote').value || null,
-        description: document.getElementById('f_description').value || null,
-        background: document.getElementById('f_background').value || null,
-        agility: parseInt(document.getElementById('f_agility').value) || 0,
-        smarts: parseInt(document.getElementById('f_smarts').value) || 0,
-        spirit: parseInt(document.getElementById('f_spirit').value) || 0,
-        strength: parseInt(document.getElementById('f_strength').value) || 0,
-        vigor: parseInt(document.getElementById('f_vigor').value) || 0,
-        pace: parseInt(document.getElementById('f_pace').value) || 6,
-        parry: parseInt(document.getElementById('f_parry').value) || 2,
-        toughness: parseInt(document.getElementById('f_toughness').value) || 5,
-        toughness_armor: parseInt(document.getElementById('f_toughness_armor').value) || 0,
-        bennies: parseInt(document.getElementById('f_bennies').value) || 0,
-        edges_json: JSON.stringify(csvToList(document.getElementById('f_edges').value)),
-        hindrances_json: JSON.stringify(csvToList(document.getElementById('f_hindrances').value)),
-        gear_json: JSON.stringify(csvToList(document.getElementById('f_gear').value)),
-        power_points: parseInt(document.getElementById('f_power_points').value) || 0,
-        arcane_bg: document.getElementById('f_arcane_bg').value || null,
-        powers_json: JSON.stringify(csvToList(document.getElementById('f_powers').value)),
-        motivation: document.getElementById('f_motivation').value || null,
-        secret: document.getElementById('f_secret').value || null,
-        tactics: document.getElementById('f_tactics').value || null,
-        services: document.getElementById('f_services').value || null,
-        adventure_hook: document.getElementById('f_adventure_hook').value || null,
-        source_document: document.getElementById('f_source_document').value || null,
-        rank_guideline: document.getElementById('f_rank_guideline').value || null,
-        notes: document.getElementById('f_notes').value || null,
-    };
+    // Shared by the modal and the Edit workspace, which use the same field ids
+    const form = npcModal.classList.contains('active') || !editWSFields ? F : editWSFields;
+    const editId = form.editId.value;
+    const data = readNPCForm(form);
 
     if (!data.name) { alert('Name is required'); return; }
 
@@ -2477,32 +3000,35 @@ async function saveNPC() {
 // ============================================================
 function openSkillsModal(npcId, name) {
     currentSkillsNpcId = npcId;
+    S = formFields(skillsModal, 'newSkill');
     document.getElementById('skillsNpcName').textContent = name;
-    document.getElementById('skillsModal').classList.add('active');
+    skillsModal.classList.add('active');
     loadSkills();
 }
 function closeSkillsModal() {
-    document.getElementById('skillsModal').classList.remove('active');
+    skillsModal.classList.remove('active');
     if (currentNPC) selectNPC(currentNPC.id);
 }
 async function loadSkills() {
-    const skills = await api(`/api/npcs/${currentSkillsNpcId}/skills`);
-    const el = document.getElementById('skillsList');
-    if (!skills.length) { el.innerHTML = '<div style="color:var(--text-dim);font-size:12px">No skills yet</div>'; return; }
-    el.innerHTML = `<table class="data-table">${skills.map(s => `
-        <tr><td>${s.name}</td><td>d${s.die}</td><td><button class="btn sm danger" onclick="deleteSkill(${s.id})">×</button></td></tr>`).join('')}</table>`;
+    currentSkillsList = await npcItems(currentSkillsNpcId, 'skills');
+    renderSkills();
 }
+function renderSkills() { renderItemTable('skills', currentSkillsList); }
 async function addSkill() {
-    const name = document.getElementById('newSkillName').value.trim();
-    const die = document.getElementById('newSkillDie').value;
+    const name = S.Name.value.trim();
+    const die = S.Die.value;
     if (!name) return;
-    await api(`/api/npcs/${currentSkillsNpcId}/skills`, 'POST', {name, die: parseInt(die)});
-    document.getElementById('newSkillName').value = '';
-    loadSkills();
+    const res = await api(`/api/npcs/${currentSkillsNpcId}/skills`, 'POST', {name, die: parseInt(die)});
+    S.Name.value = '';
+    if (!res.skill) { loadSkills(); return; }
+    // INSERT OR REPLACE: a re-added name supersedes its old row
+    currentSkillsList = sortByName(currentSkillsList.filter(s => s.name !== res.skill.name).concat(res.skill));
+    renderSkills();
 }
 async function deleteSkill(skillId) {
     await api(`/api/skills/${skillId}`, 'DELETE');
-    loadSkills();
+    currentSkillsList = currentSkillsList.filter(s => s.id !== skillId);
+    renderSkills();
 }
 
 // ============================================================
@@ -2521,11 +3047,19 @@ function openWorkspace(type, npcId, name) {
     const renderers = { weapons: renderWeaponsWS, armor: renderArmorWS, gear: renderGearWS, hindrances: renderHindrancesWS, edges: renderEdgesWS, powers: renderPowersWS, edit: renderEditWS, statblock: renderStatblockWS, fgxml: renderFgxmlWS, skills: renderSkillsWS, attributes: renderAttributesWS, quote: renderQuoteWS, narrative: renderNarrativeWS };
     if (renderers[type]) {
         ws.innerHTML = renderers[type](npcId, name);
+        editWSFields = null;
+        W = formFields(ws, 'newWep');
+        A = formFields(ws, 'newArmor');
+        S = formFields(ws, 'newSkill');
+        G = formFields(ws, 'newGear');
+        H = formFields(ws, 'newHind');
+        E = formFields(ws, 'newEdge');
+        P = formFields(ws, 'newPower');
         // Trigger load
         const loaders = {
-            weapons:    () => { currentWeaponsNpcId = npcId; loadWeapons(); loadCatalogueSources().then(() => loadWeaponCatalogue()); },
-            armor:      () => { currentArmorNpcId = npcId; loadArmor(); loadCatalogueSources().then(() => loadArmorCatalogue()); },
-            gear:       () => { currentGearNpcId = npcId; loadGear(); loadCatalogueSources().then(() => loadGearCatalogue()); },
+            weapons:    () => { currentWeaponsNpcId = npcId; loadWeapons(); loadWeaponCatalogue(); onFirstOpen('catWeaponSource', loadCatalogueSources); },
+            armor:      () => { currentArmorNpcId = npcId; loadArmor(); loadArmorCatalogue(); onFirstOpen('catArmorSource', loadCatalogueSources); },
+            gear:       () => { currentGearNpcId = npcId; loadGear(); loadGearCatalogue(); onFirstOpen('catGearSource', loadCatalogueSources); },
             hindrances: () => { currentHindrancesNpcId = npcId; loadHindrances(); loadHindranceSources().then(() => loadHindranceCatalogue()); },
             edges:      () => { currentEdgesNpcId = npcId; loadEdges(); loadEdgeSources().then(() => loadEdgeCatalogue()); },
             powers:     () => { currentPowersNpcId = npcId; loadPowers(); loadPowerSources().then(() => loadPowerCatalogue()); },
@@ -2542,8 +3076,7 @@ function openWorkspace(type, npcId, name) {
 }
 function closeWorkspace() {
     activeWorkspace = null;
-    const ws = document.getElementById('workspacePanel');
-    if (ws) ws.innerHTML = '<div class="workspace-empty"><div>Click any panel heading to edit</div><div class="ws-hint">Weapons ✎ · Armour ✎ · Gear ✎ · Hindrances ✎ · Edges ✎ · Powers ✎</div></div>';
+    resetWorkspace();
     if (currentNPC) selectNPC(currentNPC.id);
 }
 
@@ -2623,6 +3156,8 @@ async function loadEditWS(npcId) {
             <button class="btn primary" onclick="saveNPC()">Save</button>
             <button class="btn" onclick="closeWorkspace()">Cancel</button>
         </div>`;
+    editWSFields = formFields(el, 'f_');
+    editWSFields.editId = el.querySelector('#editId');
 }
 
 function renderStatblockWS(npcId, name) {
@@ -2636,18 +3171,18 @@ async function loadStatblockWS(npcId) {
     if (!el) return;
     // Convert markdown to simple HTML via helper
     const html = mdToHtml(data.statblock);
-    const mdEscaped = escapeHtml(data.statblock);
     el.innerHTML = `
         <div style="display:flex;gap:8px;margin-bottom:10px">
             <button class="btn sm" id="sbTabHtml" onclick="showStatblockTab('html')" style="border-bottom:2px solid var(--accent)">Formatted</button>
             <button class="btn sm" id="sbTabMd" onclick="showStatblockTab('md')">Markdown</button>
         </div>
         <div id="sbHtmlView" style="font-size:13px;line-height:1.6">${html}</div>
-        <div id="sbMdView" style="display:none"><pre style="white-space:pre-wrap;font-size:12px;line-height:1.5">${mdEscaped}</pre></div>
+        <div id="sbMdView" style="display:none"><pre style="white-space:pre-wrap;font-size:12px;line-height:1.5"></pre></div>
         <div style="margin-top:10px;display:flex;gap:8px">
             <button class="btn sm" onclick="copyStatblockHtml()">Copy HTML</button>
             <button class="btn sm" onclick="copyStatblockMd()">Copy Markdown</button>
         </div>`;
+    el.querySelector('#sbMdView pre').textContent = data.statblock;
     window._statblockMd = data.statblock;
     window._statblockHtml = html;
 }
@@ -2778,8 +3313,9 @@ async function loadFgxmlWS(npcId) {
     const data = await api('/api/npcs/' + npcId + '/fgxml');
     const el = document.getElementById('wsExportContent');
     if (!el) return;
-    el.innerHTML = `<pre style="white-space:pre-wrap;font-size:12px;line-height:1.5">${escapeHtml(data.xml)}</pre>
+    el.innerHTML = `<pre style="white-space:pre-wrap;font-size:12px;line-height:1.5"></pre>
         <button class="btn sm" onclick="copyToClipboard(this)" style="margin-top:8px">Copy</button>`;
+    el.firstElementChild.textContent = data.xml;
 }
 
 function renderWeaponsWS(npcId, name) {
@@ -2962,16 +3498,42 @@ function setupResizer(resizerId, leftId, rightId, mode) {
 // ============================================================
 // PORTRAIT
 // ============================================================
+// Portrait URLs stay stable so the browser cache (and hover prefetch) can be
+// reused; only a portrait changed in this session gets a cache-busting suffix.
+const portraitRevision = {};
+const prefetchedPortraits = new Set();
+
+function portraitURL(n) {
+    if (!n.portrait_path) return '';
+    const rev = portraitRevision[n.id];
+    return `/portraits/${n.portrait_path}` + (rev ? `?t=${rev}` : '');
+}
+
+function prefetchPortrait(n) {
+    const url = portraitURL(n);
+    if (!url || prefetchedPortraits.has(url)) return;
+    prefetchedPortraits.add(url);
+    const link = document.createElement('link');
+    link.rel = 'prefetch';
+    link.as = 'image';
+    link.href = url;
+    document.head.appendChild(link);
+}
+
 async function uploadPortrait(npcId, input) {
     if (!input.files || !input.files[0]) return;
     const formData = new FormData();
     formData.append('file', input.files[0]);
+    input.value = '';
     const resp = await fetch(`/api/npcs/${npcId}/portrait`, { method: 'POST', body: formData });
     const data = await resp.json();
+    npcCache.delete(npcId);
+    portraitRevision[npcId] = Date.now();
     if (data.success && currentNPC) selectNPC(currentNPC.id);
 }
 async function deletePortrait(npcId) {
     await api(`/api/npcs/${npcId}/portrait`, 'DELETE');
+    portraitRevision[npcId] = Date.now();
     if (currentNPC) selectNPC(currentNPC.id);
 }
 
@@ -3046,13 +3608,15 @@ async function generatePortrait(npcId) {
         const data = await resp.json();
         
         if (data.success) {
-            status.innerHTML = '<span style="color:#4a4">✓ Portrait generated!</span>';
+            status.innerHTML = '<span style="color:var(--success)">✓ Portrait generated!</span>';
+            npcCache.delete(npcId);
+            portraitRevision[npcId] = Date.now();
             selectNPC(npcId);  // Refresh to show new portrait
         } else {
-            status.innerHTML = '<span style="color:#a44">✗ Error: ' + (data.error || 'Unknown error') + '</span>';
+            status.innerHTML = '<span style="color:var(--red)">✗ Error: ' + (data.error || 'Unknown error') + '</span>';
         }
     } catch (e) {
-        status.innerHTML = '<span style="color:#a44">✗ Error: ' + e.message + '</span>';
+        status.innerHTML = '<span style="color:var(--red)">✗ Error: ' + e.message + '</span>';
     }
     
     btn.disabled = false;
@@ -3061,40 +3625,142 @@ async function generatePortrait(npcId) {
 }
 
 
+// ============================================================
+// ITEM TABLES (skills / weapons / armour / gear / hindrances / edges / powers)
+// ============================================================
+// Each workspace list is the same shape: a placeholder when empty, otherwise a
+// data-table with one × delete button per row. Columns are [header, value, style?];
+// values are written as text.
+const ITEM_TABLES = {
+    skills: { el: 'skillsList', empty: 'No skills yet', action: 'delete-skill', head: false, cols: [
+        ['Name', s => s.name], ['Die', s => 'd' + s.die]] },
+    weapons: { el: 'weaponsList', empty: 'No weapons yet', action: 'delete-weapon', cols: [
+        ['Name', w => w.name], ['Dmg', w => w.damage_str], ['FG Dice', w => w.damagedice],
+        ['Type', w => w.trait_type], ['AP', w => w.armor_piercing || '—']] },
+    armor: { el: 'armorList', empty: 'No armour yet', action: 'delete-armor', cols: [
+        ['Name', a => a.name], ['Prot', a => '+' + a.protection], ['Area', a => a.area_protected || '—'],
+        ['Min Str', a => a.min_strength || '—'], ['Notes', a => a.notes || '']] },
+    gear: { el: 'gearList', empty: 'No gear yet', action: 'delete-gear', cols: [
+        ['Item', g => g.name], ['Qty', g => g.quantity], ['Wt', g => g.weight || '—'],
+        ['Cost', g => g.cost || '—'], ['Notes', g => g.notes || '']] },
+    hindrances: { el: 'hindrancesList', empty: 'No hindrances yet', action: 'delete-hindrance', cols: [
+        ['Name', h => h.name],
+        ['Severity', h => h.severity, h => `color:${h.severity === 'Major' ? 'var(--red)' : 'var(--text-dim)'}`],
+        ['Notes', h => h.notes || '—']] },
+    edges: { el: 'edgesList', empty: 'No edges yet', action: 'delete-edge', cols: [
+        ['Name', e => e.name], ['Notes', e => e.notes || '—']] },
+    powers: { el: 'powersList', empty: 'No powers yet', action: 'delete-power', cols: [
+        ['Name', p => p.name], ['PP', p => p.power_points || '—'], ['Range', p => p.range || '—'],
+        ['Duration', p => p.duration || '—'], ['Trapping', p => p.trapping || '—']] },
+};
+
+// Keyed by row id: rows that survive a reload keep their <tr>, only cells whose
+// value changed are rewritten, and new/removed rows are the only DOM churn.
+function renderItemTable(kind, items) {
+    const t = ITEM_TABLES[kind];
+    const el = document.getElementById(t.el);
+    if (!el) return;
+    const tpl = itemTableTemplates(t);
+    if (!items.length) {
+        if (!el.firstElementChild || !el.firstElementChild.hasAttribute('data-empty')) {
+            el.replaceChildren(tpl.empty.content.cloneNode(true));
+        }
+        return;
+    }
+    // The workspace re-renders its markup on open, so a detached body means start over
+    if (!t.body || t.body.parentNode.parentNode !== el) {
+        el.replaceChildren(tpl.table.content.cloneNode(true));
+        t.body = el.querySelector('tbody');
+        t.rows = new Map();
+    }
+    const next = new Map();
+    let prev = null;
+    for (const item of items) {
+        let tr = t.rows.get(item.id);
+        if (!tr) tr = itemRow(t, item);
+        patchItemRow(t, tr, item);
+        const expected = prev ? prev.nextSibling : t.body.firstChild;
+        if (tr !== expected) t.body.insertBefore(tr, expected);
+        next.set(item.id, tr);
+        prev = tr;
+    }
+    t.rows.forEach((tr, id) => { if (!next.has(id)) tr.remove(); });
+    t.rows = next;
+}
+
+// Header, placeholder and blank row are parsed once per table kind and cloned
+// from then on, so reloads never go back through the HTML parser
+function itemTableTemplates(t) {
+    if (t.tpl) return t.tpl;
+    const make = html => {
+        const el = document.createElement('template');
+        el.innerHTML = html;
+        return el;
+    };
+    const head = t.head === false ? '' :
+        '<thead><tr>' + t.cols.map(([h]) => '<th>' + h + '</th>').join('') + '<th></th></tr></thead>';
+    t.tpl = {
+        empty: make(`<div data-empty style="color:var(--text-dim);font-size:12px">${t.empty}</div>`),
+        table: make('<table class="data-table">' + head + '<tbody></tbody></table>'),
+        row: make('<table><tr>' + '<td></td>'.repeat(t.cols.length) +
+            `<td><button class="btn sm danger" data-action="${t.action}">×</button></td></tr></table>`),
+    };
+    return t.tpl;
+}
+
+function itemRow(t, item) {
+    const tr = t.tpl.row.content.querySelector('tr').cloneNode(true);
+    tr.lastElementChild.firstElementChild.dataset.id = item.id;
+    return tr;
+}
+
+function patchItemRow(t, tr, item) {
+    const cells = tr.children;
+    for (let i = 0; i < t.cols.length; i++) {
+        const [, value, style] = t.cols[i];
+        const text = String(value(item));
+        if (cells[i].textContent !== text) cells[i].textContent = text;
+        if (style) cells[i].style.cssText = style(item);
+    }
+}
+
 // ============================================================
 // WEAPONS
 // ============================================================
 function openWeaponsModal(npcId, name) { openWorkspace('weapons', npcId, name); }
 function closeWeaponsModal() { closeWorkspace(); }
 async function loadWeapons() {
-    const weapons = await api(`/api/npcs/${currentWeaponsNpcId}/weapons`);
-    const el = document.getElementById('weaponsList');
-    if (!weapons.length) { el.innerHTML = '<div style="color:var(--text-dim);font-size:12px">No weapons yet</div>'; return; }
-    el.innerHTML = `<table class="data-table"><tr><th>Name</th><th>Dmg</th><th>FG Dice</th><th>Type</th><th>AP</th><th></th></tr>${weapons.map(w => `
-        <tr><td>${w.name}</td><td>${w.damage_str}</td><td>${w.damagedice}</td><td>${w.trait_type}</td><td>${w.armor_piercing||'—'}</td><td><button class="btn sm danger" onclick="deleteWeapon(${w.id})">×</button></td></tr>`).join('')}</table>`;
+    currentWeaponsList = await npcItems(currentWeaponsNpcId, 'weapons');
+    renderWeapons();
 }
+function renderWeapons() { renderItemTable('weapons', currentWeaponsList); }
 async function addWeapon() {
     const data = {
-        name: document.getElementById('newWepName').value.trim(),
-        damage_str: document.getElementById('newWepDamage').value.trim(),
-        damagedice: document.getElementById('newWepDice').value.trim(),
-        armor_piercing: parseInt(document.getElementById('newWepAP').value) || 0,
-        trait_type: document.getElementById('newWepType').value,
-        range: document.getElementById('newWepRange').value.trim() || null,
-        reach: parseInt(document.getElementById('newWepReach').value) || 0,
-        notes: document.getElementById('newWepNotes').value.trim() || null,
+        name: W.Name.value.trim(),
+        damage_str: W.Damage.value.trim(),
+        damagedice: W.Dice.value.trim(),
+        armor_piercing: parseInt(W.AP.value) || 0,
+        trait_type: W.Type.value,
+        range: W.Range.value.trim() || null,
+        reach: parseInt(W.Reach.value) || 0,
+        notes: W.Notes.value.trim() || null,
     };
     if (!data.name || !data.damage_str) { alert('Name and damage required'); return; }
-    await api(`/api/npcs/${currentWeaponsNpcId}/weapons`, 'POST', data);
-    ['newWepName','newWepDamage','newWepDice','newWepRange','newWepNotes'].forEach(id => document.getElementById(id).value = '');
-    document.getElementById('newWepAP').value = 0;
-    document.getElementById('newWepReach').value = 0;
+    const res = await api(`/api/npcs/${currentWeaponsNpcId}/weapons`, 'POST', data);
+    ['Name','Damage','Dice','Range','Notes'].forEach(k => W[k].value = '');
+    W.AP.value = 0;
+    W.Reach.value = 0;
     document.getElementById('catWeaponPick').value = '';
-    loadWeapons();
+    if (!res.weapon) { loadWeapons(); return; }
+    currentWeaponsList = currentWeaponsList.concat(res.weapon);
+    renderWeapons();
 }
 async function deleteWeapon(weaponId) {
     await api(`/api/weapons/${weaponId}`, 'DELETE');
-    if (activeWorkspace === 'weapons') loadWeapons();
+    if (activeWorkspace === 'weapons') {
+        currentWeaponsList = currentWeaponsList.filter(x => x.id !== weaponId);
+        renderWeapons();
+    }
     else if (currentNPC) selectNPC(currentNPC.id);
 }
 
@@ -3104,33 +3770,36 @@ async function deleteWeapon(weaponId) {
 function openArmorModal(npcId, name) { openWorkspace('armor', npcId, name); }
 function closeArmorModal() { closeWorkspace(); }
 async function loadArmor() {
-    const armor = await api(`/api/npcs/${currentArmorNpcId}/armor`);
-    const el = document.getElementById('armorList');
-    if (!armor.length) { el.innerHTML = '<div style="color:var(--text-dim);font-size:12px">No armour yet</div>'; return; }
-    el.innerHTML = `<table class="data-table"><tr><th>Name</th><th>Prot</th><th>Area</th><th>Min Str</th><th>Notes</th><th></th></tr>${armor.map(a => `
-        <tr><td>${a.name}</td><td>+${a.protection}</td><td>${a.area_protected||'—'}</td><td>${a.min_strength||'—'}</td><td>${a.notes||''}</td><td><button class="btn sm danger" onclick="deleteArmor(${a.id})">×</button></td></tr>`).join('')}</table>`;
+    currentArmorList = await npcItems(currentArmorNpcId, 'armor');
+    renderArmor();
 }
+function renderArmor() { renderItemTable('armor', currentArmorList); }
 async function addArmor() {
     const data = {
-        name: document.getElementById('newArmorName').value.trim(),
-        protection: parseInt(document.getElementById('newArmorProt').value) || 0,
-        area_protected: document.getElementById('newArmorArea').value.trim() || null,
-        min_strength: document.getElementById('newArmorStr').value.trim() || null,
-        weight: parseFloat(document.getElementById('newArmorWeight').value) || 0,
-        cost: document.getElementById('newArmorCost').value.trim() || null,
-        notes: document.getElementById('newArmorNotes').value.trim() || null,
+        name: A.Name.value.trim(),
+        protection: parseInt(A.Prot.value) || 0,
+        area_protected: A.Area.value.trim() || null,
+        min_strength: A.Str.value.trim() || null,
+        weight: parseFloat(A.Weight.value) || 0,
+        cost: A.Cost.value.trim() || null,
+        notes: A.Notes.value.trim() || null,
     };
     if (!data.name) { alert('Armour name required'); return; }
-    await api(`/api/npcs/${currentArmorNpcId}/armor`, 'POST', data);
-    ['newArmorName','newArmorArea','newArmorStr','newArmorCost','newArmorNotes'].forEach(id => document.getElementById(id).value = '');
-    document.getElementById('newArmorProt').value = 2;
-    document.getElementById('newArmorWeight').value = 0;
+    const res = await api(`/api/npcs/${currentArmorNpcId}/armor`, 'POST', data);
+    ['Name','Area','Str','Cost','Notes'].forEach(k => A[k].value = '');
+    A.Prot.value = 2;
+    A.Weight.value = 0;
     document.getElementById('catArmorPick').value = '';
-    loadArmor();
+    if (!res.armor) { loadArmor(); return; }
+    currentArmorList = sortByName(currentArmorList.concat(res.armor));
+    renderArmor();
 }
 async function deleteArmor(armorId) {
     await api(`/api/armor/${armorId}`, 'DELETE');
-    if (activeWorkspace === 'armor') loadArmor();
+    if (activeWorkspace === 'armor') {
+        currentArmorList = currentArmorList.filter(x => x.id !== armorId);
+        renderArmor();
+    }
     else if (currentNPC) selectNPC(currentNPC.id);
 }
 
@@ -3140,31 +3809,34 @@ async function deleteArmor(armorId) {
 function openGearModal(npcId, name) { openWorkspace('gear', npcId, name); }
 function closeGearModal() { closeWorkspace(); }
 async function loadGear() {
-    const gear = await api(`/api/npcs/${currentGearNpcId}/gear`);
-    const el = document.getElementById('gearList');
-    if (!gear.length) { el.innerHTML = '<div style="color:var(--text-dim);font-size:12px">No gear yet</div>'; return; }
-    el.innerHTML = `<table class="data-table"><tr><th>Item</th><th>Qty</th><th>Wt</th><th>Cost</th><th>Notes</th><th></th></tr>${gear.map(g => `
-        <tr><td>${g.name}</td><td>${g.quantity}</td><td>${g.weight||'—'}</td><td>${g.cost||'—'}</td><td>${g.notes||''}</td><td><button class="btn sm danger" onclick="deleteGear(${g.id})">×</button></td></tr>`).join('')}</table>`;
+    currentGearList = await npcItems(currentGearNpcId, 'gear_items');
+    renderGear();
 }
+function renderGear() { renderItemTable('gear', currentGearList); }
 async function addGear() {
     const data = {
-        name: document.getElementById('newGearName').value.trim(),
-        quantity: parseInt(document.getElementById('newGearQty').value) || 1,
-        weight: parseFloat(document.getElementById('newGearWeight').value) || 0,
-        cost: document.getElementById('newGearCost').value.trim() || null,
-        notes: document.getElementById('newGearNotes').value.trim() || null,
+        name: G.Name.value.trim(),
+        quantity: parseInt(G.Qty.value) || 1,
+        weight: parseFloat(G.Weight.value) || 0,
+        cost: G.Cost.value.trim() || null,
+        notes: G.Notes.value.trim() || null,
     };
     if (!data.name) { alert('Item name required'); return; }
-    await api(`/api/npcs/${currentGearNpcId}/gear`, 'POST', data);
-    ['newGearName','newGearCost','newGearNotes'].forEach(id => document.getElementById(id).value = '');
-    document.getElementById('newGearQty').value = 1;
-    document.getElementById('newGearWeight').value = 0;
+    const res = await api(`/api/npcs/${currentGearNpcId}/gear`, 'POST', data);
+    ['Name','Cost','Notes'].forEach(k => G[k].value = '');
+    G.Qty.value = 1;
+    G.Weight.value = 0;
     document.getElementById('catGearPick').value = '';
-    loadGear();
+    if (!res.gear) { loadGear(); return; }
+    currentGearList = sortByName(currentGearList.concat(res.gear));
+    renderGear();
 }
 async function deleteGear(gearId) {
     await api(`/api/gear/${gearId}`, 'DELETE');
-    if (activeWorkspace === 'gear') loadGear();
+    if (activeWorkspace === 'gear') {
+        currentGearList = currentGearList.filter(x => x.id !== gearId);
+        renderGear();
+    }
     else if (currentNPC) selectNPC(currentNPC.id);
 }
 
@@ -3176,20 +3848,69 @@ async function deleteLegacyGear(npcId, index) {
 // ============================================================
 // EQUIPMENT CATALOGUE — Dropdown auto-fill
 // ============================================================
-let catWeaponsCache = [];
-let catArmorCache = [];
-let catGearCache = [];
-let catHindrancesCache = [];
-let catEdgesCache = [];
-let catPowersCache = [];
+// Catalogue caches are Maps keyed by a stable "source|name" id (see
+// indexCatalogue) and the pickers use that id as the option value, so a
+// selection never points at a position in an array that has since reloaded.
+let catWeaponsCache = new Map();
+let catArmorCache = new Map();
+let catGearCache = new Map();
+let catHindrancesCache = new Map();
+let catEdgesCache = new Map();
+let catPowersCache = new Map();
 let hindSourcesLoaded = false;
 let edgeSourcesLoaded = false;
 let powerSourcesLoaded = false;
 let catSourcesLoaded = false;
+let catSourceList = null;
+
+// The source filters only need their options once the user opens one. The list
+// itself is fetched once per page, so after that filling a select is synchronous
+// inside the mousedown and the options are there before the dropdown paints.
+function onFirstOpen(id, load) {
+    const el = document.getElementById(id);
+    if (!el) return;
+    const run = () => {
+        el.removeEventListener('mousedown', run);
+        el.removeEventListener('focus', run);
+        load();
+    };
+    el.addEventListener('mousedown', run);
+    el.addEventListener('focus', run);
+}
+
+// Catalogue rows have no id of their own; a few share a name within a source
+// (e.g. Minor/Major hindrance variants), so repeats get a #n suffix. Map
+// insertion order keeps the server's ordering for the pickers.
+function indexCatalogue(items) {
+    const map = new Map();
+    for (const item of items) {
+        const base = item.source + '|' + item.name;
+        let key = base;
+        for (let n = 2; map.has(key); n++) key = base + '#' + n;
+        map.set(key, item);
+    }
+    return map;
+}
+
+// Hindrance/edge/power catalogues are fetched per source. They are static
+// for the life of the server, so each source is fetched and indexed once and
+// switching the source dropdown back and forth is served from here.
+const catalogueBySource = new Map();  // "kind|source" → Promise<indexed Map>
+function catalogueFor(kind, source) {
+    const key = kind + '|' + source;
+    if (!catalogueBySource.has(key)) {
+        // A failed fetch is forgotten so the next call retries it
+        catalogueBySource.set(key, api(`/api/catalogue/${kind}?source=${encodeURIComponent(source)}`)
+            .then(indexCatalogue)
+            .catch(err => { catalogueBySource.delete(key); throw err; }));
+    }
+    return catalogueBySource.get(key);
+}
 
 async function loadCatalogueSources() {
     if (catSourcesLoaded) return;
-    const sources = await api('/api/catalogue/sources');
+    if (!catSourceList) catSourceList = await api('/api/catalogue/sources');
+    const sources = catSourceList;
     ['catWeaponSource','catArmorSource','catGearSource'].forEach(id => {
         const sel = document.getElementById(id);
         if (!sel) return;
@@ -3202,106 +3923,131 @@ async function loadCatalogueSources() {
     catSourcesLoaded = true;
 }
 
-async function loadWeaponCatalogue() {
-    const source = document.getElementById('catWeaponSource').value;
-    catWeaponsCache = await api(`/api/catalogue/weapons?source=${encodeURIComponent(source)}`);
-    const sel = document.getElementById('catWeaponPick');
-    sel.innerHTML = '<option value="">— Custom / Manual —</option>';
-    let lastSource = '';
-    catWeaponsCache.forEach((w, i) => {
-        if (w.source !== lastSource) {
-            const grp = document.createElement('optgroup');
-            grp.label = w.source;
-            sel.appendChild(grp);
-            lastSource = w.source;
+// Weapon/armour/gear pickers: each catalogue is fetched once (all sources) and
+// built once into optgroup/option nodes. Every freshly rendered picker just
+// re-parents those nodes; source and search filtering toggle `hidden`.
+const EQUIPMENT_PICKERS = {
+    weapon: { url: '/api/catalogue/weapons', pickId: 'catWeaponPick', sourceId: 'catWeaponSource', searchId: 'catWeaponSearch',
+              label: w => `${w.name} (${w.damage_str}${w.ap ? ', AP '+w.ap : ''})`, setCache: items => { catWeaponsCache = items; } },
+    armor:  { url: '/api/catalogue/armor',   pickId: 'catArmorPick',  sourceId: 'catArmorSource',  searchId: 'catArmorSearch',
+              label: a => `${a.name} (+${a.protection})`, setCache: items => { catArmorCache = items; } },
+    gear:   { url: '/api/catalogue/gear',    pickId: 'catGearPick',   sourceId: 'catGearSource',   searchId: 'catGearSearch',
+              label: g => g.name, setCache: items => { catGearCache = items; } },
+};
+
+function buildEquipmentPicker(kind, items) {
+    const picker = EQUIPMENT_PICKERS[kind];
+    items = indexCatalogue(items);
+    picker.setCache(items);
+    picker.groups = [];
+    picker.options = [];
+    let grp = null;
+    items.forEach((item, key) => {
+        if (!grp || grp.label !== item.source) {
+            grp = document.createElement('optgroup');
+            grp.label = item.source;
+            grp._options = [];
+            picker.groups.push(grp);
         }
         const opt = document.createElement('option');
-        opt.value = i;
-        const tag = w.trait_type === 'Ranged' ? w.damage_str : w.damage_str;
-        opt.textContent = `${w.name} (${w.damage_str}${w.ap ? ', AP '+w.ap : ''})`;
-        const grps = sel.querySelectorAll('optgroup');
-        grps[grps.length-1].appendChild(opt);
+        opt.value = key;
+        opt.textContent = picker.label(item);
+        opt._source = item.source;
+        opt._search = opt.textContent.toLowerCase();
+        grp.appendChild(opt);
+        grp._options.push(opt);
+        picker.options.push(opt);
     });
+    picker.noMatch = document.createElement('option');
+    picker.noMatch.value = ''; picker.noMatch.textContent = '— No matches —'; picker.noMatch.disabled = true;
 }
 
-function fillWeaponFromCat() {
-    const idx = document.getElementById('catWeaponPick').value;
-    if (idx === '') return;
-    const w = catWeaponsCache[parseInt(idx)];
-    document.getElementById('newWepName').value = w.name;
-    document.getElementById('newWepDamage').value = w.damage_str;
-    document.getElementById('newWepDice').value = '';
-    document.getElementById('newWepAP').value = w.ap || 0;
-    document.getElementById('newWepType').value = w.trait_type;
-    document.getElementById('newWepRange').value = w.range || '';
-    document.getElementById('newWepReach').value = w.reach || 0;
-    document.getElementById('newWepNotes').value = w.notes || '';
-}
-
-async function loadArmorCatalogue() {
-    const source = document.getElementById('catArmorSource').value;
-    catArmorCache = await api(`/api/catalogue/armor?source=${encodeURIComponent(source)}`);
-    const sel = document.getElementById('catArmorPick');
-    sel.innerHTML = '<option value="">— Custom / Manual —</option>';
-    let lastSource = '';
-    catArmorCache.forEach((a, i) => {
-        if (a.source !== lastSource) {
-            const grp = document.createElement('optgroup');
-            grp.label = a.source;
-            sel.appendChild(grp);
-            lastSource = a.source;
-        }
-        const opt = document.createElement('option');
-        opt.value = i;
-        opt.textContent = `${a.name} (+${a.protection})`;
-        const grps = sel.querySelectorAll('optgroup');
-        grps[grps.length-1].appendChild(opt);
+function loadEquipmentPicker(kind) {
+    const picker = EQUIPMENT_PICKERS[kind];
+    if (!picker.ready) {
+        // A failed load is forgotten, so the next open retries instead of reusing the rejection
+        picker.ready = api(picker.url + '?source=All')
+            .then(items => buildEquipmentPicker(kind, items))
+            .catch(err => { picker.ready = null; throw err; });
+    }
+    return picker.ready;
+}
+
+async function showEquipmentPicker(kind) {
+    const picker = EQUIPMENT_PICKERS[kind];
+    await loadEquipmentPicker(kind);
+    const sel = document.getElementById(picker.pickId);
+    if (!sel) return;
+    if (picker.groups.length && picker.groups[0].parentNode !== sel) {
+        const frag = document.createDocumentFragment();
+        picker.groups.forEach(g => frag.appendChild(g));
+        frag.appendChild(picker.noMatch);
+        sel.appendChild(frag);
+        sel.value = '';
+    }
+    filterEquipmentPicker(kind);
+}
+
+function filterEquipmentPicker(kind) {
+    const picker = EQUIPMENT_PICKERS[kind];
+    if (!picker.groups) return;
+    const sourceEl = document.getElementById(picker.sourceId);
+    const searchEl = document.getElementById(picker.searchId);
+    const source = sourceEl ? sourceEl.value : 'All';
+    const query = searchEl ? searchEl.value.toLowerCase().trim() : '';
+    let shown = 0;
+    picker.groups.forEach(grp => {
+        let groupShown = 0;
+        grp._options.forEach(opt => {
+            const show = (source === 'All' || opt._source === source) && (!query || opt._search.includes(query));
+            opt.hidden = !show;
+            if (show) groupShown++;
+        });
+        grp.hidden = groupShown === 0;
+        shown += groupShown;
     });
+    picker.noMatch.hidden = !(query && shown === 0);
 }
 
+function loadWeaponCatalogue() { return showEquipmentPicker('weapon'); }
+
+function fillWeaponFromCat() {
+    const w = catWeaponsCache.get(document.getElementById('catWeaponPick').value);
+    if (!w) return;
+    W.Name.value = w.name;
+    W.Damage.value = w.damage_str;
+    W.Dice.value = '';
+    W.AP.value = w.ap || 0;
+    W.Type.value = w.trait_type;
+    W.Range.value = w.range || '';
+    W.Reach.value = w.reach || 0;
+    W.Notes.value = w.notes || '';
+}
+
+function loadArmorCatalogue() { return showEquipmentPicker('armor'); }
+
 function fillArmorFromCat() {
-    const idx = document.getElementById('catArmorPick').value;
-    if (idx === '') return;
-    const a = catArmorCache[parseInt(idx)];
-    document.getElementById('newArmorName').value = a.name;
-    document.getElementById('newArmorProt').value = a.protection;
-    document.getElementById('newArmorArea').value = a.area_protected || '';
-    document.getElementById('newArmorStr').value = a.min_strength || '';
-    document.getElementById('newArmorWeight').value = a.weight || 0;
-    document.getElementById('newArmorCost').value = a.cost || '';
-    document.getElementById('newArmorNotes').value = a.notes || '';
-}
-
-async function loadGearCatalogue() {
-    const source = document.getElementById('catGearSource').value;
-    catGearCache = await api(`/api/catalogue/gear?source=${encodeURIComponent(source)}`);
-    const sel = document.getElementById('catGearPick');
-    sel.innerHTML = '<option value="">— Custom / Manual —</option>';
-    let lastSource = '';
-    catGearCache.forEach((g, i) => {
-        if (g.source !== lastSource) {
-            const grp = document.createElement('optgroup');
-            grp.label = g.source;
-            sel.appendChild(grp);
-            lastSource = g.source;
-        }
-        const opt = document.createElement('option');
-        opt.value = i;
-        opt.textContent = g.name;
-        const grps = sel.querySelectorAll('optgroup');
-        grps[grps.length-1].appendChild(opt);
-    });
+    const a = catArmorCache.get(document.getElementById('catArmorPick').value);
+    if (!a) return;
+    A.Name.value = a.name;
+    A.Prot.value = a.protection;
+    A.Area.value = a.area_protected || '';
+    A.Str.value = a.min_strength || '';
+    A.Weight.value = a.weight || 0;
+    A.Cost.value = a.cost || '';
+    A.Notes.value = a.notes || '';
 }
 
+function loadGearCatalogue() { return showEquipmentPicker('gear'); }
+
 function fillGearFromCat() {
-    const idx = document.getElementById('catGearPick').value;
-    if (idx === '') return;
-    const g = catGearCache[parseInt(idx)];
-    document.getElementById('newGearName').value = g.name;
-    document.getElementById('newGearQty').value = 1;
-    document.getElementById('newGearWeight').value = g.weight || 0;
-    document.getElementById('newGearCost').value = g.cost || '';
-    document.getElementById('newGearNotes').value = g.notes || '';
+    const g = catGearCache.get(document.getElementById('catGearPick').value);
+    if (!g) return;
+    G.Name.value = g.name;
+    G.Qty.value = 1;
+    G.Weight.value = g.weight || 0;
+    G.Cost.value = g.cost || '';
+    G.Notes.value = g.notes || '';
 }
 
 // ============================================================
@@ -3310,22 +4056,18 @@ function fillGearFromCat() {
 function openHindrancesModal(npcId, name) { openWorkspace('hindrances', npcId, name); }
 function closeHindrancesModal() { closeWorkspace(); }
 async function loadHindrances() {
-    const items = await api(`/api/npcs/${currentHindrancesNpcId}/hindrances`);
-    const el = document.getElementById('hindrancesList');
-    if (!items.length) { el.innerHTML = '<div style="color:var(--text-dim);font-size:12px">No hindrances yet</div>'; return; }
-    el.innerHTML = `<table class="data-table"><tr><th>Name</th><th>Severity</th><th>Notes</th><th></th></tr>${items.map(h => `
-        <tr><td>${h.name}</td><td style="color:${h.severity==='Major'?'var(--red)':'var(--text-dim)'}">${h.severity}</td><td>${h.notes||'—'}</td><td><button class="btn sm danger" onclick="deleteHindrance(${h.id})">×</button></td></tr>`).join('')}</table>`;
+    renderItemTable('hindrances', await npcItems(currentHindrancesNpcId, 'hindrance_items'));
 }
 async function addHindrance() {
     const data = {
-        name: document.getElementById('newHindName').value.trim(),
-        severity: document.getElementById('newHindSeverity').value,
-        notes: document.getElementById('newHindNotes').value.trim() || null,
+        name: H.Name.value.trim(),
+        severity: H.Severity.value,
+        notes: H.Notes.value.trim() || null,
     };
     if (!data.name) { alert('Hindrance name required'); return; }
     await api(`/api/npcs/${currentHindrancesNpcId}/hindrances`, 'POST', data);
-    ['newHindName','newHindNotes'].forEach(id => document.getElementById(id).value = '');
-    document.getElementById('newHindSeverity').value = 'Minor';
+    ['Name','Notes'].forEach(k => H[k].value = '');
+    H.Severity.value = 'Minor';
     document.getElementById('catHindrancePick').value = '';
     loadHindrances();
 }
@@ -3348,31 +4090,15 @@ async function loadHindranceSources() {
 }
 async function loadHindranceCatalogue() {
     const source = document.getElementById('catHindranceSource').value;
-    catHindrancesCache = await api(`/api/catalogue/hindrances?source=${encodeURIComponent(source)}`);
-    const sel = document.getElementById('catHindrancePick');
-    sel.innerHTML = '<option value="">— Custom / Manual —</option>';
-    let lastSource = '';
-    catHindrancesCache.forEach((h, i) => {
-        if (h.source !== lastSource) {
-            const grp = document.createElement('optgroup');
-            grp.label = h.source;
-            sel.appendChild(grp);
-            lastSource = h.source;
-        }
-        const opt = document.createElement('option');
-        opt.value = i;
-        opt.textContent = `${h.name} (${h.severity})`;
-        const grps = sel.querySelectorAll('optgroup');
-        grps[grps.length-1].appendChild(opt);
-    });
+    catHindrancesCache = await catalogueFor('hindrances', source);
+    fillCataloguePick(document.getElementById('catHindrancePick'), catHindrancesCache, CATALOGUE_LABELS.hindrance);
 }
 function fillHindranceFromCat() {
-    const idx = document.getElementById('catHindrancePick').value;
-    if (idx === '') return;
-    const h = catHindrancesCache[parseInt(idx)];
-    document.getElementById('newHindName').value = h.name;
-    document.getElementById('newHindSeverity').value = h.severity;
-    document.getElementById('newHindNotes').value = '';
+    const h = catHindrancesCache.get(document.getElementById('catHindrancePick').value);
+    if (!h) return;
+    H.Name.value = h.name;
+    H.Severity.value = h.severity;
+    H.Notes.value = '';
 }
 
 // ============================================================
@@ -3381,20 +4107,16 @@ function fillHindranceFromCat() {
 function openEdgesModal(npcId, name) { openWorkspace('edges', npcId, name); }
 function closeEdgesModal() { closeWorkspace(); }
 async function loadEdges() {
-    const items = await api(`/api/npcs/${currentEdgesNpcId}/edges`);
-    const el = document.getElementById('edgesList');
-    if (!items.length) { el.innerHTML = '<div style="color:var(--text-dim);font-size:12px">No edges yet</div>'; return; }
-    el.innerHTML = `<table class="data-table"><tr><th>Name</th><th>Notes</th><th></th></tr>${items.map(e => `
-        <tr><td>${e.name}</td><td>${e.notes||'—'}</td><td><button class="btn sm danger" onclick="deleteEdge(${e.id})">×</button></td></tr>`).join('')}</table>`;
+    renderItemTable('edges', await npcItems(currentEdgesNpcId, 'edge_items'));
 }
 async function addEdge() {
     const data = {
-        name: document.getElementById('newEdgeName').value.trim(),
-        notes: document.getElementById('newEdgeNotes').value.trim() || null,
+        name: E.Name.value.trim(),
+        notes: E.Notes.value.trim() || null,
     };
     if (!data.name) { alert('Edge name required'); return; }
     await api(`/api/npcs/${currentEdgesNpcId}/edges`, 'POST', data);
-    ['newEdgeName','newEdgeNotes'].forEach(id => document.getElementById(id).value = '');
+    ['Name','Notes'].forEach(k => E[k].value = '');
     document.getElementById('catEdgePick').value = '';
     loadEdges();
 }
@@ -3417,30 +4139,14 @@ async function loadEdgeSources() {
 }
 async function loadEdgeCatalogue() {
     const source = document.getElementById('catEdgeSource').value;
-    catEdgesCache = await api(`/api/catalogue/edges?source=${encodeURIComponent(source)}`);
-    const sel = document.getElementById('catEdgePick');
-    sel.innerHTML = '<option value="">— Custom / Manual —</option>';
-    let lastSource = '';
-    catEdgesCache.forEach((e, i) => {
-        if (e.source !== lastSource) {
-            const grp = document.createElement('optgroup');
-            grp.label = e.source;
-            sel.appendChild(grp);
-            lastSource = e.source;
-        }
-        const opt = document.createElement('option');
-        opt.value = i;
-        opt.textContent = `${e.name} (${e.rank}, ${e.type})`;
-        const grps = sel.querySelectorAll('optgroup');
-        grps[grps.length-1].appendChild(opt);
-    });
+    catEdgesCache = await catalogueFor('edges', source);
+    fillCataloguePick(document.getElementById('catEdgePick'), catEdgesCache, CATALOGUE_LABELS.edge);
 }
 function fillEdgeFromCat() {
-    const idx = document.getElementById('catEdgePick').value;
-    if (idx === '') return;
-    const e = catEdgesCache[parseInt(idx)];
-    document.getElementById('newEdgeName').value = e.name;
-    document.getElementById('newEdgeNotes').value = e.requirements || '';
+    const e = catEdgesCache.get(document.getElementById('catEdgePick').value);
+    if (!e) return;
+    E.Name.value = e.name;
+    E.Notes.value = e.requirements || '';
 }
 
 // ============================================================
@@ -3449,25 +4155,21 @@ function fillEdgeFromCat() {
 function openPowersModal(npcId, name) { openWorkspace('powers', npcId, name); }
 function closePowersModal() { closeWorkspace(); }
 async function loadPowers() {
-    const items = await api(`/api/npcs/${currentPowersNpcId}/powers`);
-    const el = document.getElementById('powersList');
-    if (!items.length) { el.innerHTML = '<div style="color:var(--text-dim);font-size:12px">No powers yet</div>'; return; }
-    el.innerHTML = `<table class="data-table"><tr><th>Name</th><th>PP</th><th>Range</th><th>Duration</th><th>Trapping</th><th></th></tr>${items.map(p => `
-        <tr><td>${p.name}</td><td>${p.power_points||'—'}</td><td>${p.range||'—'}</td><td>${p.duration||'—'}</td><td>${p.trapping||'—'}</td><td><button class="btn sm danger" onclick="deletePower(${p.id})">×</button></td></tr>`).join('')}</table>`;
+    renderItemTable('powers', await npcItems(currentPowersNpcId, 'power_items'));
 }
 async function addPower() {
     const data = {
-        name: document.getElementById('newPowerName').value.trim(),
-        power_points: parseInt(document.getElementById('newPowerPP').value) || 0,
-        range: document.getElementById('newPowerRange').value.trim() || null,
-        duration: document.getElementById('newPowerDuration').value.trim() || null,
-        trapping: document.getElementById('newPowerTrapping').value.trim() || null,
-        notes: document.getElementById('newPowerNotes').value.trim() || null,
+        name: P.Name.value.trim(),
+        power_points: parseInt(P.PP.value) || 0,
+        range: P.Range.value.trim() || null,
+        duration: P.Duration.value.trim() || null,
+        trapping: P.Trapping.value.trim() || null,
+        notes: P.Notes.value.trim() || null,
     };
     if (!data.name) { alert('Power name required'); return; }
     await api(`/api/npcs/${currentPowersNpcId}/powers`, 'POST', data);
-    ['newPowerName','newPowerRange','newPowerDuration','newPowerTrapping','newPowerNotes'].forEach(id => document.getElementById(id).value = '');
-    document.getElementById('newPowerPP').value = 0;
+    ['Name','Range','Duration','Trapping','Notes'].forEach(k => P[k].value = '');
+    P.PP.value = 0;
     document.getElementById('catPowerPick').value = '';
     loadPowers();
 }
@@ -3490,116 +4192,136 @@ async function loadPowerSources() {
 }
 async function loadPowerCatalogue() {
     const source = document.getElementById('catPowerSource').value;
-    catPowersCache = await api(`/api/catalogue/powers?source=${encodeURIComponent(source)}`);
-    const sel = document.getElementById('catPowerPick');
-    sel.innerHTML = '<option value="">— Custom / Manual —</option>';
-    let lastSource = '';
-    catPowersCache.forEach((p, i) => {
-        if (p.source !== lastSource) {
-            const grp = document.createElement('optgroup');
-            grp.label = p.source;
-            sel.appendChild(grp);
-            lastSource = p.source;
-        }
-        const opt = document.createElement('option');
-        opt.value = i;
-        opt.textContent = `${p.name} (${p.pp} PP, ${p.rank})`;
-        const grps = sel.querySelectorAll('optgroup');
-        grps[grps.length-1].appendChild(opt);
-    });
+    catPowersCache = await catalogueFor('powers', source);
+    fillCataloguePick(document.getElementById('catPowerPick'), catPowersCache, CATALOGUE_LABELS.power);
 }
 function fillPowerFromCat() {
-    const idx = document.getElementById('catPowerPick').value;
-    if (idx === '') return;
-    const p = catPowersCache[parseInt(idx)];
-    document.getElementById('newPowerName').value = p.name;
-    document.getElementById('newPowerPP').value = parseInt(p.pp) || 0;
-    document.getElementById('newPowerRange').value = p.range || '';
-    document.getElementById('newPowerDuration').value = p.duration || '';
-    document.getElementById('newPowerTrapping').value = '';
-    document.getElementById('newPowerNotes').value = p.summary || '';
+    const p = catPowersCache.get(document.getElementById('catPowerPick').value);
+    if (!p) return;
+    P.Name.value = p.name;
+    P.PP.value = parseInt(p.pp) || 0;
+    P.Range.value = p.range || '';
+    P.Duration.value = p.duration || '';
+    P.Trapping.value = '';
+    P.Notes.value = p.summary || '';
 }
 
 // ============================================================
 // CATALOGUE SEARCH FILTER (universal for all 6 catalogues)
 // ============================================================
-function filterCatalogue(type) {
-    const config = {
-        weapon:    { cache: catWeaponsCache,    pickId: 'catWeaponPick',    searchId: 'catWeaponSearch',    label: w => `${w.name} (${w.damage_str}${w.ap ? ', AP '+w.ap : ''})` },
-        armor:     { cache: catArmorCache,      pickId: 'catArmorPick',     searchId: 'catArmorSearch',     label: a => `${a.name} (+${a.protection})` },
-        gear:      { cache: catGearCache,       pickId: 'catGearPick',      searchId: 'catGearSearch',      label: g => g.name },
-        hindrance: { cache: catHindrancesCache, pickId: 'catHindrancePick', searchId: 'catHindranceSearch', label: h => `${h.name} (${h.severity})` },
-        edge:      { cache: catEdgesCache,      pickId: 'catEdgePick',      searchId: 'catEdgeSearch',      label: e => `${e.name} (${e.rank}, ${e.type})` },
-        power:     { cache: catPowersCache,     pickId: 'catPowerPick',     searchId: 'catPowerSearch',     label: p => `${p.name} (${p.pp} PP, ${p.rank})` },
-    };
-    const c = config[type];
-    if (!c) return;
-    const query = document.getElementById(c.searchId).value.toLowerCase().trim();
-    const sel = document.getElementById(c.pickId);
-    sel.innerHTML = '<option value="">— Custom / Manual —</option>';
-    
-    const filtered = query ? c.cache.filter((item, i) => {
-        const text = c.label(item).toLowerCase();
-        return text.includes(query);
-    }) : c.cache;
-    
-    let lastSource = '';
-    filtered.forEach(item => {
-        const origIdx = c.cache.indexOf(item);
-        if (item.source !== lastSource) {
-            const grp = document.createElement('optgroup');
+const CATALOGUE_LABELS = {
+    hindrance: h => `${h.name} (${h.severity})`,
+    edge:      e => `${e.name} (${e.rank}, ${e.type})`,
+    power:     p => `${p.name} (${p.pp} PP, ${p.rank})`,
+};
+
+// Rebuild a catalogue <select>: options are grouped per run of same-source
+// items into optgroups held in a local, built off-DOM in one fragment and
+// attached with a single replaceChildren. Values are the items Map's keys.
+function fillCataloguePick(sel, items, label, query) {
+    const frag = document.createDocumentFragment();
+    let grp = null, shown = 0;
+    items.forEach((item, key) => {
+        const text = label(item);
+        if (query && !text.toLowerCase().includes(query)) return;
+        if (!grp || grp.label !== item.source) {
+            grp = document.createElement('optgroup');
             grp.label = item.source;
-            sel.appendChild(grp);
-            lastSource = item.source;
+            frag.appendChild(grp);
         }
         const opt = document.createElement('option');
-        opt.value = origIdx;
-        opt.textContent = c.label(item);
-        const grps = sel.querySelectorAll('optgroup');
-        grps[grps.length-1].appendChild(opt);
+        opt.value = key;
+        opt.textContent = text;
+        grp.appendChild(opt);
+        shown++;
     });
-    
-    if (query && filtered.length === 0) {
+    if (query && !shown) {
         const opt = document.createElement('option');
         opt.value = ''; opt.textContent = '— No matches —'; opt.disabled = true;
-        sel.appendChild(opt);
+        frag.appendChild(opt);
     }
+    const manual = document.createElement('option');
+    manual.value = ''; manual.textContent = '— Custom / Manual —';
+    sel.replaceChildren(manual, frag);
+}
+
+function filterCatalogue(type) {
+    if (EQUIPMENT_PICKERS[type]) { filterEquipmentPicker(type); return; }
+    const config = {
+        hindrance: { cache: catHindrancesCache, pickId: 'catHindrancePick', searchId: 'catHindranceSearch' },
+        edge:      { cache: catEdgesCache,      pickId: 'catEdgePick',      searchId: 'catEdgeSearch' },
+        power:     { cache: catPowersCache,     pickId: 'catPowerPick',     searchId: 'catPowerSearch' },
+    };
+    const c = config[type];
+    if (!c) return;
+    const query = document.getElementById(c.searchId).value.toLowerCase().trim();
+    fillCataloguePick(document.getElementById(c.pickId), c.cache, CATALOGUE_LABELS[type], query);
 }
 
 // ============================================================
 // STATUS TOGGLES
 // ============================================================
-async function toggleStatus(npcId, field, value) {
-    await api(`/api/npcs/${npcId}`, 'PUT', {[field]: value ? 1 : 0});
-    await loadNPCs();
+// Toggles are queued and flushed together: a burst of clicks becomes one
+// PUT /api/npcs/batch and one list reload instead of a round-trip each.
+const STATUS_FLUSH_MS = 80;
+let pendingStatus = new Map();  // "id:field" → {id, field, value}
+let statusFlushT = 0;
+
+function toggleStatus(npcId, field, value) {
+    pendingStatus.set(npcId + ':' + field, {id: npcId, field, value: value ? 1 : 0});
+    clearTimeout(statusFlushT);
+    statusFlushT = setTimeout(flushStatus, STATUS_FLUSH_MS);
+}
+
+async function flushStatus() {
+    const updates = [...pendingStatus.values()];
+    pendingStatus = new Map();
+    if (!updates.length) return;
+    await api('/api/npcs/batch', 'PUT', updates);
+    scheduleReload();
+}
+
+// Trailing-edge reload so several mutations in quick succession share one
+// fetch and one sidebar rerender
+let reloadT = 0;
+function scheduleReload() {
+    clearTimeout(reloadT);
+    reloadT = setTimeout(loadNPCs, STATUS_FLUSH_MS);
 }
 
 // ============================================================
 // EXPORTS
 // ============================================================
+// Export text goes into the panel's <pre> as a text node: no HTML parse of
+// the payload and no escaping pass. The panel is reused if already shown.
+const exportPanelTemplate = document.getElementById('exportPanelTemplate');
+function showExport(out, title, text) {
+    if (!out) return;
+    let panel = out.firstElementChild;
+    if (!panel || !panel.classList.contains('export-panel')) {
+        out.replaceChildren(exportPanelTemplate.content.cloneNode(true));
+        panel = out.firstElementChild;
+    }
+    panel.querySelector('h3').textContent = title;
+    panel.querySelector('pre').textContent = text;
+}
+
 async function exportStatblock(npcId) {
     const data = await api(`/api/npcs/${npcId}/statblock`);
-    document.getElementById('exportOutput').innerHTML = `
-        <div class="export-panel">
-            <h3 style="font-size:13px;color:var(--accent)">STAT BLOCK (Markdown)</h3>
-            <pre>${data.statblock}</pre>
-            <button class="btn sm" onclick="copyToClipboard(this)" style="margin-top:6px">Copy</button>
-        </div>`;
+    showExport(document.getElementById('exportOutput'), 'STAT BLOCK (Markdown)', data.statblock);
 }
 
 async function exportFGXml(npcId) {
     const data = await api(`/api/npcs/${npcId}/fgxml`);
-    document.getElementById('exportOutput').innerHTML = `
-        <div class="export-panel">
-            <h3 style="font-size:13px;color:var(--accent)">FANTASY GROUNDS XML</h3>
-            <pre>${escapeHtml(data.xml)}</pre>
-            <button class="btn sm" onclick="copyToClipboard(this)" style="margin-top:6px">Copy</button>
-        </div>`;
+    showExport(document.getElementById('exportOutput'), 'FANTASY GROUNDS XML', data.xml);
 }
 
+// One pass over the string with a lookup per match, rather than a full
+// split/join per character; quotes are covered so the result is attribute-safe
+const HTML_ESCAPES = {'&': '&amp;', '<': '&lt;', '>': '&gt;', '"': '&quot;', "'": '&#39;'};
 function escapeHtml(s) {
     if (!s) return '';
-    return s.split('&').join('&amp;').split('<').join('&lt;').split('>').join('&gt;');
+    return String(s).replace(/[&<>"']/g, c => HTML_ESCAPES[c]);
 }
 
 function mdToHtml(md) {
@@ -3636,7 +4358,7 @@ async function deleteNPC(id) {
     currentNPC = null;
     document.getElementById('mainContent').innerHTML = 'Select an NPC or create a new one';
     document.getElementById('mainContent').classList.add('empty-state');
-    await loadNPCs();
+    scheduleReload();
 }
 
 // ============================================================
@@ -3646,9 +4368,12 @@ async function showStatusView() {
     const data = await api('/api/status');
     const el = document.getElementById('mainContent');
     el.classList.remove('empty-state');
+    // Only the highlight changes; the virtual sidebar keeps its rows
+    markActiveRow(currentNPC && currentNPC.id, null);
     currentNPC = null;
-    filterNPCs();
 
+    // One row per region × tier (v_region_status), so the table stays a
+    // couple of dozen rows and is rendered directly rather than windowed
     const rows = data.map(r => `
         <tr><td>${r.region}</td><td>${r.tier}</td><td>${r.total}</td><td>${r.stats_done}</td><td>${r.narrative_done}</td><td>${r.fg_ready}</td></tr>`).join('');
 
@@ -3664,14 +4389,12 @@ async function showStatusView() {
         <div id="exportOutput"></div>`;
 }
 
+// The module comes back as raw streamed XML rather than JSON
 async function exportRegionFG() {
-    const data = await api('/api/export/all');
-    document.getElementById('exportOutput').innerHTML = `
-        <div class="export-panel">
-            <h3 style="font-size:13px;color:var(--accent)">FULL FG MODULE XML (${data.count} NPCs)</h3>
-            <pre>${escapeHtml(data.xml)}</pre>
-            <button class="btn sm" onclick="copyToClipboard(this)" style="margin-top:6px">Copy</button>
-        </div>`;
+    const res = await fetch('/api/export/all');
+    const xml = await res.text();
+    showExport(document.getElementById('exportOutput'),
+        `FULL FG MODULE XML (${res.headers.get('X-NPC-Count')} NPCs)`, xml);
 }
 
 // ============================================================
@@ -3680,12 +4403,12 @@ async function exportRegionFG() {
 let settingsVersions = null;
 
 async function openSettingsModal() {
-    document.getElementById('settingsModal').classList.add('active');
+    settingsModal.classList.add('active');
     showSettingsTab('versions');
 }
 
 function closeSettingsModal() {
-    document.getElementById('settingsModal').classList.remove('active');
+    settingsModal.classList.remove('active');
 }
 
 async function showSettingsTab(tab) {
@@ -3774,8 +4497,8 @@ async function showSettingsTab(tab) {
                     <td style="padding:6px 4px;font-size:11px;color:var(--text-dim)">${b.size}</td>
                     <td style="padding:6px 4px;font-size:11px;color:var(--text-dim)">${b.date}</td>
                     <td style="padding:6px 4px;text-align:right">
-                        <button class="btn" onclick="restoreBackup('${b.name}')" style="font-size:11px;padding:2px 8px">Restore</button>
-                        <button class="btn" onclick="deleteBackup('${b.name}')" style="font-size:11px;padding:2px 8px;margin-left:4px">✗</button>
+                        <button class="btn" data-action="restore-backup" data-name="${b.name}" style="font-size:11px;padding:2px 8px">Restore</button>
+                        <button class="btn" data-action="delete-backup" data-name="${b.name}" style="font-size:11px;padding:2px 8px;margin-left:4px">✗</button>
                     </td>
                 </tr>`;
             }
@@ -4024,6 +4747,9 @@ async function executeMigration() {
             if (result.warnings && result.warnings.length) {
                 status.innerHTML += '<br>' + result.warnings.map(w => `<span style="color:var(--warning, #e6a817);font-size:10px">⚠ ${w}</span>`).join('<br>');
             }
+            if (result.warnings_suppressed) {
+                status.innerHTML += `<br><span style="color:var(--warning, #e6a817);font-size:10px">… ${result.warnings_suppressed} more skipped items not shown</span>`;
+            }
         } else {
             status.innerHTML = `<span style="color:var(--danger)">✗ ${result.error || 'Migration failed'}</span>`;
             btn.disabled = false;
@@ -4092,87 +4818,257 @@ async function openGitHubDesktop() {
 // ============================================================
 // INIT
 // ============================================================
+function debounce(fn, ms) {
+    let timer = null;
+    return (...args) => {
+        clearTimeout(timer);
+        timer = setTimeout(() => fn(...args), ms);
+    };
+}
+// Filter-control input coalesces to at most one pass per frame, and a burst
+// that ends where it started (type then backspace) renders nothing at all
+function scheduleFilter() {
+    if (npcFilterFrame) return;
+    npcFilterFrame = requestAnimationFrame(() => {
+        npcFilterFrame = 0;
+        filterNPCs(true);
+    });
+}
+searchInput.addEventListener('input', debounce(scheduleFilter, 150));
+
+function scheduleNPCWindow() {
+    if (npcListFramePending) return;
+    npcListFramePending = true;
+    requestAnimationFrame(() => {
+        npcListFramePending = false;
+        renderNPCWindow();
+    });
+}
+npcListEl.addEventListener('scroll', scheduleNPCWindow, { passive: true });
+window.addEventListener('resize', scheduleNPCWindow);
+
+// Warm the equipment catalogues while the page is idle so the pickers are
+// ready by the time a Weapons/Armour workspace is opened
+(window.requestIdleCallback || (cb => setTimeout(cb, 200)))(() => {
+    loadEquipmentPicker('weapon');
+    loadEquipmentPicker('armor');
+    if (!catSourceList) api('/api/catalogue/sources').then(list => { catSourceList = list; });
+}, { timeout: 2000 });
+
+// One delegated listener per container instead of a handler on every row/button
+function npcFromRow(target) {
+    const row = target.closest('.npc-item');
+    return row ? row._npc : null;
+}
+npcListEl.addEventListener('click', e => {
+    const n = npcFromRow(e.target);
+    if (n) selectNPC(n.id);
+});
+npcListEl.addEventListener('mouseover', e => {
+    const n = npcFromRow(e.target);
+    if (n) prefetchPortrait(n);
+});
+
+const ACTIONS = {
+    'new-npc':   () => openAddModal(),
+    'status':    () => showStatusView(),
+    'settings':  () => openSettingsModal(),
+    'edit':      () => toggleDetailWorkspace('edit'),
+    'statblock': () => toggleDetailWorkspace('statblock'),
+    'fgxml':     () => toggleDetailWorkspace('fgxml'),
+    'workspace': el => toggleDetailWorkspace(el.dataset.ws),
+    'delete':    () => deleteNPC(currentNPC.id),
+    // Row × buttons in the workspace / skills tables carry the row id
+    'delete-weapon':    el => deleteWeapon(+el.dataset.id),
+    'delete-armor':     el => deleteArmor(+el.dataset.id),
+    'delete-gear':      el => deleteGear(+el.dataset.id),
+    'delete-skill':     el => deleteSkill(+el.dataset.id),
+    'delete-hindrance': el => deleteHindrance(+el.dataset.id),
+    'delete-edge':      el => deleteEdge(+el.dataset.id),
+    'delete-power':     el => deletePower(+el.dataset.id),
+    // Backup rows in the settings modal carry the file name
+    'restore-backup':   el => restoreBackup(el.dataset.name),
+    'delete-backup':    el => deleteBackup(el.dataset.name),
+};
+function dispatchAction(e) {
+    const el = e.target.closest('[data-action]');
+    if (el && ACTIONS[el.dataset.action]) ACTIONS[el.dataset.action](el);
+}
+document.getElementById('sidebarFooter').addEventListener('click', dispatchAction);
+document.getElementById('mainContent').addEventListener('click', dispatchAction);
+skillsModal.addEventListener('click', dispatchAction);
+settingsModal.addEventListener('click', dispatchAction);
+
 loadNPCs();
 </script>
 </body>
 </html>
 '''
 
+HTML_TEMPLATE = HTML_TEMPLATE.replace('<!-- ATTRIBUTE_DIE_SELECTS -->', '\n            '.join(
+    die_select(f'f_{attr.lower()}', attr) for attr in ('Agility', 'Smarts', 'Spirit', 'Strength', 'Vigor')))
+
+def minify_css(css):
+    """Conservative CSS minifier: drops comments and collapses whitespace,
+    leaving quoted strings (e.g. content: '...') untouched."""
+    css = re.sub(r'/\*.*?\*/', '', css, flags=re.S)
+    parts = re.split(r'(\'[^\']*\'|"[^"]*")', css)
+    for i in range(0, len(parts), 2):
+        chunk = re.sub(r'\s+', ' ', parts[i])
+        parts[i] = re.sub(r' ?([{};,>]) ?', r'\1', chunk)
+    return ''.join(parts).replace(';}', '}').strip()
+
+HTML_TEMPLATE = re.sub(r'(<style>)(.*?)(</style>)',
+                       lambda m: m.group(1) + minify_css(m.group(2)) + m.group(3),
+                       HTML_TEMPLATE, count=1, flags=re.S)
+
 # ============================================================
 # API ROUTES
 # ============================================================
 
+# The page is fully static (all state is fetched by its JS), so encode it once
+# and let browsers revalidate against the ETag instead of re-downloading it.
+HTML_BYTES = HTML_TEMPLATE.encode('utf-8')
+HTML_ETAG = hashlib.md5(HTML_BYTES).hexdigest()
+# Compressed variants are also built once, so no request pays for compression
+HTML_GZIP = gzip.compress(HTML_BYTES, compresslevel=9, mtime=0)
+HTML_BROTLI = brotli.compress(HTML_BYTES, quality=11) if brotli else None
+
 @app.route('/')
 def index():
-    return render_template_string(HTML_TEMPLATE)
+    body, etag, encoding = HTML_BYTES, HTML_ETAG, None
+    if HTML_BROTLI is not None and request.accept_encodings['br']:
+        body, etag, encoding = HTML_BROTLI, HTML_ETAG + '-br', 'br'
+    elif request.accept_encodings['gzip']:
+        body, etag, encoding = HTML_GZIP, HTML_ETAG + '-gz', 'gzip'
+    resp = Response(body, mimetype='text/html')
+    if encoding:
+        resp.headers['Content-Encoding'] = encoding
+    resp.set_etag(etag)
+    resp.headers['Cache-Control'] = 'no-cache'
+    resp.headers['Vary'] = 'Accept-Encoding'
+    return resp.make_conditional(request)
+
+# Detail fields layered onto an npcs row: decoded JSON columns, then one list
+# per related table. Each query is written once and either run unfiltered, so
+# the full roster loads in one query per table, or folded into a single-NPC
+# statement by npc_detail_sql.
+NPC_JSON_FIELDS = (
+    ('edges', 'edges_json'),
+    ('hindrances', 'hindrances_json'),
+    ('gear', 'gear_json'),
+    ('powers', 'powers_json'),
+    ('special_abilities', 'special_abilities_json'),
+)
+NPC_RELATED = (
+    ('skills', "SELECT * FROM npc_skills{where} ORDER BY name", 'npc_id'),
+    ('weapons', "SELECT * FROM npc_weapons{where}", 'npc_id'),
+    ('armor', "SELECT * FROM npc_armor{where} ORDER BY name", 'npc_id'),
+    ('gear_items', "SELECT * FROM npc_gear{where} ORDER BY name", 'npc_id'),
+    ('hindrance_items', "SELECT * FROM npc_hindrances{where} ORDER BY severity DESC, name", 'npc_id'),
+    ('edge_items', "SELECT * FROM npc_edges{where} ORDER BY name", 'npc_id'),
+    ('power_items', "SELECT * FROM npc_powers{where} ORDER BY name", 'npc_id'),
+    ('organisations_detail', """
+        SELECT no2.npc_id, o.name, no2.role FROM npc_organisations no2
+        JOIN organisations o ON o.id = no2.org_id{where}""", 'no2.npc_id'),
+    # Each connection is listed from both ends. UNION ALL skips the dedup sort;
+    # the mirrored branch instead drops rows its reverse already produced.
+    ('connections', """
+        SELECT * FROM (
+            SELECT c.npc_id_a AS npc_id, n.name, c.relationship FROM npc_connections c
+            JOIN npcs n ON n.id = c.npc_id_b
+            UNION ALL
+            SELECT c.npc_id_b AS npc_id, n.name, c.relationship FROM npc_connections c
+            JOIN npcs n ON n.id = c.npc_id_a
+            WHERE NOT EXISTS (SELECT 1 FROM npc_connections r WHERE r.npc_id_a = c.npc_id_b
+                              AND r.npc_id_b = c.npc_id_a AND r.relationship = c.relationship)){where}""", 'npc_id'),
+    ('appearances', "SELECT * FROM npc_appearances{where}", 'npc_id'),
+)
+
+_npc_detail_sql = None
+
+def npc_detail_sql(conn):
+    """One statement returning an npcs row with every NPC_RELATED list folded
+    in as a JSON array column, so a single NPC costs one SQLite round-trip.
+    Built on first use from the related queries' own column lists."""
+    global _npc_detail_sql
+    if _npc_detail_sql is None:
+        lists = []
+        for key, sql, col in NPC_RELATED:
+            sub = sql.format(where=f' WHERE {col} = :id')
+            cols = [d[0] for d in conn.execute(f"SELECT * FROM ({sql.format(where='')}) LIMIT 0").description]
+            obj = ', '.join(f"'{c}', r.\"{c}\"" for c in cols)
+            lists.append(f"(SELECT json_group_array(json_object({obj})) FROM ({sub}) r) AS \"{key}\"")
+        _npc_detail_sql = f"SELECT n.*, {', '.join(lists)} FROM npcs n WHERE n.id = :id"
+    return _npc_detail_sql
+
+def load_npc_details(conn, npc_id=None):
+    """Return {id: detail dict} for one NPC, or for every NPC when npc_id is None."""
+    if npc_id is not None:
+        row = conn.execute(npc_detail_sql(conn), {'id': npc_id}).fetchone()
+        if row is None:
+            return {}
+        npc = dict(row)
+        for key, col in NPC_JSON_FIELDS:
+            npc[key] = json_loads(npc.get(col) or '[]')
+        for key, _, _ in NPC_RELATED:
+            npc[key] = json_loads(npc[key])
+        return {npc_id: npc}
+
+    npcs = {}
+    for row in conn.execute("SELECT * FROM npcs"):
+        npc = dict(row)
+        for key, col in NPC_JSON_FIELDS:
+            npc[key] = json_loads(npc.get(col) or '[]')
+        for key, _, _ in NPC_RELATED:
+            npc[key] = []
+        npcs[npc['id']] = npc
+    if not npcs:
+        return npcs
+
+    for key, sql, _ in NPC_RELATED:
+        for row in conn.execute(sql.format(where='')):
+            npc = npcs.get(row['npc_id'])
+            if npc is not None:
+                npc[key].append(row)
+    return npcs
 
 @app.route('/api/npcs', methods=['GET'])
 def api_list_npcs():
     conn = get_db()
-    rows = conn.execute("SELECT * FROM v_npc_overview ORDER BY region, tier, name").fetchall()
-    conn.close()
-    return jsonify(rows_to_list(rows))
+    rows = conn.execute("""SELECT v.*, n.portrait_path FROM v_npc_overview v
+        JOIN npcs n ON n.id = v.id ORDER BY v.region, v.tier, v.name""").fetchall()
+    if request.args.get('full'):
+        # ?full=1 embeds each NPC's detail record so the client can select
+        # without a follow-up /api/npcs/<id> round-trip
+        details = load_npc_details(conn)
+        rows = [{**details[row['id']], **dict(row)} for row in rows]
+    return jsonify(rows)
 
 @app.route('/api/npcs/<int:npc_id>', methods=['GET'])
 def api_get_npc(npc_id):
-    conn = get_db()
-    npc = row_to_dict(conn.execute("SELECT * FROM npcs WHERE id=?", (npc_id,)).fetchone())
+    npc = load_npc_details(get_db(), npc_id).get(npc_id)
     if not npc:
         return jsonify({'error': 'Not found'}), 404
-
-    # Parse JSON fields
-    npc['edges'] = json.loads(npc.get('edges_json') or '[]')
-    npc['hindrances'] = json.loads(npc.get('hindrances_json') or '[]')
-    npc['gear'] = json.loads(npc.get('gear_json') or '[]')
-    npc['powers'] = json.loads(npc.get('powers_json') or '[]')
-    npc['special_abilities'] = json.loads(npc.get('special_abilities_json') or '[]')
-
-    # Related data
-    npc['skills'] = rows_to_list(conn.execute(
-        "SELECT * FROM npc_skills WHERE npc_id=? ORDER BY name", (npc_id,)).fetchall())
-    npc['weapons'] = rows_to_list(conn.execute(
-        "SELECT * FROM npc_weapons WHERE npc_id=?", (npc_id,)).fetchall())
-    npc['armor'] = rows_to_list(conn.execute(
-        "SELECT * FROM npc_armor WHERE npc_id=?", (npc_id,)).fetchall())
-    npc['gear_items'] = rows_to_list(conn.execute(
-        "SELECT * FROM npc_gear WHERE npc_id=? ORDER BY name", (npc_id,)).fetchall())
-    npc['hindrance_items'] = rows_to_list(conn.execute(
-        "SELECT * FROM npc_hindrances WHERE npc_id=? ORDER BY severity DESC, name", (npc_id,)).fetchall())
-    npc['edge_items'] = rows_to_list(conn.execute(
-        "SELECT * FROM npc_edges WHERE npc_id=? ORDER BY name", (npc_id,)).fetchall())
-    npc['power_items'] = rows_to_list(conn.execute(
-        "SELECT * FROM npc_powers WHERE npc_id=? ORDER BY name", (npc_id,)).fetchall())
-    npc['organisations_detail'] = rows_to_list(conn.execute("""
-        SELECT o.name, no2.role FROM npc_organisations no2
-        JOIN organisations o ON o.id = no2.org_id WHERE no2.npc_id = ?
-    """, (npc_id,)).fetchall())
-    npc['connections'] = rows_to_list(conn.execute("""
-        SELECT n.name, c.relationship FROM npc_connections c
-        JOIN npcs n ON n.id = c.npc_id_b WHERE c.npc_id_a = ?
-        UNION
-        SELECT n.name, c.relationship FROM npc_connections c
-        JOIN npcs n ON n.id = c.npc_id_a WHERE c.npc_id_b = ?
-    """, (npc_id, npc_id)).fetchall())
-    npc['appearances'] = rows_to_list(conn.execute(
-        "SELECT * FROM npc_appearances WHERE npc_id=?", (npc_id,)).fetchall())
-
-    conn.close()
     return jsonify(npc)
 
+# npcs columns the client may write. SQL is always built in this order, so a
+# given set of fields yields the same statement text and sqlite3's statement
+# cache reuses the prepared UPDATE instead of recompiling it.
+NPC_COLUMNS = ('name','title','region','tier','archetype','rank_guideline','gender','ancestry','quote',
+               'description','background','motivation','secret','services','adventure_hook',
+               'tactics','agility','smarts','spirit','strength','vigor','pace','parry',
+               'toughness','toughness_armor','size','bennies','wounds_max','power_points','arcane_bg',
+               'edges_json','hindrances_json','gear_json','powers_json','special_abilities_json',
+               'stat_block_complete','narrative_complete','fg_export_ready',
+               'source_document','notes')
+
 @app.route('/api/npcs', methods=['POST'])
 def api_create_npc():
     data = request.json
     conn = get_db()
 
-    fields = ['name','title','region','tier','archetype','rank_guideline','quote',
-              'description','background','motivation','secret','services','adventure_hook',
-              'tactics','agility','smarts','spirit','strength','vigor','pace','parry',
-              'toughness','toughness_armor','bennies','power_points','arcane_bg',
-              'edges_json','hindrances_json','gear_json','powers_json',
-              'stat_block_complete','narrative_complete','fg_export_ready',
-              'source_document','notes']
-
-    present = {k: data[k] for k in fields if k in data}
+    present = {k: data[k] for k in NPC_COLUMNS if k in data}
     cols = ', '.join(present.keys())
     placeholders = ', '.join(['?'] * len(present))
     values = list(present.values())
@@ -4180,32 +5076,57 @@ def api_create_npc():
     cursor = conn.execute(f"INSERT INTO npcs ({cols}) VALUES ({placeholders})", values)
     npc_id = cursor.lastrowid
     conn.commit()
-    conn.close()
     return jsonify({'id': npc_id})
 
 @app.route('/api/npcs/<int:npc_id>', methods=['PUT'])
 def api_update_npc(npc_id):
-    data = request.json
+    data = request.json or {}
+    unknown = data.keys() - set(NPC_COLUMNS)
+    if unknown:
+        return jsonify({'error': f"Unknown field: {', '.join(sorted(unknown))}"}), 400
     conn = get_db()
 
-    sets = []
-    values = []
-    for k, v in data.items():
-        sets.append(f"{k} = ?")
-        values.append(v)
+    cols = [k for k in NPC_COLUMNS if k in data]
+    if not cols:
+        return jsonify({'id': npc_id})
+    values = [data[k] for k in cols]
     values.append(npc_id)
 
-    conn.execute(f"UPDATE npcs SET {', '.join(sets)} WHERE id = ?", values)
+    conn.execute(f"UPDATE npcs SET {', '.join(f'{k} = ?' for k in cols)} WHERE id = ?", values)
     conn.commit()
-    conn.close()
     return jsonify({'id': npc_id})
 
+# Columns the status toggles may write through the batch endpoint
+STATUS_FIELDS = ('stat_block_complete', 'narrative_complete', 'fg_export_ready')
+
+@app.route('/api/npcs/batch', methods=['PUT'])
+def api_batch_status():
+    """Apply a list of {id, field, value} status flags in one transaction."""
+    updates = request.get_json(silent=True)
+    if not isinstance(updates, list):
+        return jsonify({'error': "Expected a list of {id, field, value} updates"}), 400
+    by_field = {}
+    for u in updates:
+        if not isinstance(u, dict):
+            return jsonify({'error': "Each update must be an object"}), 400
+        npc_id = u.get('id')
+        if not isinstance(npc_id, int) or isinstance(npc_id, bool):
+            return jsonify({'error': f"Invalid NPC id: {npc_id!r}"}), 400
+        if u.get('field') not in STATUS_FIELDS:
+            return jsonify({'error': f"Unknown status field: {u.get('field')}"}), 400
+        by_field.setdefault(u['field'], []).append((1 if u.get('value') else 0, npc_id))
+    conn = get_db()
+    updated = 0
+    with conn:
+        for field, rows in by_field.items():
+            updated += conn.executemany(f"UPDATE npcs SET {field} = ? WHERE id = ?", rows).rowcount
+    return jsonify({'ok': True, 'updated': updated})
+
 @app.route('/api/npcs/<int:npc_id>', methods=['DELETE'])
 def api_delete_npc(npc_id):
     conn = get_db()
     conn.execute("DELETE FROM npcs WHERE id=?", (npc_id,))
     conn.commit()
-    conn.close()
     return jsonify({'deleted': npc_id})
 
 # --- SKILLS ---
@@ -4213,25 +5134,24 @@ def api_delete_npc(npc_id):
 def api_get_skills(npc_id):
     conn = get_db()
     rows = conn.execute("SELECT * FROM npc_skills WHERE npc_id=? ORDER BY name", (npc_id,)).fetchall()
-    conn.close()
-    return jsonify(rows_to_list(rows))
+    return jsonify(rows)
 
 @app.route('/api/npcs/<int:npc_id>/skills', methods=['POST'])
 def api_add_skill(npc_id):
     data = request.json
     conn = get_db()
-    conn.execute("INSERT OR REPLACE INTO npc_skills (npc_id, name, die) VALUES (?,?,?)",
-                 (npc_id, data['name'], data['die']))
+    cur = conn.execute("INSERT OR REPLACE INTO npc_skills (npc_id, name, die) VALUES (?,?,?)",
+                       (npc_id, data['name'], data['die']))
     conn.commit()
-    conn.close()
-    return jsonify({'ok': True})
+    # Hand back the stored row so the client can update its list without a re-GET
+    row = conn.execute("SELECT * FROM npc_skills WHERE id=?", (cur.lastrowid,)).fetchone()
+    return jsonify({'ok': True, 'skill': row})
 
 @app.route('/api/skills/<int:skill_id>', methods=['DELETE'])
 def api_delete_skill(skill_id):
     conn = get_db()
     conn.execute("DELETE FROM npc_skills WHERE id=?", (skill_id,))
     conn.commit()
-    conn.close()
     return jsonify({'deleted': skill_id})
 
 # --- WEAPONS ---
@@ -4239,29 +5159,27 @@ def api_delete_skill(skill_id):
 def api_get_weapons(npc_id):
     conn = get_db()
     rows = conn.execute("SELECT * FROM npc_weapons WHERE npc_id=?", (npc_id,)).fetchall()
-    conn.close()
-    return jsonify(rows_to_list(rows))
+    return jsonify(rows)
 
 @app.route('/api/npcs/<int:npc_id>/weapons', methods=['POST'])
 def api_add_weapon(npc_id):
     d = request.json
     conn = get_db()
-    conn.execute("""INSERT INTO npc_weapons (npc_id, name, damage_str, damagedice,
-                    armor_piercing, trait_type, range, reach, notes)
-                    VALUES (?,?,?,?,?,?,?,?,?)""",
-                 (npc_id, d['name'], d['damage_str'], d['damagedice'],
-                  d.get('armor_piercing',0), d.get('trait_type','Melee'),
-                  d.get('range'), d.get('reach',0), d.get('notes')))
+    cur = conn.execute("""INSERT INTO npc_weapons (npc_id, name, damage_str, damagedice,
+                          armor_piercing, trait_type, range, reach, notes)
+                          VALUES (?,?,?,?,?,?,?,?,?)""",
+                       (npc_id, d['name'], d['damage_str'], d['damagedice'],
+                        d.get('armor_piercing',0), d.get('trait_type','Melee'),
+                        d.get('range'), d.get('reach',0), d.get('notes')))
     conn.commit()
-    conn.close()
-    return jsonify({'ok': True})
+    row = conn.execute("SELECT * FROM npc_weapons WHERE id=?", (cur.lastrowid,)).fetchone()
+    return jsonify({'ok': True, 'weapon': row})
 
 @app.route('/api/weapons/<int:weapon_id>', methods=['DELETE'])
 def api_delete_weapon(weapon_id):
     conn = get_db()
     conn.execute("DELETE FROM npc_weapons WHERE id=?", (weapon_id,))
     conn.commit()
-    conn.close()
     return jsonify({'deleted': weapon_id})
 
 # --- ARMOUR ---
@@ -4269,29 +5187,27 @@ def api_delete_weapon(weapon_id):
 def api_get_armor(npc_id):
     conn = get_db()
     rows = conn.execute("SELECT * FROM npc_armor WHERE npc_id=? ORDER BY name", (npc_id,)).fetchall()
-    conn.close()
-    return jsonify(rows_to_list(rows))
+    return jsonify(rows)
 
 @app.route('/api/npcs/<int:npc_id>/armor', methods=['POST'])
 def api_add_armor(npc_id):
     d = request.json
     conn = get_db()
-    conn.execute("""INSERT INTO npc_armor (npc_id, name, protection, area_protected,
-                    min_strength, weight, cost, notes)
-                    VALUES (?,?,?,?,?,?,?,?)""",
-                 (npc_id, d['name'], d.get('protection', 0),
-                  d.get('area_protected'), d.get('min_strength'),
-                  d.get('weight', 0), d.get('cost'), d.get('notes')))
+    cur = conn.execute("""INSERT INTO npc_armor (npc_id, name, protection, area_protected,
+                          min_strength, weight, cost, notes)
+                          VALUES (?,?,?,?,?,?,?,?)""",
+                       (npc_id, d['name'], d.get('protection', 0),
+                        d.get('area_protected'), d.get('min_strength'),
+                        d.get('weight', 0), d.get('cost'), d.get('notes')))
     conn.commit()
-    conn.close()
-    return jsonify({'ok': True})
+    row = conn.execute("SELECT * FROM npc_armor WHERE id=?", (cur.lastrowid,)).fetchone()
+    return jsonify({'ok': True, 'armor': row})
 
 @app.route('/api/armor/<int:armor_id>', methods=['DELETE'])
 def api_delete_armor(armor_id):
     conn = get_db()
     conn.execute("DELETE FROM npc_armor WHERE id=?", (armor_id,))
     conn.commit()
-    conn.close()
     return jsonify({'deleted': armor_id})
 
 # --- GEAR ---
@@ -4299,46 +5215,42 @@ def api_delete_armor(armor_id):
 def api_get_gear(npc_id):
     conn = get_db()
     rows = conn.execute("SELECT * FROM npc_gear WHERE npc_id=? ORDER BY name", (npc_id,)).fetchall()
-    conn.close()
-    return jsonify(rows_to_list(rows))
+    return jsonify(rows)
 
 @app.route('/api/npcs/<int:npc_id>/gear', methods=['POST'])
 def api_add_gear(npc_id):
     d = request.json
     conn = get_db()
-    conn.execute("""INSERT INTO npc_gear (npc_id, name, quantity, weight, cost, notes)
-                    VALUES (?,?,?,?,?,?)""",
-                 (npc_id, d['name'], d.get('quantity', 1),
-                  d.get('weight', 0), d.get('cost'), d.get('notes')))
+    cur = conn.execute("""INSERT INTO npc_gear (npc_id, name, quantity, weight, cost, notes)
+                          VALUES (?,?,?,?,?,?)""",
+                       (npc_id, d['name'], d.get('quantity', 1),
+                        d.get('weight', 0), d.get('cost'), d.get('notes')))
     conn.commit()
-    conn.close()
-    return jsonify({'ok': True})
+    row = conn.execute("SELECT * FROM npc_gear WHERE id=?", (cur.lastrowid,)).fetchone()
+    return jsonify({'ok': True, 'gear': row})
 
 @app.route('/api/gear/<int:gear_id>', methods=['DELETE'])
 def api_delete_gear(gear_id):
     conn = get_db()
     conn.execute("DELETE FROM npc_gear WHERE id=?", (gear_id,))
     conn.commit()
-    conn.close()
     return jsonify({'deleted': gear_id})
 
 @app.route('/api/npcs/<int:npc_id>/legacy_gear/<int:index>', methods=['DELETE'])
 def api_delete_legacy_gear(npc_id, index):
     """Remove a single item from the gear_json array by index."""
     conn = get_db()
-    row = conn.execute("SELECT gear_json FROM npcs WHERE id=?", (npc_id,)).fetchone()
-    if not row or not row['gear_json']:
-        conn.close()
-        return jsonify({'error': 'Not found'}), 404
-    items = json.loads(row['gear_json'])
-    if index < 0 or index >= len(items):
-        conn.close()
-        return jsonify({'error': 'Index out of range'}), 400
-    removed = items.pop(index)
-    conn.execute("UPDATE npcs SET gear_json=? WHERE id=?", (json.dumps(items), npc_id))
+    # Spliced in SQL: one atomic statement, no JSON round-trip through Python.
+    # No row back means no such NPC, no legacy gear, or index out of range.
+    row = conn.execute("""
+        UPDATE npcs SET gear_json = json_remove(gear_json, '$[' || :index || ']')
+        WHERE id = :id AND json_valid(gear_json) AND json_array_length(gear_json) > :index
+        RETURNING json_array_length(gear_json) AS remaining""",
+        {'id': npc_id, 'index': index}).fetchone()
+    if row is None:
+        return jsonify({'error': 'No legacy gear item at that index'}), 404
     conn.commit()
-    conn.close()
-    return jsonify({'removed': removed, 'remaining': len(items)})
+    return jsonify({'remaining': row['remaining']})
 
 # --- EXPORTS ---
 @app.route('/api/npcs/<int:npc_id>/statblock', methods=['GET'])
@@ -4428,32 +5340,39 @@ def api_statblock(npc_id):
             lines.append(f"**Powers ({npc['power_points']} PP):** {', '.join(powers)}")
     if npc['tactics']:
         lines.append(f"**Tactics:** {npc['tactics']}")
-    conn.close()
     return jsonify({'statblock': '\n'.join(lines)})
 
 @app.route('/api/npcs/<int:npc_id>/fgxml', methods=['GET'])
 def api_fg_xml(npc_id):
     # Import the export module
     sys.path.insert(0, str(APP_DIR))
-    from fg_export import npc_to_fg_xml, get_db as fg_get_db
-    conn = fg_get_db()
+    from fg_export import npc_to_fg_xml
+    conn = get_db()
     npc = conn.execute("SELECT * FROM npcs WHERE id=?", (npc_id,)).fetchone()
     if not npc:
         return jsonify({'error': 'Not found'}), 404
     xml = npc_to_fg_xml(conn, npc, indent="    ")
-    conn.close()
     return jsonify({'xml': xml})
 
 @app.route('/api/export/all', methods=['GET'])
 def api_export_all():
     sys.path.insert(0, str(APP_DIR))
-    from fg_export import npc_to_fg_xml, get_db as fg_get_db
-    conn = fg_get_db()
+    from fg_export import npc_to_fg_xml, prefetch_related
+    conn = get_db()
     npcs = conn.execute("SELECT * FROM npcs WHERE stat_block_complete=1 ORDER BY region, name").fetchall()
-    entries = [npc_to_fg_xml(conn, n) for n in npcs]
-    xml = '<npc static="true">\n' + '\n'.join(entries) + '\n</npc>'
-    conn.close()
-    return jsonify({'xml': xml, 'count': len(npcs)})
+    related = prefetch_related(conn)
+
+    # Streamed one NPC at a time, so the module is never held as one string
+    def generate():
+        yield '<npc static="true">\n'
+        for n in npcs:
+            yield npc_to_fg_xml(conn, n, related=related)
+            yield '\n'
+        yield '</npc>'
+
+    resp = Response(stream_with_context(generate()), mimetype='application/xml')
+    resp.headers['X-NPC-Count'] = str(len(npcs))
+    return resp
 
 @app.route('/api/checkpoint', methods=['POST'])
 def api_checkpoint():
@@ -4465,62 +5384,72 @@ def api_checkpoint():
 def api_status():
     conn = get_db()
     rows = conn.execute("SELECT * FROM v_region_status").fetchall()
-    conn.close()
-    return jsonify(rows_to_list(rows))
+    return jsonify(rows)
 
 # ============================================================
 # EQUIPMENT CATALOGUE API
 # ============================================================
 
+def index_by_source(items):
+    """Group a catalogue by its 'source' key, with 'All' holding the full list."""
+    by_source = {'All': items}
+    for item in items:
+        by_source.setdefault(item['source'], []).append(item)
+    return by_source
+
+def catalogue_bodies(by_source):
+    """Pre-serialised JSON body for each source slice of a catalogue."""
+    return {source: json_body(items) for source, items in by_source.items()}
+
+EMPTY_LIST_BODY = json_body([])
+
+# The catalogues are fixed for the life of the process, so each source's
+# slice is built and serialised once here rather than on every request
+CAT_WEAPONS_JSON = catalogue_bodies(index_by_source(CAT_WEAPONS))
+CAT_ARMOR_JSON = catalogue_bodies(index_by_source(CAT_ARMOR))
+CAT_GEAR_JSON = catalogue_bodies(index_by_source(CAT_GEAR))
+CAT_SOURCES_JSON = json_body(CAT_SOURCES)
+
 @app.route('/api/catalogue/weapons', methods=['GET'])
 def api_catalogue_weapons():
-    source = request.args.get('source', 'All')
-    if source == 'All':
-        return jsonify(CAT_WEAPONS)
-    return jsonify([w for w in CAT_WEAPONS if w['source'] == source])
+    return json_response(CAT_WEAPONS_JSON.get(request.args.get('source', 'All'), EMPTY_LIST_BODY))
 
 @app.route('/api/catalogue/armor', methods=['GET'])
 def api_catalogue_armor():
-    source = request.args.get('source', 'All')
-    if source == 'All':
-        return jsonify(CAT_ARMOR)
-    return jsonify([a for a in CAT_ARMOR if a['source'] == source])
+    return json_response(CAT_ARMOR_JSON.get(request.args.get('source', 'All'), EMPTY_LIST_BODY))
 
 @app.route('/api/catalogue/gear', methods=['GET'])
 def api_catalogue_gear():
-    source = request.args.get('source', 'All')
-    if source == 'All':
-        return jsonify(CAT_GEAR)
-    return jsonify([g for g in CAT_GEAR if g['source'] == source])
+    return json_response(CAT_GEAR_JSON.get(request.args.get('source', 'All'), EMPTY_LIST_BODY))
 
 @app.route('/api/catalogue/sources', methods=['GET'])
 def api_catalogue_sources():
-    return jsonify(CAT_SOURCES)
+    return json_response(CAT_SOURCES_JSON)
 
 # ============================================================
 # HINDRANCES CATALOGUE & MANAGEMENT
 # ============================================================
 
+CAT_HINDRANCES_BY_SOURCE = index_by_source(CAT_HINDRANCES)
+CAT_HINDRANCES_JSON = catalogue_bodies(CAT_HINDRANCES_BY_SOURCE)
+HINDRANCE_SOURCES_JSON = json_body(HINDRANCE_SOURCES)
+
 @app.route('/api/catalogue/hindrances', methods=['GET'])
 def api_catalogue_hindrances():
     source = request.args.get('source', 'All')
     severity = request.args.get('severity', 'All')
-    results = CAT_HINDRANCES
-    if source != 'All':
-        results = [h for h in results if h['source'] == source]
-    if severity != 'All':
-        results = [h for h in results if h['severity'] == severity]
-    return jsonify(results)
+    if severity == 'All':
+        return json_response(CAT_HINDRANCES_JSON.get(source, EMPTY_LIST_BODY))
+    return jsonify([h for h in CAT_HINDRANCES_BY_SOURCE.get(source, []) if h['severity'] == severity])
 
 @app.route('/api/catalogue/hindrances/sources', methods=['GET'])
 def api_hindrance_sources():
-    return jsonify(HINDRANCE_SOURCES)
+    return json_response(HINDRANCE_SOURCES_JSON)
 
 @app.route('/api/npcs/<int:npc_id>/hindrances', methods=['GET'])
 def api_get_npc_hindrances(npc_id):
     conn = get_db()
     rows = conn.execute("SELECT * FROM npc_hindrances WHERE npc_id = ?", (npc_id,)).fetchall()
-    conn.close()
     return jsonify([dict(r) for r in rows])
 
 @app.route('/api/npcs/<int:npc_id>/hindrances', methods=['POST'])
@@ -4532,7 +5461,6 @@ def api_add_npc_hindrance(npc_id):
         VALUES (?, ?, ?, ?, ?)
     """, (npc_id, data['name'], data['severity'], data.get('source'), data.get('notes')))
     conn.commit()
-    conn.close()
     return jsonify({"success": True})
 
 @app.route('/api/npcs/<int:npc_id>/hindrances/<int:hind_id>', methods=['DELETE'])
@@ -4540,30 +5468,27 @@ def api_delete_npc_hindrance(npc_id, hind_id):
     conn = get_db()
     conn.execute("DELETE FROM npc_hindrances WHERE id = ? AND npc_id = ?", (hind_id, npc_id))
     conn.commit()
-    conn.close()
     return jsonify({"success": True})
 
 # ============================================================
 # EDGES CATALOGUE & MANAGEMENT
 # ============================================================
 
+CAT_EDGES_JSON = catalogue_bodies(index_by_source(CAT_EDGES))
+EDGE_SOURCES_JSON = json_body(EDGE_SOURCES)
+
 @app.route('/api/catalogue/edges', methods=['GET'])
 def api_catalogue_edges():
-    source = request.args.get('source', 'All')
-    results = CAT_EDGES
-    if source != 'All':
-        results = [e for e in results if e['source'] == source]
-    return jsonify(results)
+    return json_response(CAT_EDGES_JSON.get(request.args.get('source', 'All'), EMPTY_LIST_BODY))
 
 @app.route('/api/catalogue/edges/sources', methods=['GET'])
 def api_edge_sources():
-    return jsonify(EDGE_SOURCES)
+    return json_response(EDGE_SOURCES_JSON)
 
 @app.route('/api/npcs/<int:npc_id>/edges', methods=['GET'])
 def api_get_npc_edges(npc_id):
     conn = get_db()
     rows = conn.execute("SELECT * FROM npc_edges WHERE npc_id = ?", (npc_id,)).fetchall()
-    conn.close()
     return jsonify([dict(r) for r in rows])
 
 @app.route('/api/npcs/<int:npc_id>/edges', methods=['POST'])
@@ -4575,7 +5500,6 @@ def api_add_npc_edge(npc_id):
         VALUES (?, ?, ?, ?)
     """, (npc_id, data['name'], data.get('source'), data.get('notes')))
     conn.commit()
-    conn.close()
     return jsonify({"success": True})
 
 @app.route('/api/npcs/<int:npc_id>/edges/<int:edge_id>', methods=['DELETE'])
@@ -4583,30 +5507,27 @@ def api_delete_npc_edge(npc_id, edge_id):
     conn = get_db()
     conn.execute("DELETE FROM npc_edges WHERE id = ? AND npc_id = ?", (edge_id, npc_id))
     conn.commit()
-    conn.close()
     return jsonify({"success": True})
 
 # ============================================================
 # POWERS CATALOGUE & MANAGEMENT
 # ============================================================
 
+CAT_POWERS_JSON = catalogue_bodies(index_by_source(CAT_POWERS))
+POWER_SOURCES_JSON = json_body(POWER_SOURCES)
+
 @app.route('/api/catalogue/powers', methods=['GET'])
 def api_catalogue_powers():
-    source = request.args.get('source', 'All')
-    results = CAT_POWERS
-    if source != 'All':
-        results = [p for p in results if p['source'] == source]
-    return jsonify(results)
+    return json_response(CAT_POWERS_JSON.get(request.args.get('source', 'All'), EMPTY_LIST_BODY))
 
 @app.route('/api/catalogue/powers/sources', methods=['GET'])
 def api_power_sources():
-    return jsonify(POWER_SOURCES)
+    return json_response(POWER_SOURCES_JSON)
 
 @app.route('/api/npcs/<int:npc_id>/powers', methods=['GET'])
 def api_get_npc_powers(npc_id):
     conn = get_db()
     rows = conn.execute("SELECT * FROM npc_powers WHERE npc_id = ?", (npc_id,)).fetchall()
-    conn.close()
     return jsonify([dict(r) for r in rows])
 
 @app.route('/api/npcs/<int:npc_id>/powers', methods=['POST'])
@@ -4619,7 +5540,6 @@ def api_add_npc_power(npc_id):
     """, (npc_id, data['name'], data.get('power_points', 0), data.get('range'),
           data.get('duration'), data.get('trapping'), data.get('source'), data.get('notes')))
     conn.commit()
-    conn.close()
     return jsonify({"success": True})
 
 @app.route('/api/npcs/<int:npc_id>/powers/<int:power_id>', methods=['DELETE'])
@@ -4627,7 +5547,6 @@ def api_delete_npc_power(npc_id, power_id):
     conn = get_db()
     conn.execute("DELETE FROM npc_powers WHERE id = ? AND npc_id = ?", (power_id, npc_id))
     conn.commit()
-    conn.close()
     return jsonify({"success": True})
 
 @app.route('/api/versions', methods=['GET'])
@@ -4817,7 +5736,7 @@ def api_open_github_desktop():
 @app.route('/api/config', methods=['GET'])
 def api_get_config():
     """Return current config."""
-    cfg = load_config()
+    cfg = load_config_cached()
     cfg['app_dir'] = str(APP_DIR)
     return jsonify(cfg)
 
@@ -4825,7 +5744,7 @@ def api_get_config():
 def api_save_config():
     """Save config paths."""
     data = request.json
-    cfg = load_config()
+    cfg = load_config_cached()
     
     # Validate repo_path
     repo_path = data.get('repo_path', '').strip()
@@ -4848,20 +5767,55 @@ def api_save_config():
     save_config(cfg)
     return jsonify({"success": True})
 
+# Tk must only be touched from the thread that created it, and Flask serves
+# each request on its own thread — so one long-lived picker thread owns a
+# hidden root and handles every dialog.
+_tk_requests = None
+_tk_lock = threading.Lock()
+
+def _folder_picker_loop(requests_q):
+    """Create the hidden Tk root once and serve folder-picker requests on it."""
+    try:
+        import tkinter as tk
+        from tkinter import filedialog
+        root = tk.Tk()
+        root.withdraw()
+        root.attributes('-topmost', True)
+        init_error = None
+    except Exception as e:
+        root, init_error = None, e
+    while True:
+        initial, reply = requests_q.get()
+        if root is None:
+            reply.put((None, init_error))
+            continue
+        try:
+            reply.put((filedialog.askdirectory(parent=root, initialdir=initial, title="Select Folder"), None))
+        except Exception as e:
+            reply.put((None, e))
+
+def _ask_directory(initial):
+    """Show the folder picker on the shared Tk root and wait for the choice."""
+    global _tk_requests
+    with _tk_lock:
+        if _tk_requests is None:
+            _tk_requests = queue.Queue()
+            threading.Thread(target=_folder_picker_loop, args=(_tk_requests,), daemon=True).start()
+    reply = queue.Queue(maxsize=1)
+    _tk_requests.put((initial, reply))
+    folder, error = reply.get()
+    if error:
+        raise error
+    return folder
+
 @app.route('/api/browse-folder', methods=['POST'])
 def api_browse_folder():
     """Open a native folder picker dialog (Windows only)."""
     try:
         if sys.platform == 'win32':
-            import tkinter as tk
-            from tkinter import filedialog
-            root = tk.Tk()
-            root.withdraw()
-            root.attributes('-topmost', True)
             current = request.json.get('current', '')
             initial = current if current and Path(current).exists() else str(Path.home())
-            folder = filedialog.askdirectory(initialdir=initial, title="Select Folder")
-            root.destroy()
+            folder = _ask_directory(initial)
             if folder:
                 return jsonify({"success": True, "path": folder})
             return jsonify({"success": False, "message": "Cancelled"})
@@ -4877,13 +5831,40 @@ def api_browse_folder():
 import shutil as _shutil
 from datetime import datetime as _datetime
 
+_COPY_BUFSIZE = 1024 * 1024
+
+def _fast_copy(src, dst):
+    """Copy a file with copy2 semantics using a kernel-side copy where available."""
+    with open(src, 'rb') as fsrc, open(dst, 'wb') as fdst:
+        copied = False
+        if hasattr(os, 'copy_file_range'):
+            # Linux: in-kernel copy, reflinked on btrfs/XFS
+            try:
+                remaining = os.fstat(fsrc.fileno()).st_size
+                while remaining > 0:
+                    n = os.copy_file_range(fsrc.fileno(), fdst.fileno(), remaining)
+                    if n == 0:
+                        break
+                    remaining -= n
+                copied = remaining == 0
+            except OSError:
+                # ENOSYS / EXDEV / unsupported filesystem — fall back to buffered copy
+                fsrc.seek(0)
+                fdst.seek(0)
+                fdst.truncate()
+        if not copied:
+            _shutil.copyfileobj(fsrc, fdst, length=_COPY_BUFSIZE)
+    _shutil.copystat(src, dst)
+
 @app.route('/api/backups', methods=['GET'])
 def api_list_backups():
     """List available database backups."""
     backup_dir = get_backup_dir()
     backups = []
-    for f in sorted(backup_dir.glob("*.db"), key=lambda p: p.stat().st_mtime, reverse=True):
-        stat = f.stat()
+    with os.scandir(backup_dir) as it:
+        entries = [(e, e.stat()) for e in it if e.name.endswith('.db') and e.is_file()]
+    entries.sort(key=lambda t: t[1].st_mtime, reverse=True)
+    for f, stat in entries:
         size_kb = stat.st_size / 1024
         if size_kb > 1024:
             size_str = f"{size_kb/1024:.1f} MB"
@@ -4908,7 +5889,7 @@ def api_create_backup():
         backup_name = f"tribute_lands_npcs_{timestamp}.db"
         backup_path = backup_dir / backup_name
         
-        _shutil.copy2(str(DB_PATH), str(backup_path))
+        _fast_copy(str(DB_PATH), str(backup_path))
         
         size_kb = backup_path.stat().st_size / 1024
         size_str = f"{size_kb/1024:.1f} MB" if size_kb > 1024 else f"{size_kb:.0f} KB"
@@ -4934,10 +5915,10 @@ def api_restore_backup():
         # Safety backup of current state before restore
         safety_name = f"tribute_lands_npcs_pre_restore_{_datetime.now().strftime('%Y%m%d_%H%M%S')}.db"
         safety_path = backup_dir / safety_name
-        _shutil.copy2(str(DB_PATH), str(safety_path))
+        _fast_copy(str(DB_PATH), str(safety_path))
         
         # Restore
-        _shutil.copy2(str(backup_path), str(DB_PATH))
+        _fast_copy(str(backup_path), str(DB_PATH))
         
         return jsonify({"success": True, "message": f"Restored from {name}. Safety backup saved as {safety_name}. Restart to load."})
     except Exception as e:
@@ -4968,10 +5949,16 @@ def api_delete_backup():
 
 import re as _re
 
+# NPCs that still carry legacy hindrance/edge/power JSON (matches idx_npcs_legacy)
+LEGACY_JSON_WHERE = ("hindrances_json NOT IN ('','[]') OR edges_json NOT IN ('','[]') "
+                     "OR powers_json NOT IN ('','[]')")
+
 def _parse_hindrance(raw):
     """Parse 'Loyal (Major — crew)' → {name, severity, notes, original}"""
     raw = raw.strip()
     result = {'original': raw, 'name': raw, 'severity': 'Minor', 'notes': ''}
+    if '(' not in raw:
+        return result
     # Match pattern like "Name (Major — notes)" or "Name (Minor)"
     m = _re.match(r'^(.+?)\s*\((Major|Minor)(?:\s*[—–-]\s*(.+?))?\)\s*$', raw)
     if m:
@@ -4984,6 +5971,8 @@ def _parse_edge(raw):
     """Parse 'Connections (bureaucrats, inspectors)' → {name, notes, original}"""
     raw = raw.strip()
     result = {'original': raw, 'name': raw, 'notes': ''}
+    if '(' not in raw:
+        return result
     # Check if parenthetical is NOT a severity indicator — it's edge notes
     m = _re.match(r'^(.+?)\s*\((.+?)\)\s*$', raw)
     if m:
@@ -4991,59 +5980,65 @@ def _parse_edge(raw):
         result['notes'] = m.group(2).strip()
     return result
 
-def _match_hindrance(parsed, catalogue):
-    """Try to match parsed hindrance against catalogue. Returns source if matched."""
-    name_lower = parsed['name'].lower()
+def _index_by_name(catalogue):
+    """Map lower-cased name → first catalogue item with that name."""
+    index = {}
     for item in catalogue:
-        if item['name'].lower() == name_lower:
-            return item.get('source', 'Core')
-    return None
+        index.setdefault(item['name'].lower(), item)
+    return index
 
-def _match_edge(parsed, catalogue):
+# Catalogue names are case-folded once here, not on every match
+_HINDRANCES_BY_NAME = _index_by_name(CAT_HINDRANCES)
+_EDGES_BY_NAME = _index_by_name(CAT_EDGES)
+_POWERS_BY_NAME = _index_by_name(CAT_POWERS)
+
+def _match_hindrance(parsed, index):
+    """Try to match parsed hindrance against catalogue. Returns source if matched."""
+    item = index.get(parsed['name'].lower())
+    return item.get('source', 'Core') if item else None
+
+def _match_edge(parsed, index):
     """Try to match parsed edge against catalogue. Returns source if matched."""
-    name_lower = parsed['name'].lower()
-    for item in catalogue:
-        if item['name'].lower() == name_lower:
-            return item.get('source', 'Core')
-    return None
+    item = index.get(parsed['name'].lower())
+    return item.get('source', 'Core') if item else None
 
-def _match_power(name, catalogue):
+def _match_power(name, index):
     """Try to match power name against catalogue."""
-    name_lower = name.lower().strip()
-    for item in catalogue:
-        if item['name'].lower() == name_lower:
-            return item
-    return None
+    return index.get(name.lower().strip())
 
 @app.route('/api/migration/preview', methods=['GET'])
 def api_migration_preview():
-    from powers import POWERS as CAT_POWERS
     conn = get_db()
-    npcs = rows_to_list(conn.execute(
-        "SELECT id, name, hindrances_json, edges_json, powers_json FROM npcs"
-    ).fetchall())
+    npcs = conn.execute(
+        f"SELECT id, name, hindrances_json, edges_json, powers_json FROM npcs WHERE {LEGACY_JSON_WHERE}"
+    )
+
+    # Managed item counts per NPC — one grouped query per table
+    h_counts = dict(conn.execute("SELECT npc_id, COUNT(*) FROM npc_hindrances GROUP BY npc_id").fetchall())
+    e_counts = dict(conn.execute("SELECT npc_id, COUNT(*) FROM npc_edges GROUP BY npc_id").fetchall())
+    p_counts = dict(conn.execute("SELECT npc_id, COUNT(*) FROM npc_powers GROUP BY npc_id").fetchall())
 
     result_npcs = []
     total_items = 0
 
     for npc in npcs:
-        hindrances_raw = json.loads(npc.get('hindrances_json') or '[]')
-        edges_raw = json.loads(npc.get('edges_json') or '[]')
-        powers_raw = json.loads(npc.get('powers_json') or '[]')
+        hindrances_raw = json_loads(npc['hindrances_json'] or '[]')
+        edges_raw = json_loads(npc['edges_json'] or '[]')
+        powers_raw = json_loads(npc['powers_json'] or '[]')
 
         if not hindrances_raw and not edges_raw and not powers_raw:
             continue
 
         # Check if already migrated (managed items exist)
-        existing_h = conn.execute("SELECT COUNT(*) FROM npc_hindrances WHERE npc_id=?", (npc['id'],)).fetchone()[0]
-        existing_e = conn.execute("SELECT COUNT(*) FROM npc_edges WHERE npc_id=?", (npc['id'],)).fetchone()[0]
-        existing_p = conn.execute("SELECT COUNT(*) FROM npc_powers WHERE npc_id=?", (npc['id'],)).fetchone()[0]
+        existing_h = h_counts.get(npc['id'], 0)
+        existing_e = e_counts.get(npc['id'], 0)
+        existing_p = p_counts.get(npc['id'], 0)
 
         npc_result = {'id': npc['id'], 'name': npc['name'], 'hindrances': [], 'edges': [], 'powers': []}
 
         for h_raw in hindrances_raw:
             parsed = _parse_hindrance(h_raw)
-            source = _match_hindrance(parsed, CAT_HINDRANCES)
+            source = _match_hindrance(parsed, _HINDRANCES_BY_NAME)
             parsed['matched'] = source is not None
             parsed['source'] = source or 'Custom'
             npc_result['hindrances'].append(parsed)
@@ -5051,7 +6046,7 @@ def api_migration_preview():
 
         for e_raw in edges_raw:
             parsed = _parse_edge(e_raw)
-            source = _match_edge(parsed, CAT_EDGES)
+            source = _match_edge(parsed, _EDGES_BY_NAME)
             parsed['matched'] = source is not None
             parsed['source'] = source or 'Custom'
             npc_result['edges'].append(parsed)
@@ -5059,7 +6054,7 @@ def api_migration_preview():
 
         for p_raw in powers_raw:
             p_name = p_raw.strip()
-            match = _match_power(p_name, CAT_POWERS)
+            match = _match_power(p_name, _POWERS_BY_NAME)
             npc_result['powers'].append({
                 'original': p_raw,
                 'name': p_name,
@@ -5076,110 +6071,154 @@ def api_migration_preview():
 
     return jsonify({'npcs': result_npcs, 'total_items': total_items})
 
+MIGRATION_WARNING_LIMIT = 100
+
 @app.route('/api/migration/execute', methods=['POST'])
 def api_migration_execute():
-    from powers import POWERS as CAT_POWERS
     conn = get_db()
-    npcs = rows_to_list(conn.execute(
-        "SELECT id, name, hindrances_json, edges_json, powers_json, power_points, arcane_bg FROM npcs"
-    ).fetchall())
-
-    migrated_npcs = 0
-    migrated_items = 0
-    warnings = []
-
+    npcs = conn.execute(
+        "SELECT id, name, hindrances_json, edges_json, powers_json, power_points, arcane_bg "
+        f"FROM npcs WHERE {LEGACY_JSON_WHERE}"
+    )
+
+    # Parse and catalogue-match in Python; everything else happens in SQL.
+    # Row layout: [kind, npc_id, npc_name, name, severity, power_points, source, notes]
+    items = []
     for npc in npcs:
-        hindrances_raw = json.loads(npc.get('hindrances_json') or '[]')
-        edges_raw = json.loads(npc.get('edges_json') or '[]')
-        powers_raw = json.loads(npc.get('powers_json') or '[]')
-
-        if not hindrances_raw and not edges_raw and not powers_raw:
-            continue
-
-        npc_touched = False
-
-        # Migrate hindrances
-        for h_raw in hindrances_raw:
+        for h_raw in json_loads(npc['hindrances_json'] or '[]'):
             parsed = _parse_hindrance(h_raw)
-            source = _match_hindrance(parsed, CAT_HINDRANCES) or 'Custom'
-            # Check for duplicate
-            existing = conn.execute(
-                "SELECT id FROM npc_hindrances WHERE npc_id=? AND name=?",
-                (npc['id'], parsed['name'])
-            ).fetchone()
-            if not existing:
-                conn.execute(
-                    "INSERT INTO npc_hindrances (npc_id, name, severity, source, notes) VALUES (?,?,?,?,?)",
-                    (npc['id'], parsed['name'], parsed['severity'], source, parsed['notes'])
-                )
-                migrated_items += 1
-                npc_touched = True
-            else:
-                warnings.append(f"{npc['name']}: hindrance '{parsed['name']}' already exists, skipped")
-
-        # Migrate edges
-        for e_raw in edges_raw:
+            source = _match_hindrance(parsed, _HINDRANCES_BY_NAME) or 'Custom'
+            items.append(['hindrance', npc['id'], npc['name'], parsed['name'],
+                          parsed['severity'], None, source, parsed['notes']])
+        for e_raw in json_loads(npc['edges_json'] or '[]'):
             parsed = _parse_edge(e_raw)
-            source = _match_edge(parsed, CAT_EDGES) or 'Custom'
-            existing = conn.execute(
-                "SELECT id FROM npc_edges WHERE npc_id=? AND name=?",
-                (npc['id'], parsed['name'])
-            ).fetchone()
-            if not existing:
-                conn.execute(
-                    "INSERT INTO npc_edges (npc_id, name, source, notes) VALUES (?,?,?,?)",
-                    (npc['id'], parsed['name'], source, parsed['notes'])
-                )
-                migrated_items += 1
-                npc_touched = True
-            else:
-                warnings.append(f"{npc['name']}: edge '{parsed['name']}' already exists, skipped")
-
-        # Migrate powers
-        for p_raw in powers_raw:
+            source = _match_edge(parsed, _EDGES_BY_NAME) or 'Custom'
+            items.append(['edge', npc['id'], npc['name'], parsed['name'],
+                          None, None, source, parsed['notes']])
+        for p_raw in json_loads(npc['powers_json'] or '[]'):
             p_name = p_raw.strip()
-            match = _match_power(p_name, CAT_POWERS)
+            match = _match_power(p_name, _POWERS_BY_NAME)
             source = match.get('source', 'Core') if match else 'Custom'
             pp_cost = match.get('pp', 0) if match else 0
-            existing = conn.execute(
-                "SELECT id FROM npc_powers WHERE npc_id=? AND name=?",
-                (npc['id'], p_name)
-            ).fetchone()
-            if not existing:
-                conn.execute(
-                    "INSERT INTO npc_powers (npc_id, name, power_points, source, notes) VALUES (?,?,?,?,?)",
-                    (npc['id'], p_name, pp_cost, source, '')
-                )
-                migrated_items += 1
-                npc_touched = True
-            else:
-                warnings.append(f"{npc['name']}: power '{p_name}' already exists, skipped")
+            items.append(['power', npc['id'], npc['name'], p_name,
+                          None, pp_cost, source, ''])
+
+    # Stage every parsed item in one statement via json_each
+    conn.execute("DROP TABLE IF EXISTS temp.migration_items")
+    conn.execute("""CREATE TEMP TABLE migration_items (
+        seq INTEGER PRIMARY KEY, kind TEXT, npc_id INTEGER, npc_name TEXT, name TEXT,
+        severity TEXT, power_points INTEGER, source TEXT, notes TEXT, dup INTEGER DEFAULT 0
+    )""")
+    conn.execute("""
+        INSERT INTO migration_items (kind, npc_id, npc_name, name, severity, power_points, source, notes)
+        SELECT json_extract(value, '$[0]'), json_extract(value, '$[1]'),
+               json_extract(value, '$[2]'), json_extract(value, '$[3]'),
+               json_extract(value, '$[4]'), json_extract(value, '$[5]'),
+               json_extract(value, '$[6]'), json_extract(value, '$[7]')
+        FROM json_each(?) ORDER BY key
+    """, (json.dumps(items),))
+
+    # Duplicate = already managed, or repeated earlier in the same NPC's legacy list
+    conn.execute("""
+        UPDATE migration_items SET dup = 1 WHERE
+            EXISTS (SELECT 1 FROM migration_items e
+                    WHERE e.kind = migration_items.kind AND e.npc_id = migration_items.npc_id
+                      AND e.name = migration_items.name AND e.seq < migration_items.seq)
+            OR (kind = 'hindrance' AND EXISTS (SELECT 1 FROM npc_hindrances t
+                    WHERE t.npc_id = migration_items.npc_id AND t.name = migration_items.name))
+            OR (kind = 'edge' AND EXISTS (SELECT 1 FROM npc_edges t
+                    WHERE t.npc_id = migration_items.npc_id AND t.name = migration_items.name))
+            OR (kind = 'power' AND EXISTS (SELECT 1 FROM npc_powers t
+                    WHERE t.npc_id = migration_items.npc_id AND t.name = migration_items.name))
+    """)
 
-        # Clear legacy JSON fields
-        if npc_touched:
-            conn.execute(
-                "UPDATE npcs SET hindrances_json='[]', edges_json='[]', powers_json='[]' WHERE id=?",
-                (npc['id'],)
-            )
-            migrated_npcs += 1
+    migrated_items = 0
+    migrated_items += conn.execute("""
+        INSERT INTO npc_hindrances (npc_id, name, severity, source, notes)
+        SELECT npc_id, name, severity, source, notes FROM migration_items
+        WHERE kind = 'hindrance' AND dup = 0 ORDER BY seq
+    """).rowcount
+    migrated_items += conn.execute("""
+        INSERT INTO npc_edges (npc_id, name, source, notes)
+        SELECT npc_id, name, source, notes FROM migration_items
+        WHERE kind = 'edge' AND dup = 0 ORDER BY seq
+    """).rowcount
+    migrated_items += conn.execute("""
+        INSERT INTO npc_powers (npc_id, name, power_points, source, notes)
+        SELECT npc_id, name, power_points, source, notes FROM migration_items
+        WHERE kind = 'power' AND dup = 0 ORDER BY seq
+    """).rowcount
+
+    # Clear legacy JSON fields on every NPC that gained at least one item
+    migrated_npcs = conn.execute("""
+        UPDATE npcs SET hindrances_json='[]', edges_json='[]', powers_json='[]'
+        WHERE id IN (SELECT npc_id FROM migration_items WHERE dup = 0)
+    """).rowcount
+
+    # Report at most MIGRATION_WARNING_LIMIT skips; the rest are only counted
+    warnings = [f"{r['npc_name']}: {r['kind']} '{r['name']}' already exists, skipped"
+                for r in conn.execute("SELECT kind, npc_name, name FROM migration_items WHERE dup = 1 "
+                                      "ORDER BY seq LIMIT ?", (MIGRATION_WARNING_LIMIT,))]
+    skipped = conn.execute("SELECT COUNT(*) FROM migration_items WHERE dup = 1").fetchone()[0]
+    warnings_suppressed = skipped - len(warnings)
+    conn.execute("DROP TABLE temp.migration_items")
 
     conn.commit()
-    conn.close()
     checkpoint_wal()
     return jsonify({
         'success': True,
         'migrated_npcs': migrated_npcs,
         'migrated_items': migrated_items,
-        'warnings': warnings
+        'warnings': warnings,
+        'warnings_suppressed': warnings_suppressed
     })
 
 # ============================================================
 # PORTRAIT MANAGEMENT
 # ============================================================
 
+# werkzeug spools uploads above ~500 KB to a temp file; below this size the
+# upload is still in memory and a plain copy is cheaper than forcing it to disk
+SENDFILE_MIN_SIZE = 512 * 1024
+
+def _save_upload(f, dest):
+    """Save an uploaded file, using os.sendfile when it is large enough to be on disk."""
+    stream = f.stream
+    size = stream.seek(0, os.SEEK_END)
+    stream.seek(0)
+    src_fd = None
+    if hasattr(os, 'sendfile') and size >= SENDFILE_MIN_SIZE:
+        try:
+            stream.flush()
+            src_fd = stream.fileno()
+        except (OSError, ValueError, AttributeError):
+            src_fd = None
+    if src_fd is None:
+        f.save(dest)
+        return
+    # 0o666 so the file gets the same umask-derived mode as f.save()'s open()
+    dst_fd = os.open(str(dest), os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o666)
+    try:
+        offset = 0
+        while offset < size:
+            sent = os.sendfile(dst_fd, src_fd, offset, 4 << 20)
+            if sent == 0:
+                break
+            offset += sent
+    except OSError:
+        sendfile_failed = True
+    else:
+        sendfile_failed = False
+    finally:
+        os.close(dst_fd)
+    if sendfile_failed:
+        stream.seek(0)
+        f.save(dest)
+
 @app.route('/portraits/<path:filename>')
 def serve_portrait(filename):
-    return send_from_directory(APP_DIR / 'portraits', filename)
+    # max_age=0: portrait URLs are stable, so always revalidate (cheap 304)
+    return send_from_directory(APP_DIR / 'portraits', filename, max_age=0)
 
 @app.route('/api/npcs/<int:npc_id>/portrait', methods=['POST'])
 def api_upload_portrait(npc_id):
@@ -5195,13 +6234,15 @@ def api_upload_portrait(npc_id):
     portraits_dir = APP_DIR / 'portraits'
     portraits_dir.mkdir(exist_ok=True)
     # Remove old portrait if different extension
-    for old in portraits_dir.glob(f"npc_{npc_id}.*"):
-        old.unlink()
-    f.save(portraits_dir / safe_name)
+    prefix = f"npc_{npc_id}."
+    with os.scandir(portraits_dir) as it:
+        for entry in it:
+            if entry.name.startswith(prefix) and entry.name != safe_name:
+                os.unlink(entry.path)
+    _save_upload(f, portraits_dir / safe_name)
     conn = get_db()
     conn.execute("UPDATE npcs SET portrait_path = ? WHERE id = ?", (safe_name, npc_id))
     conn.commit()
-    conn.close()
     return jsonify({"success": True, "path": f"/portraits/{safe_name}"})
 
 @app.route('/api/npcs/<int:npc_id>/portrait', methods=['DELETE'])
@@ -5214,7 +6255,6 @@ def api_delete_portrait(npc_id):
             p.unlink()
     conn.execute("UPDATE npcs SET portrait_path = NULL WHERE id = ?", (npc_id,))
     conn.commit()
-    conn.close()
     return jsonify({"success": True})
 
 @app.route('/api/npcs/<int:npc_id>/generate-portrait', methods=['POST'])
@@ -5226,11 +6266,9 @@ def api_generate_portrait(npc_id):
     conn = get_db()
     row = conn.execute("SELECT * FROM npcs WHERE id = ?", (npc_id,)).fetchone()
     if not row:
-        conn.close()
         return jsonify({"success": False, "error": "NPC not found"}), 404
     
     npc = dict(row)
-    conn.close()
     
     # Build prompt from NPC data
     prompt = build_full_portrait_prompt(npc)
@@ -5264,7 +6302,6 @@ def api_generate_portrait(npc_id):
     conn = get_db()
     conn.execute("UPDATE npcs SET portrait_path = ? WHERE id = ?", (filename, npc_id))
     conn.commit()
-    conn.close()
     
     return jsonify({
         "success": True, 
@@ -5277,7 +6314,6 @@ def api_portrait_prompt(npc_id):
     """Preview the auto-generated prompt for an NPC without generating."""
     conn = get_db()
     row = conn.execute("SELECT * FROM npcs WHERE id = ?", (npc_id,)).fetchone()
-    conn.close()
     if not row:
         return jsonify({"error": "NPC not found"}), 404
     
@@ -5315,8 +6351,9 @@ def open_browser():
     webbrowser.open('http://127.0.0.1:5000')
 
 if __name__ == '__main__':
-    init_db_if_needed()
-    auto_seed_if_empty()
+    with app.app_context():
+        init_db_if_needed()
+        auto_seed_if_empty()
     print("\n  ╔══════════════════════════════════════════════╗")
     print("  ║  TRIBUTE LANDS NPC DATABASE                  ║")
     print("  ║  DiceForge Studios Ltd                       ║")
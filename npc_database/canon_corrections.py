@@ -11,14 +11,54 @@ Run from the npc_database directory:
 import sys, os
 sys.path.insert(0, os.path.dirname(__file__))
 
-from npc_manager import get_db, add_npc_from_dict
+from npc_manager import get_db, add_npcs_from_dicts
 
 COIN = "₡"
 
-def fix_marus_ironhand():
+# Short handles the org-link and appearance steps use for the pre-gens
+PREGEN_HANDLES = {
+    'Kael "Boarheart" Thrace': 'Kael',
+    '"Shadows"': 'Shadows',
+    'Viktor "Silvertongue" Crane': 'Viktor',
+    'Renna Ashveil': 'Renna',
+}
+
+# Statements for the Marus fix, held as module constants so every execute
+# hands sqlite3 the same string and hits its prepared-statement cache
+_SQL_UPDATE_NPC_STATS = """UPDATE npcs SET
+    strength = 6,
+    vigor = 6,
+    toughness = 5,
+    toughness_armor = 0,
+    gear_json = ?
+    WHERE id = ?"""
+
+_SQL_INSERT_HINDRANCE = """INSERT INTO npc_hindrances (npc_id, name, severity, notes, source)
+    VALUES (?, ?, ?, ?, 'SWADE Core')"""
+
+_SQL_INSERT_WEAPON = """INSERT INTO npc_weapons (npc_id, name, damage_str, damagedice, armor_piercing, trait_type, reach, notes)
+    VALUES (?, 'Ammarian steel hammer', 'Str+d6', 'd6+d6', 1, 'Melee', 0, 'AP 1')"""
+
+_SQL_INSERT_ARMOR = """INSERT INTO npc_armor (npc_id, name, protection, area_protected, notes)
+    VALUES (?, 'Leather apron', 1, 'Torso', NULL)"""
+
+def tune_connection(conn):
+    """Apply the same write-friendly pragmas the app uses before any DML.
+
+    WAL with synchronous=NORMAL syncs once per checkpoint rather than on
+    every commit. journal_mode is only switched when it isn't WAL already,
+    since the switch itself rewrites the journal. get_db() has already
+    turned foreign_keys on.
+    """
+    if conn.execute("PRAGMA journal_mode").fetchone()[0].lower() != 'wal':
+        conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=NORMAL")
+    conn.execute("PRAGMA temp_store=MEMORY")
+    conn.execute("PRAGMA cache_size=-64000")
+
+
+def fix_marus_ironhand(conn):
     """Correct Marus Ironhand to match canonical 201 Ammaria.docx."""
-    conn = get_db()
-    
     marus = conn.execute("SELECT id FROM npcs WHERE name='Marus Ironhand'").fetchone()
     if not marus:
         print("  X Marus Ironhand not found in database")
@@ -26,83 +66,74 @@ def fix_marus_ironhand():
     npc_id = marus['id']
     print(f"  Found Marus Ironhand (ID: {npc_id})")
     
-    # Fix attributes and derived stats
-    conn.execute("""UPDATE npcs SET
-        strength = 6,
-        vigor = 6,
-        toughness = 5,
-        toughness_armor = 0,
-        gear_json = ?
-        WHERE id = ?""", (f'["Leather apron (+1)", "Ammarian steel hammer (Str+d6, AP 1)", "Master tools", "{COIN}80"]', npc_id))
-    print("  OK Fixed attributes: Str d8->d6, Vi d8->d6")
-    print("  OK Fixed Toughness: 8(2)->5(0)")
-    print("  OK Fixed gear to canon")
+    # One transaction for the whole correction: Marus ends up fully canon or
+    # untouched, and the journal is synced once rather than per statement
+    with conn:
+        # Fix attributes and derived stats
+        conn.execute(_SQL_UPDATE_NPC_STATS, (f'["Leather apron (+1)", "Ammarian steel hammer (Str+d6, AP 1)", "Master tools", "{COIN}80"]', npc_id))
+        print("  OK Fixed attributes: Str d8->d6, Vi d8->d6")
+        print("  OK Fixed Toughness: 8(2)->5(0)")
+        print("  OK Fixed gear to canon")
     
-    # Fix skills
-    skill_corrections = {
-        'Athletics': 4,
-        'Common Knowledge': 6,
-        'Fighting': 6,
-        'Intimidation': 4,
-        'Notice': 6,
-        'Repair': 10,
-        'Stealth': 4,
-    }
-    skill_additions = {
-        'Persuasion': 4,
-        'Research': 6,
-    }
+        # Fix skills
+        skill_corrections = {
+            'Athletics': 4,
+            'Common Knowledge': 6,
+            'Fighting': 6,
+            'Intimidation': 4,
+            'Notice': 6,
+            'Repair': 10,
+            'Stealth': 4,
+        }
+        skill_additions = {
+            'Persuasion': 4,
+            'Research': 6,
+        }
     
-    for skill, die in skill_corrections.items():
-        conn.execute("UPDATE npc_skills SET die_type=? WHERE npc_id=? AND name=?",
-                     (die, npc_id, skill))
-    for skill, die in skill_additions.items():
-        existing = conn.execute("SELECT id FROM npc_skills WHERE npc_id=? AND name=?",
-                               (npc_id, skill)).fetchone()
-        if not existing:
-            conn.execute("INSERT INTO npc_skills (npc_id, name, die_type) VALUES (?,?,?)",
-                         (npc_id, skill, die))
-            print(f"  OK Added missing skill: {skill} d{die}")
-        else:
-            conn.execute("UPDATE npc_skills SET die_type=? WHERE npc_id=? AND name=?",
-                         (die, npc_id, skill))
-    print("  OK Fixed skills: Athletics d4, CK d6, Intimidation d4, +Persuasion d4, +Research d6")
-    
-    # Fix hindrances (managed table)
-    conn.execute("DELETE FROM npc_hindrances WHERE npc_id=?", (npc_id,))
-    canon_hindrances = [
-        ('Code of Honor', 'Major', "won't craft for evil"),
-        ('Loyal', 'Minor', 'guild'),
-        ('Stubborn', 'Minor', None),
-    ]
-    for name, severity, notes in canon_hindrances:
-        conn.execute("""INSERT INTO npc_hindrances (npc_id, name, severity, notes, source)
-                        VALUES (?, ?, ?, ?, 'SWADE Core')""",
-                     (npc_id, name, severity, notes))
-    conn.execute("UPDATE npcs SET hindrances_json='[]' WHERE id=?", (npc_id,))
-    print("  OK Fixed hindrances: Code of Honor (Major), Loyal (Minor-guild), Stubborn (Minor)")
+        # Corrections in one UPDATE: a CASE picks each skill's die, the IN list
+        # limits it to those rows via the (npc_id, name) unique index
+        cases = ' '.join('WHEN ? THEN ?' for _ in skill_corrections)
+        names = ', '.join('?' for _ in skill_corrections)
+        conn.execute(f"UPDATE npc_skills SET die = CASE name {cases} END "
+                     f"WHERE npc_id=? AND name IN ({names})",
+                     [v for pair in skill_corrections.items() for v in pair]
+                     + [npc_id] + list(skill_corrections))
+        # Additions as a single upsert against UNIQUE(npc_id, name)
+        rows = ', '.join('(?, ?, ?)' for _ in skill_additions)
+        conn.execute(f"INSERT INTO npc_skills (npc_id, name, die) VALUES {rows} "
+                     "ON CONFLICT(npc_id, name) DO UPDATE SET die = excluded.die",
+                     [v for skill, die in skill_additions.items() for v in (npc_id, skill, die)])
+        print("  OK Fixed skills: Athletics d4, CK d6, Intimidation d4, +Persuasion d4, +Research d6")
     
-    # Fix weapons
-    conn.execute("DELETE FROM npc_weapons WHERE npc_id=?", (npc_id,))
-    conn.execute("""INSERT INTO npc_weapons (npc_id, name, damage_str, damagedice, ap, trait_type, reach, notes)
-                    VALUES (?, 'Ammarian steel hammer', 'Str+d6', 'd6+d6', 1, 'Melee', 0, 'AP 1')""",
-                 (npc_id,))
-    print("  OK Fixed weapon: Ammarian steel hammer (Str+d6, AP 1)")
+        # Fix hindrances (managed table)
+        conn.execute("DELETE FROM npc_hindrances WHERE npc_id=?", (npc_id,))
+        canon_hindrances = [
+            ('Code of Honor', 'Major', "won't craft for evil"),
+            ('Loyal', 'Minor', 'guild'),
+            ('Stubborn', 'Minor', None),
+        ]
+        conn.executemany(_SQL_INSERT_HINDRANCE,
+                         [(npc_id, name, severity, notes) for name, severity, notes in canon_hindrances])
+        conn.execute("UPDATE npcs SET hindrances_json='[]' WHERE id=?", (npc_id,))
+        print("  OK Fixed hindrances: Code of Honor (Major), Loyal (Minor-guild), Stubborn (Minor)")
     
-    # Fix armor
-    conn.execute("DELETE FROM npc_armor WHERE npc_id=?", (npc_id,))
-    conn.execute("""INSERT INTO npc_armor (npc_id, name, armor_bonus, covers, notes)
-                    VALUES (?, 'Leather apron', 1, 'Torso', NULL)""",
-                 (npc_id,))
-    print("  OK Fixed armor: Leather apron (+1)")
+        # Fix weapons
+        conn.execute("DELETE FROM npc_weapons WHERE npc_id=?", (npc_id,))
+        conn.execute(_SQL_INSERT_WEAPON, (npc_id,))
+        print("  OK Fixed weapon: Ammarian steel hammer (Str+d6, AP 1)")
     
-    conn.commit()
-    conn.close()
+        # Fix armor
+        conn.execute("DELETE FROM npc_armor WHERE npc_id=?", (npc_id,))
+        conn.execute(_SQL_INSERT_ARMOR, (npc_id,))
+        print("  OK Fixed armor: Leather apron (+1)")
     print("  OK Marus Ironhand corrected to canon\n")
 
 
-def add_missing_pregens():
-    """Add the 4 missing Ammaria pre-gens from 201 Appendix B."""
+def add_missing_pregens(conn):
+    """Add the 4 missing Ammaria pre-gens from 201 Appendix B.
+
+    Returns {handle: npc_id} for every pre-gen, whether added now or already present.
+    """
     
     missing_npcs = [
         {
@@ -276,24 +307,37 @@ def add_missing_pregens():
         },
     ]
     
+    # One IN probe for every pre-gen instead of a lookup per name
+    names = [npc_data['name'] for npc_data in missing_npcs]
+    existing = {row['name']: row['id'] for row in conn.execute(
+        f"SELECT id, name FROM npcs WHERE name IN ({', '.join('?' * len(names))})", names
+    )}
+    
+    ids = {}
+    to_add = []
     for npc_data in missing_npcs:
-        conn = get_db()
-        existing = conn.execute("SELECT id FROM npcs WHERE name=?", (npc_data['name'],)).fetchone()
-        conn.close()
-        
-        if existing:
-            print(f"  Already exists: {npc_data['name']} (ID: {existing['id']}) -- skipping")
+        handle = PREGEN_HANDLES[npc_data['name']]
+        if npc_data['name'] in existing:
+            ids[handle] = existing[npc_data['name']]
+            print(f"  Already exists: {npc_data['name']} (ID: {ids[handle]}) -- skipping")
             continue
-        
-        npc_id = add_npc_from_dict(npc_data)
-        print(f"  OK Added {npc_data['name']} (ID: {npc_id})")
+        to_add.append(npc_data)
+    
+    # All missing pre-gens in one transaction: one npcs INSERT and one
+    # executemany per child table, rather than a round of each per NPC
+    if to_add:
+        with conn:
+            added = add_npcs_from_dicts(to_add, conn)
+        for npc_data in to_add:
+            ids[PREGEN_HANDLES[npc_data['name']]] = added[npc_data['name']]
+            print(f"  OK Added {npc_data['name']} (ID: {added[npc_data['name']]})")
     
     print()
+    return ids
 
 
-def add_missing_org_links():
-    """Link new NPCs to organisations."""
-    conn = get_db()
+def add_missing_org_links(conn, ids):
+    """Link new NPCs to organisations. ids is add_missing_pregens()' handle map."""
     
     new_links = [
         ('Kael', 'Ironweld Guild', 'Supplier'),
@@ -301,28 +345,19 @@ def add_missing_org_links():
         ('Viktor', 'Moonstar Consortium', 'Factor'),
     ]
     
-    for npc_name, org_name, role in new_links:
-        npc = conn.execute("SELECT id FROM npcs WHERE name LIKE ?", (f"%{npc_name}%",)).fetchone()
-        org = conn.execute("SELECT id FROM organisations WHERE name LIKE ?", (f"%{org_name}%",)).fetchone()
-        if npc and org:
-            existing = conn.execute(
-                "SELECT id FROM npc_organisations WHERE npc_id=? AND org_id=?",
-                (npc['id'], org['id'])
-            ).fetchone()
-            if not existing:
-                conn.execute(
-                    "INSERT INTO npc_organisations (npc_id, org_id, role) VALUES (?, ?, ?)",
-                    (npc['id'], org['id'], role)
-                )
-                print(f"  OK Linked {npc_name} -> {org_name} ({role})")
-    
-    conn.commit()
-    conn.close()
+    # One executemany: the SELECT resolves each org by name, and the
+    # (npc_id, org_id) primary key turns an existing link into a no-op
+    with conn:
+        cur = conn.executemany(
+            "INSERT INTO npc_organisations (npc_id, org_id, role) "
+            "SELECT ?, id, ? FROM organisations WHERE name = ? ON CONFLICT DO NOTHING",
+            [(ids[handle], role, org_name) for handle, org_name, role in new_links if handle in ids]
+        )
+    print(f"  OK {cur.rowcount} organisation link(s) added\n")
 
 
-def add_missing_appearances():
-    """Record product appearances for new NPCs."""
-    conn = get_db()
+def add_missing_appearances(conn, ids):
+    """Record product appearances for new NPCs. ids is add_missing_pregens()' handle map."""
     
     new_appearances = [
         ('Kael', 'Ammaria Core Module', 'Pre-gen PC'),
@@ -331,38 +366,36 @@ def add_missing_appearances():
         ('Renna', 'Ammaria Core Module', 'Pre-gen PC'),
     ]
     
-    for npc_name, product, role in new_appearances:
-        npc = conn.execute("SELECT id FROM npcs WHERE name LIKE ?", (f"%{npc_name}%",)).fetchone()
-        if npc:
-            existing = conn.execute(
-                "SELECT id FROM npc_appearances WHERE npc_id=? AND product=?",
-                (npc['id'], product)
-            ).fetchone()
-            if not existing:
-                conn.execute(
-                    "INSERT INTO npc_appearances (npc_id, product, role) VALUES (?, ?, ?)",
-                    (npc['id'], product, role)
-                )
-    
-    conn.commit()
-    conn.close()
+    with conn:
+        # UNIQUE(npc_id, product) makes a repeat run a no-op
+        conn.executemany(
+            "INSERT INTO npc_appearances (npc_id, product, role) VALUES (?, ?, ?) "
+            "ON CONFLICT(npc_id, product) DO NOTHING",
+            [(ids[handle], product, role) for handle, product, role in new_appearances if handle in ids]
+        )
     print("  OK Product appearances recorded\n")
 
 
 def main():
     print("\n=== AMMARIA CANON CORRECTIONS ===\n")
     
-    print("--- Fixing Marus Ironhand ---")
-    fix_marus_ironhand()
-    
-    print("--- Adding Missing Pre-Gens ---")
-    add_missing_pregens()
-    
-    print("--- Organisation Links ---")
-    add_missing_org_links()
-    
-    print("--- Product Appearances ---")
-    add_missing_appearances()
+    # One connection for the whole run, handed to every step
+    conn = get_db()
+    tune_connection(conn)
+    try:
+        print("--- Fixing Marus Ironhand ---")
+        fix_marus_ironhand(conn)
+        
+        print("--- Adding Missing Pre-Gens ---")
+        ids = add_missing_pregens(conn)
+        
+        print("--- Organisation Links ---")
+        add_missing_org_links(conn, ids)
+        
+        print("--- Product Appearances ---")
+        add_missing_appearances(conn, ids)
+    finally:
+        conn.close()
     
     print("=== CORRECTIONS COMPLETE ===")
     print("  Marus Ironhand: Restored to 201 Ammaria canon")
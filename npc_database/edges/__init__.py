@@ -10,6 +10,9 @@ Modular structure — one file per source:
   - concordium.py       Concordium regional edges
 
 Each module exports: SOURCE, EDGES
+
+The source modules are only imported when EDGES, SOURCES or get_edges()
+is first used.
 """
 
 VERSION = {
@@ -18,39 +21,76 @@ VERSION = {
     "changes": "Initial modular structure — 193 edges across 6 sources"
 }
 
-from . import core
-from . import fantasy_companion
-from . import ammaria
-from . import saltlands
-from . import vinlands
-from . import concordium
-
-# All source modules in order
-_MODULES = [core, fantasy_companion, ammaria, saltlands, vinlands, concordium]
+from collections import defaultdict
+from functools import lru_cache
+from importlib import import_module
 
-# Source names for filtering
-SOURCES = [m.SOURCE for m in _MODULES]
+# All source modules in order; imported on first use of the catalogue
+_MODULE_NAMES = ("core", "fantasy_companion", "ammaria", "saltlands", "vinlands", "concordium")
 
 
 def _tag_items(items, source):
-    """Add source tag to each item."""
-    return [{**item, "source": source} for item in items]
+    """Add source tag to each item, in place — the module lists are never reused untagged."""
+    for item in items:
+        item.setdefault("source", source)
+    return items
+
+
+def _index(edges, key):
+    """Map each value of key to the set of edges positions carrying it."""
+    index = defaultdict(set)
+    for i, e in enumerate(edges):
+        index[e[key]].add(i)
+    return index
+
 
+def _build():
+    """Import the source modules and build SOURCES, EDGES and the filter indexes.
 
-# Combined catalogue with source tags
-EDGES = []
+    Runs once, on first access; afterwards the names are ordinary module
+    globals and __getattr__ is no longer consulted for them.
+    """
+    global SOURCES, EDGES, _ALL, _BY_SOURCE, _BY_RANK, _BY_TYPE
+    if "EDGES" in globals():
+        return
+    modules = [import_module(f".{name}", __name__) for name in _MODULE_NAMES]
 
-for mod in _MODULES:
-    EDGES.extend(_tag_items(mod.EDGES, mod.SOURCE))
+    # Combined catalogue with source tags
+    edges = []
+    for mod in modules:
+        edges.extend(_tag_items(mod.EDGES, mod.SOURCE))
 
+    # Filter indexes, built once — EDGES never changes after this
+    _ALL = frozenset(range(len(edges)))
+    _BY_SOURCE = _index(edges, "source")
+    _BY_RANK = _index(edges, "rank")
+    _BY_TYPE = _index(edges, "type")
 
+    # Source names for filtering
+    SOURCES = [m.SOURCE for m in modules]
+    EDGES = edges
+
+
+def __getattr__(name):
+    """Load the catalogue lazily (PEP 562), so importing the package for VERSION stays cheap."""
+    if name in ("EDGES", "SOURCES"):
+        _build()
+        return globals()[name]
+    if name in _MODULE_NAMES:
+        return import_module(f".{name}", __name__)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+@lru_cache(maxsize=None)
 def get_edges(source=None, rank=None, edge_type=None):
-    """Get edges, optionally filtered by source, rank, and/or type."""
-    results = EDGES
-    if source and source != "All":
-        results = [e for e in results if e["source"] == source]
-    if rank and rank != "All":
-        results = [e for e in results if e["rank"] == rank]
-    if edge_type and edge_type != "All":
-        results = [e for e in results if e["type"] == edge_type]
-    return results
+    """Get edges, optionally filtered by source, rank, and/or type.
+
+    Results are cached per filter and returned as a shared tuple; copy it
+    before modifying.
+    """
+    _build()
+    sel = _ALL
+    for value, index in ((source, _BY_SOURCE), (rank, _BY_RANK), (edge_type, _BY_TYPE)):
+        if value and value != "All":
+            sel = sel & index.get(value, frozenset())
+    return tuple(EDGES[i] for i in sorted(sel))
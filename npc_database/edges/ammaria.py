@@ -78,3 +78,6 @@ EDGES = [
      "requirements": "AB (any), Smarts d6+",
      "summary": "+2 arcane skill for binding/compelling powers; reputation effect"},
 ]
+
+# Names must stay unique within this source; a duplicated block fails on import.
+assert len({e["name"] for e in EDGES}) == len(EDGES)
@@ -52,8 +52,35 @@ def die_str(value):
 # SINGLE NPC TO FG XML
 # ============================================================
 
-def npc_to_fg_xml(conn, npc, indent="        "):
-    """Generate FG XML for a single NPC entry."""
+SKILLS_SQL = "SELECT npc_id, name, die, modifier FROM npc_skills{where} ORDER BY name"
+WEAPONS_SQL = "SELECT * FROM npc_weapons{where} ORDER BY id"
+
+def prefetch_related(conn):
+    """Skills and weapons for every NPC, grouped by npc_id.
+
+    Bulk exports pass this to npc_to_fg_xml so the whole run costs two
+    queries instead of two per NPC.
+    """
+    related = {'skills': {}, 'weapons': {}}
+    for key, sql in (('skills', SKILLS_SQL), ('weapons', WEAPONS_SQL)):
+        for row in conn.execute(sql.format(where='')):
+            related[key].setdefault(row['npc_id'], []).append(row)
+    return related
+
+def npc_to_fg_xml(conn, npc, indent="        ", related=None):
+    """Generate FG XML for a single NPC entry.
+
+    related is an optional prefetch_related() result; without it the NPC's
+    skills and weapons are queried here.
+    """
+    if related is None:
+        where = ' WHERE npc_id=?'
+        skills = conn.execute(SKILLS_SQL.format(where=where), (npc['id'],)).fetchall()
+        weapons = conn.execute(WEAPONS_SQL.format(where=where), (npc['id'],)).fetchall()
+    else:
+        skills = related['skills'].get(npc['id'], [])
+        weapons = related['weapons'].get(npc['id'], [])
+
     npc_id = make_id(npc['name'])
     lines = []
     i = indent
@@ -89,11 +116,6 @@ def npc_to_fg_xml(conn, npc, indent="        "):
         lines.append(f'{i2}<size type="number">{npc["size"]}</size>')
     
     # Skills
-    skills = conn.execute(
-        "SELECT name, die, modifier FROM npc_skills WHERE npc_id=? ORDER BY name",
-        (npc['id'],)
-    ).fetchall()
-    
     if skills:
         lines.append(f'{i2}<skills>')
         for idx, s in enumerate(skills, 1):
@@ -122,10 +144,6 @@ def npc_to_fg_xml(conn, npc, indent="        "):
         lines.append(f'{i2}<gear type="string">{xml_escape(", ".join(gear))}</gear>')
     
     # Weaponlist (structured for FG Combat tab)
-    weapons = conn.execute(
-        "SELECT * FROM npc_weapons WHERE npc_id=?", (npc['id'],)
-    ).fetchall()
-    
     if weapons:
         lines.append(f'{i2}<weaponlist>')
         for idx, w in enumerate(weapons, 1):
@@ -232,9 +250,10 @@ def export_npcs(region=None, npc_name=None, full_module=False, export_all=False)
         return None
     
     # Build XML
+    related = prefetch_related(conn) if len(npcs) > 1 else None
     npc_entries = []
     for npc in npcs:
-        npc_entries.append(npc_to_fg_xml(conn, npc))
+        npc_entries.append(npc_to_fg_xml(conn, npc, related=related))
     
     npc_block = '\n'.join(npc_entries)
     
@@ -39,7 +39,8 @@ SCHEMA_PATH = Path(__file__).parent / "schema.sql"
 # ============================================================
 
 def get_db():
-    conn = sqlite3.connect(str(DB_PATH))
+    # Room for every distinct statement a script run issues, so none is re-prepared
+    conn = sqlite3.connect(str(DB_PATH), cached_statements=256)
     conn.row_factory = sqlite3.Row
     conn.execute("PRAGMA foreign_keys=ON")
     return conn
@@ -205,20 +206,17 @@ def add_weapon_interactive(conn, npc_id):
 # BATCH ADD (from dict — useful for scripted imports)
 # ============================================================
 
-def add_npc_from_dict(data):
-    """Add an NPC from a dictionary. Returns the new NPC id."""
-    conn = get_db()
-    
-    skills = data.pop('skills', {})
-    weapons = data.pop('weapons', [])
-    armor = data.pop('armor', [])
-    orgs = data.pop('organisations', [])
-    appearances = data.pop('appearances', [])
-    
+# Keys of an NPC dict that hold child rows rather than npcs columns
+CHILD_KEYS = ('skills', 'weapons', 'armor', 'organisations', 'appearances')
+
+def build_npc_rows(data):
+    """Split an NPC dict into its npcs row and child rows without touching the db.
+
+    Returns (fields, values, skill_rows, weapon_rows, armor_rows). Child rows
+    leave out npc_id; the caller prefixes it once the npcs row exists.
+    """
     # Build insert from whatever fields are provided
-    fields = [k for k in data.keys() if k not in ('skills', 'weapons', 'armor', 'organisations', 'appearances')]
-    placeholders = ', '.join(['?'] * len(fields))
-    columns = ', '.join(fields)
+    fields = [k for k in data.keys() if k not in CHILD_KEYS]
     values = [data[f] for f in fields]
     
     # Convert list fields to JSON
@@ -226,40 +224,92 @@ def add_npc_from_dict(data):
         if f.endswith('_json') and isinstance(values[i], list):
             values[i] = json.dumps(values[i])
     
-    cursor = conn.execute(
-        f"INSERT INTO npcs ({columns}) VALUES ({placeholders})", values
+    skill_rows = [(skill_name, parse_die(die_val))
+                  for skill_name, die_val in data.get('skills', {}).items()]
+    weapon_rows = [(w['name'], w['damage_str'], w['damagedice'],
+                    w.get('ap', 0), w.get('trait_type', 'Melee'),
+                    w.get('range'), w.get('reach', 0), w.get('notes'))
+                   for w in data.get('weapons', [])]
+    armor_rows = [(a['name'], a.get('protection', 0), a.get('area_protected'),
+                   a.get('min_strength'), a.get('notes'))
+                  for a in data.get('armor', [])]
+    return fields, values, skill_rows, weapon_rows, armor_rows
+
+def insert_npc_children(conn, skill_rows, weapon_rows, armor_rows):
+    """Insert child rows already prefixed with npc_id: one executemany per table."""
+    conn.executemany(
+        "INSERT INTO npc_skills (npc_id, name, die) VALUES (?, ?, ?)", skill_rows
     )
-    npc_id = cursor.lastrowid
     
-    # Add skills
-    for skill_name, die_val in skills.items():
-        conn.execute(
-            "INSERT INTO npc_skills (npc_id, name, die) VALUES (?, ?, ?)",
-            (npc_id, skill_name, parse_die(die_val))
-        )
+    conn.executemany("""
+        INSERT INTO npc_weapons (npc_id, name, damage_str, damagedice,
+                                armor_piercing, trait_type, range, reach, notes)
+        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+    """, weapon_rows)
+    
+    conn.executemany("""
+        INSERT INTO npc_armor (npc_id, name, protection, area_protected, min_strength, notes)
+        VALUES (?, ?, ?, ?, ?, ?)
+    """, armor_rows)
+
+def add_npc_from_dict(data, conn=None):
+    """Add an NPC from a dictionary. Returns the new NPC id.
+
+    Pass conn to add it on the caller's connection and transaction; the
+    caller then owns the commit and close.
+    """
+    own_conn = conn is None
+    if own_conn:
+        conn = get_db()
     
-    # Add weapons
-    for w in weapons:
-        conn.execute("""
-            INSERT INTO npc_weapons (npc_id, name, damage_str, damagedice,
-                                    armor_piercing, trait_type, range, reach, notes)
-            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
-        """, (npc_id, w['name'], w['damage_str'], w['damagedice'],
-              w.get('ap', 0), w.get('trait_type', 'Melee'),
-              w.get('range'), w.get('reach', 0), w.get('notes')))
+    fields, values, skills, weapons, armor = build_npc_rows(data)
+    cursor = conn.execute(
+        f"INSERT INTO npcs ({', '.join(fields)}) VALUES ({', '.join(['?'] * len(fields))})",
+        values
+    )
+    npc_id = cursor.lastrowid
     
-    # Add armor
-    for a in armor:
-        conn.execute("""
-            INSERT INTO npc_armor (npc_id, name, protection, area_protected, min_strength, notes)
-            VALUES (?, ?, ?, ?, ?, ?)
-        """, (npc_id, a['name'], a.get('protection', 0), a.get('area_protected'),
-              a.get('min_strength'), a.get('notes')))
+    insert_npc_children(conn,
+                        [(npc_id, *row) for row in skills],
+                        [(npc_id, *row) for row in weapons],
+                        [(npc_id, *row) for row in armor])
     
-    conn.commit()
-    conn.close()
+    if own_conn:
+        conn.commit()
+        conn.close()
     return npc_id
 
+def add_npcs_from_dicts(items, conn):
+    """Add several NPCs on conn's transaction. Returns {name: new NPC id}.
+
+    NPCs sharing a column set go in as one multi-row INSERT ... RETURNING,
+    and each child table takes a single executemany for the whole batch.
+    Names must be unique within items, since they key the returned ids.
+    """
+    built = [build_npc_rows(data) for data in items]
+    
+    ids = {}
+    groups = {}
+    for fields, values, *_ in built:
+        groups.setdefault(tuple(fields), []).append(values)
+    for fields, rows in groups.items():
+        row_sql = '(' + ', '.join(['?'] * len(fields)) + ')'
+        cursor = conn.execute(
+            f"INSERT INTO npcs ({', '.join(fields)}) VALUES "
+            f"{', '.join([row_sql] * len(rows))} RETURNING id, name",
+            [v for values in rows for v in values]
+        )
+        ids.update((name, npc_id) for npc_id, name in cursor.fetchall())
+    
+    skill_rows, weapon_rows, armor_rows = [], [], []
+    for data, (_, _, skills, weapons, armor) in zip(items, built):
+        npc_id = ids[data['name']]
+        skill_rows += [(npc_id, *row) for row in skills]
+        weapon_rows += [(npc_id, *row) for row in weapons]
+        armor_rows += [(npc_id, *row) for row in armor]
+    insert_npc_children(conn, skill_rows, weapon_rows, armor_rows)
+    return ids
+
 # ============================================================
 # LIST / SEARCH / SHOW
 # ============================================================
@@ -234,6 +234,7 @@ CREATE INDEX IF NOT EXISTS idx_npc_weapons_npc ON npc_weapons(npc_id);
 CREATE INDEX IF NOT EXISTS idx_npc_armor_npc ON npc_armor(npc_id);
 CREATE INDEX IF NOT EXISTS idx_npc_gear_npc ON npc_gear(npc_id);
 CREATE INDEX IF NOT EXISTS idx_npc_orgs_npc ON npc_organisations(npc_id);
+CREATE INDEX IF NOT EXISTS idx_npc_connections_b ON npc_connections(npc_id_b);
 CREATE INDEX IF NOT EXISTS idx_npc_appearances_npc ON npc_appearances(npc_id);
 
 -- ============================================================